@@ -1,24 +1,106 @@
 """
 Configuration settings for eye drop screening project
 """
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 # PubChem API settings
 TIMEOUT = 12
 MAX_RETRY = 4
 CID_LIMIT = 5
-CHUNK_SIZE = 25
+CHUNK_SIZE = 25                # プロパティ取得の初期バッチサイズ
+MAX_CHUNK_SIZE = 500           # 適応的バッチサイズの上限（POST送信）
+ADAPTIVE_FAST_SECONDS = 2.0    # この秒数未満の応答ならバッチを拡大
+ADAPTIVE_SLOW_SECONDS = 8.0    # この秒数を超える応答ならバッチを縮小
 MAX_SYNONYM = 4
+CAS_BATCH_SIZE = 100  # POST一括検索で1リクエストに含めるCAS/CID数
+SPECULATIVE_CAS_SEARCH = False  # Trueでcompound/substance→CIDエンドポイントを並行発行
+
+# PUG-REST property テーブルで一括取得するプロパティ
+BASE_PROPERTY_FIELDS = ["Title", "CanonicalSMILES", "IsomericSMILES"]  # 常に取得（Title/SMILES/IsomericSM列）
+PROPERTY_FIELDS = list(BASE_PROPERTY_FIELDS)  # 既定の取得プロパティ（出力CSVの列は従来と同じ）
+# --properties で追加できる代表的なプロパティ（追加したプロパティはCSV列・all_idsのキーになる）
+OPTIONAL_PROPERTY_FIELDS = [
+    "MolecularFormula", "MolecularWeight", "XLogP", "TPSA", "Charge", "InChIKey",
+]
+
+# Global rate limit (PubChem: max 5 requests/second)
+REQUESTS_PER_SECOND = 5.0
+RATE_BURST = 3
+RATE_LIMIT_PAUSE = 30.0  # 429時にRetry-Afterが無い場合の全体停止秒数
+
+# Adaptive throttling (X-Throttling-Control)
+THROTTLE_MIN_RATE = 0.5
+THROTTLE_MAX_RATE = REQUESTS_PER_SECOND
+THROTTLE_INCREASE_STEP = 0.25    # Green時の加算量 (req/s)
+THROTTLE_YELLOW_FACTOR = 0.75    # Yellow時の乗算係数
+THROTTLE_RED_FACTOR = 0.5        # Red時の乗算係数
+THROTTLE_ADJUST_INTERVAL = 1.0   # 同一状態での調整間隔（秒）
+THROTTLE_BUSY_PERCENT = 50       # Greenでもこの負荷率以上ならレートを上げない
+THROTTLE_RED_PAUSE = 5.0
+THROTTLE_BLACK_PAUSE = 60.0
+
+# asyncio client
+ASYNC_CONCURRENCY = 10
+
+# Full record (pug_view) downloader
+FULL_DATA_WORKERS = 4          # 完全レコードの同時ダウンロード数（リクエスト数は共有レート制限に従う）
+STREAM_COPY_BYTES = 64 * 1024  # レスポンスをディスクへ書き出す際のチャンクサイズ
+RECORD_HEADER_SCAN_BYTES = 64 * 1024  # RecordNumberを探す先頭部分の上限
+
+# JSON codec (src/pubchem/json_codec.py)
+JSON_BACKEND = "auto"          # "auto"（orjson → simdjson → json の順で利用可能なもの） / "orjson" / "simdjson" / "json"
+JSON_COMPACT = False           # Trueで出力ファイルをインデントなしのコンパクト形式で保存
+
+# Property extraction (scripts/extract_properties.py)
+EXTRACT_WORKERS = 1            # 抽出プロセス数（1で従来通りの逐次処理）
+EXTRACT_MANIFEST_PATH = PROJECT_ROOT / "data" / "cache" / "extraction_manifest.sqlite"  # 差分抽出用マニフェスト（全ディレクトリで共有）
+
+# Individual record files (individual_compounds_*)
+RECORD_COMPRESSION = None      # None（非圧縮JSON） / "gzip" / "zstd"（zstandardパッケージが必要）
+RECORD_GZIP_LEVEL = 6
+RECORD_ZSTD_LEVEL = 10
+RECORD_DICTIONARY_NAME = "zstd_dictionary.bin"  # 個別ファイルと同じディレクトリに置く共有辞書
+RECORD_DICTIONARY_SIZE = 112 * 1024             # 学習する辞書のサイズ（バイト）
+
+# Pipeline mode (search → property / CAS stages overlap)
+PIPELINE_QUEUE_SIZE = 500      # ステージ間キューの上限（CID数）
+PIPELINE_FLUSH_SECONDS = 1.0   # 入力が途切れたらこの秒数で未満のバッチも送出
+
+# HTTP connection pool (shared session)
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+# Response cache (data/cache)
+CACHE_ENABLED = True
+CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "responses"
+CACHE_MAX_BYTES = 2 * 1024 ** 3   # 2 GB（圧縮後）
+CACHE_COMPRESS_LEVEL = 6
+_DAY = 24 * 60 * 60
+CACHE_TTL = {                     # エンドポイント種別ごとの有効期間（秒）
+    "xrefs": 30 * _DAY,
+    "synonyms": 30 * _DAY,
+    "property": 30 * _DAY,
+    "cids": 30 * _DAY,
+    "sids": 30 * _DAY,
+    "substance": 30 * _DAY,
+    "pug_view": 7 * _DAY,
+    "default": 7 * _DAY,
+}
+NEGATIVE_CACHE_PATH = PROJECT_ROOT / "data" / "cache" / "negative_cache.sqlite"
+NEGATIVE_CACHE_TTL = 14 * _DAY    # 404（該当なし）の記録の有効期間（秒）
 
-# Sleep intervals (seconds)
-SLEEP_PROP = 2.0
-SLEEP_CAS = 3.0
-SLEEP_CID = 2.0
+# Checkpoint journal (--resume)
+CHECKPOINT_DIR = PROJECT_ROOT / "data" / "checkpoints"
 
 # HTTP headers
 USER_AGENT = {"User-Agent": "Mozilla/5.0 (Eye Drop Screening PubChem API)"}
 
 # File extensions and patterns
-SUPPORTED_INPUT_FORMATS = [".json"]
+SUPPORTED_INPUT_FORMATS = [".json", ".jsonl"]
+STREAM_CHUNK_SIZE = 100  # ストリーミングモードで1度に処理する行数（この単位で結果を追記）
+STREAM_SEARCH_MEMO_SIZE = 10000  # ストリーミングモードで検索結果を保持する最近のCAS数（重複行の再検索防止用）
 OUTPUT_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
 
 # Logging
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+JSONバックエンド比較スクリプト - 実際のpug_viewレコードで解析・出力速度と出力サイズを計測
+
+使用方法:
+    python3 scripts/benchmark_json.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/
+    python3 scripts/benchmark_json.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/ --limit 200 --repeat 5
+
+インストールされているバックエンド（json / orjson / simdjson）のみ計測する。
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.pubchem.json_codec import JsonCodec, orjson, simdjson
+from src.pubchem.record_store import iter_record_files, open_record
+
+
+def setup_logging(log_level=logging.INFO):
+    """ログ設定"""
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    return logging.getLogger()
+
+
+def available_backends():
+    """計測対象のバックエンド（標準ライブラリは常に含む）"""
+    backends = ["json"]
+    if orjson is not None:
+        backends.append("orjson")
+    if simdjson is not None:
+        backends.append("simdjson")
+    return backends
+
+
+def measure(func, repeat: int) -> float:
+    """repeat回実行して最短の所要時間（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSONバックエンドの解析・出力速度を比較')
+    parser.add_argument('--input', '-i', required=True,
+                        help='個別化合物ファイル（pug_viewレコード）が保存されているディレクトリ')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='計測に使うファイル数（大きいファイルから選択, default: 100）')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='各計測の繰り返し回数（最短時間を採用, default: 3）')
+
+    args = parser.parse_args()
+    logger = setup_logging()
+
+    input_dir = Path(args.input)
+    files = sorted(iter_record_files(input_dir), key=lambda p: p.stat().st_size, reverse=True)[:args.limit]
+    if not files:
+        logger.error(f"レコードファイルが見つかりません: {input_dir}")
+        return 1
+
+    # ディスクI/Oと展開を計測から除くため、先に全て読み込んでおく
+    payloads = []
+    for path in files:
+        with open_record(path) as f:
+            payloads.append(f.read())
+    total_bytes = sum(len(payload) for payload in payloads)
+    logger.info(f"計測対象: {len(payloads)} ファイル, {total_bytes:,} バイト（繰り返し {args.repeat} 回の最短時間）")
+
+    documents = [json.loads(payload) for payload in payloads]
+    baseline = {}
+
+    logger.info(f"{'バックエンド':<10} {'解析':>12} {'出力(indent)':>14} {'出力(compact)':>14} {'compactサイズ':>16}")
+    for backend in available_backends():
+        codec = JsonCodec(backend)
+        load_time = measure(lambda: [codec.loads(payload) for payload in payloads], args.repeat)
+        if codec.dump_backend == backend:
+            indent_time = measure(lambda: [codec.dumps(doc, compact=False) for doc in documents], args.repeat)
+            compact_time = measure(lambda: [codec.dumps(doc, compact=True) for doc in documents], args.repeat)
+            compact_size = sum(len(codec.dumps(doc, compact=True)) for doc in documents)
+        else:
+            indent_time = compact_time = None  # 解析専用のバックエンド
+            compact_size = None
+        if backend == "json":
+            baseline = {"load": load_time, "indent": indent_time, "compact": compact_time}
+
+        def cell(value, key):
+            if value is None:
+                return "-"
+            speedup = baseline[key] / value if value else 0
+            return f"{value * 1000:.1f}ms ({speedup:.1f}x)"
+
+        size = f"{compact_size:,}" if compact_size is not None else "-"
+        logger.info(
+            f"{backend:<10} {cell(load_time, 'load'):>12} {cell(indent_time, 'indent'):>14} "
+            f"{cell(compact_time, 'compact'):>14} {size:>16}"
+        )
+
+    logger.info(f"元ファイル合計: {total_bytes:,} バイト（compactサイズとの差がインデント・空白の分）")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
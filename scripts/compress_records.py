@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+個別化合物ファイル圧縮スクリプト - fetch_full_data.py の出力（individual_compounds_*）を圧縮形式に変換
+
+使用方法:
+    python3 scripts/compress_records.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/ --compress zstd
+    python3 scripts/compress_records.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/ --compress zstd --train-dictionary
+
+変換後のディレクトリは extract_properties.py でそのまま読み込める。
+"""
+import argparse
+import logging
+import shutil
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tqdm import tqdm
+
+from src.pubchem.record_store import (
+    RecordStore, iter_record_files, open_record, record_compression, record_stem, train_dictionary
+)
+from config.settings import RECORD_DICTIONARY_NAME, RECORD_DICTIONARY_SIZE, STREAM_COPY_BYTES
+
+
+def setup_logging(log_level=logging.INFO):
+    """ログ設定"""
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    return logging.getLogger()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='個別化合物ファイルを圧縮形式に変換')
+    parser.add_argument('--input', '-i', required=True,
+                        help='個別化合物ファイルが保存されているディレクトリ')
+    parser.add_argument('--output', '-o',
+                        help='変換後の保存先ディレクトリ（省略時は入力ディレクトリ内で置き換え）')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], default='zstd',
+                        help='圧縮形式 (default: zstd)')
+    parser.add_argument('--level', type=int,
+                        help='圧縮レベル（省略時は設定値）')
+    parser.add_argument('--dictionary',
+                        help='使用するzstd辞書ファイル')
+    parser.add_argument('--train-dictionary', action='store_true',
+                        help=f'入力ファイルからzstd辞書を学習して使用する（{RECORD_DICTIONARY_NAME}として保存）')
+    parser.add_argument('--dictionary-size', type=int, default=RECORD_DICTIONARY_SIZE,
+                        help=f'学習する辞書のサイズ（バイト, default: {RECORD_DICTIONARY_SIZE}）')
+    parser.add_argument('--debug', action='store_true',
+                        help='デバッグログを有効化')
+
+    args = parser.parse_args()
+    logger = setup_logging(logging.DEBUG if args.debug else logging.INFO)
+
+    input_dir = Path(args.input)
+    if not input_dir.exists():
+        logger.error(f"入力ディレクトリが見つかりません: {input_dir}")
+        return 1
+    output_dir = Path(args.output) if args.output else input_dir
+    in_place = output_dir.resolve() == input_dir.resolve()
+
+    files = [path for path in iter_record_files(input_dir) if record_compression(path) != args.compress]
+    if not files:
+        logger.info("変換対象のファイルがありません。")
+        return 0
+
+    try:
+        dictionary_path = Path(args.dictionary) if args.dictionary else None
+        if args.train_dictionary:
+            if args.compress != 'zstd':
+                logger.error("辞書はzstd圧縮でのみ使用できます")
+                return 1
+            dictionary_path = train_dictionary(files, output_dir / RECORD_DICTIONARY_NAME, args.dictionary_size)
+        store = RecordStore(args.compress, level=args.level, dictionary_path=dictionary_path)
+    except (ValueError, ImportError) as e:
+        logger.error(f"圧縮設定が不正です: {e}")
+        return 1
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    before = after = 0
+    for path in tqdm(files, desc="圧縮"):
+        target = output_dir / f"{record_stem(path)}{store.suffix}"
+        tmp_path = target.with_name(target.name + ".part")
+        try:
+            # 圧縮済みファイルを別形式に変換する場合も、展開してから書き込む
+            with open_record(path) as src, store.open_write(tmp_path) as dst:
+                shutil.copyfileobj(src, dst, STREAM_COPY_BYTES)
+            tmp_path.replace(target)
+        except Exception as e:
+            logger.error(f"変換失敗 {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            continue
+        before += path.stat().st_size
+        after += target.stat().st_size
+        if in_place:
+            path.unlink()
+
+    logger.info("--- 変換結果 ---")
+    logger.info(f"変換したファイル数: {len(files)}")
+    logger.info(f"変換前: {before:,} バイト → 変換後: {after:,} バイト"
+                f"（{before / after if after else 0:.1f} 倍圧縮）")
+    logger.info(f"保存先: {output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
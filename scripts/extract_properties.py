@@ -4,6 +4,7 @@
 
 使用方法:
     python3 scripts/extract_properties.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/
+    python3 scripts/extract_properties.py --input data/output/individual_compounds_YYYYMMDD_HHMMSS/ --workers 4
 """
 import argparse
 import logging
@@ -13,7 +14,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.data.property_extractor import PropertyExtractor
-from config.settings import OUTPUT_TIMESTAMP_FORMAT
+from src.data.extraction_manifest import ExtractionManifest
+from src.pubchem.json_codec import configure_json_codec, JSON_BACKENDS
+from config.settings import (OUTPUT_TIMESTAMP_FORMAT, EXTRACT_WORKERS, EXTRACT_MANIFEST_PATH,
+                             JSON_BACKEND, JSON_COMPACT)
 
 
 def setup_logging(log_level=logging.INFO):
@@ -46,6 +50,16 @@ def main():
                        help='出力ファイルパス（省略時は自動生成）')
     parser.add_argument('--summary', '-s',
                        help='概要ファイルパス（CIDマッピング用、省略時は自動検索）')
+    parser.add_argument('--workers', '-w', type=int, default=EXTRACT_WORKERS,
+                       help=f'抽出プロセス数（ファイルサイズ別に分割して並列処理, default: {EXTRACT_WORKERS}）')
+    parser.add_argument('--manifest', default=str(EXTRACT_MANIFEST_PATH),
+                       help=f'差分抽出用マニフェストのパス（内容ハッシュで管理し、ダウンロード実行間で共有。デフォルト: {EXTRACT_MANIFEST_PATH}）')
+    parser.add_argument('--full', action='store_true',
+                       help='マニフェストの記録を削除して全ファイルを再抽出する')
+    parser.add_argument('--compact-json', action='store_true',
+                       help='出力JSONをインデントなしのコンパクト形式で保存する')
+    parser.add_argument('--json-backend', choices=JSON_BACKENDS, default=JSON_BACKEND,
+                       help=f'JSONの解析・出力に使うバックエンド（autoは orjson → simdjson → json の順で利用可能なもの、デフォルト: {JSON_BACKEND}）')
     parser.add_argument('--debug', action='store_true',
                        help='デバッグログを有効化')
     
@@ -54,6 +68,11 @@ def main():
     # ログ設定
     log_level = logging.DEBUG if args.debug else logging.INFO
     logger = setup_logging(log_level)
+    if args.json_backend != JSON_BACKEND or args.compact_json:
+        try:
+            configure_json_codec(backend=args.json_backend, compact=args.compact_json or JSON_COMPACT)
+        except ImportError as e:
+            parser.error(str(e))
     
     logger.info("===== 物性値抽出スクリプト開始 =====")
     
@@ -84,16 +103,20 @@ def main():
         timestamp = datetime.datetime.now().strftime(OUTPUT_TIMESTAMP_FORMAT)
         output_file = Path(f'data/output/extracted_properties_{timestamp}.json')
     
-    # 物性値抽出処理
+    # 物性値抽出処理（前回の抽出から新規・変更されたファイルのみ抽出）
+    manifest = ExtractionManifest(Path(args.manifest), PropertyExtractor.VERSION)
     try:
         extractor = PropertyExtractor()
+        if args.full:
+            manifest.clear()
         
         logger.info(f"入力ディレクトリ: {input_dir}")
         logger.info(f"概要ファイル: {summary_file}")
         logger.info(f"出力ファイル: {output_file}")
         
         # 一括抽出実行
-        extracted_data = extractor.batch_extract_properties(input_dir, summary_file)
+        extracted_data = extractor.batch_extract_properties(input_dir, summary_file, workers=args.workers,
+                                                            manifest=manifest)
         
         # 結果の保存
         output_file.parent.mkdir(parents=True, exist_ok=True)
@@ -126,6 +149,8 @@ def main():
     except Exception as e:
         logger.error(f"処理中にエラーが発生しました: {e}", exc_info=True)
         return 1
+    finally:
+        manifest.close()
 
 
 if __name__ == '__main__':
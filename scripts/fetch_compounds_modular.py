@@ -6,6 +6,8 @@ fetch_compounds_modular.py
 
 Usage:
     python scripts/fetch_compounds_modular.py --input data/input/compounds.json
+    python scripts/fetch_compounds_modular.py --input data/input/compounds.jsonl --stream
+    python scripts/fetch_compounds_modular.py --input data/input/compounds.json --async
     
 Features:
 - モジュール化された構成で保守性向上
@@ -18,13 +20,24 @@ import argparse
 import logging
 import sys
 from pathlib import Path
+from typing import List, Optional
 
 # プロジェクトルートをPythonパスに追加
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.data.processor import CompoundDataProcessor
-from config.settings import LOG_FORMAT, LOG_LEVEL
+from src.data.pipeline import CompoundPipeline
+from src.data.streaming import CompoundStreamProcessor
+from src.data.checkpoint import CheckpointJournal, checkpoint_path
+from src.pubchem.session import close_session, log_pool_stats
+from src.pubchem.throttling import log_throttle_stats
+from src.pubchem.cache import disable_response_cache, log_cache_stats
+from src.pubchem.json_codec import configure_json_codec, JSON_BACKENDS
+from config.settings import (
+    LOG_FORMAT, LOG_LEVEL, PROPERTY_FIELDS, OPTIONAL_PROPERTY_FIELDS, SUPPORTED_INPUT_FORMATS,
+    STREAM_SEARCH_MEMO_SIZE, ASYNC_CONCURRENCY, JSON_BACKEND, JSON_COMPACT,
+)
 
 
 def setup_logging(log_file: str = "compound_fetch.log"):
@@ -43,12 +56,23 @@ def setup_logging(log_file: str = "compound_fetch.log"):
     return logger
 
 
-def process_compounds_file(input_path: Path) -> None:
+def process_compounds_file(input_path: Path, speculative: bool = False,
+                           properties: Optional[List[str]] = None, pipeline: bool = False,
+                           resume: bool = False, stream: bool = False, use_async: bool = False) -> None:
     """化合物情報ファイルを処理"""
     logger = logging.getLogger(__name__)
-    processor = CompoundDataProcessor()
+    checkpoint = CheckpointJournal(checkpoint_path(input_path, "compounds"), resume=resume)
+    # ストリーミングモードでは検索結果の保持数を制限し、チェックポイントも必要な分だけ参照する
+    processor = CompoundDataProcessor(properties=properties, checkpoint=checkpoint,
+                                      memo_size=STREAM_SEARCH_MEMO_SIZE if stream else None, use_async=use_async)
+    processor.pubchem_client.speculative = speculative
     
     try:
+        if stream:
+            # JSONLを1チャンクずつ処理し、結果を逐次追記
+            CompoundStreamProcessor(processor, pipeline=pipeline).process_file(input_path)
+            return
+        
         # Step 1: データ読み込みと検証
         data = processor.load_json_data(input_path)
         valid_data = processor.validate_and_filter_data(data)
@@ -60,14 +84,18 @@ def process_compounds_file(input_path: Path) -> None:
         # Step 2: DataFrame作成
         df = processor.create_dataframe(valid_data)
         
-        # Step 3: CID/SID検索
-        df, notfound = processor.search_compounds(df)
-        
-        # Step 4: プロパティ取得
-        df = processor.fetch_properties(df)
-        
-        # Step 5: CAS情報取得
-        df, all_ids = processor.fetch_cas_information(df)
+        if pipeline:
+            # Step 3-5: 検索・プロパティ取得・CAS取得を並行実行
+            df, all_ids, notfound = CompoundPipeline(processor).run(df)
+        else:
+            # Step 3: CID/SID検索
+            df, notfound = processor.search_compounds(df)
+            
+            # Step 4: プロパティ取得
+            df = processor.fetch_properties(df)
+            
+            # Step 5: CAS情報取得
+            df, all_ids = processor.fetch_cas_information(df)
         
         # Step 6: 結果保存
         processor.save_results(df, all_ids, notfound, input_path)
@@ -75,6 +103,10 @@ def process_compounds_file(input_path: Path) -> None:
     except Exception as e:
         logger.error(f"処理中にエラーが発生しました: {e}", exc_info=True)
         raise
+    finally:
+        processor.pubchem_client.close()
+        logger.info(f"チェックポイント: {checkpoint.summary()} → {checkpoint.db_path}")
+        checkpoint.close()
 
 
 def cli():
@@ -85,6 +117,7 @@ def cli():
         epilog="""
 例:
     python scripts/fetch_compounds_modular.py --input data/input/compounds.json
+    python scripts/fetch_compounds_modular.py --input data/input/compounds.jsonl --stream
     
 入力ファイル形式:
     [
@@ -94,13 +127,16 @@ def cli():
             "cas": "123-45-6"
         }
     ]
+    
+    --stream（JSON Lines、1行1化合物）:
+    {"inci": "化合物名", "function": "機能", "cas": "123-45-6"}
         """
     )
     
     parser.add_argument(
         "--input", 
         required=True, 
-        help="化合物データのJSONファイルパス"
+        help="化合物データのJSON / JSON Lines（.jsonl）ファイルパス"
     )
     
     parser.add_argument(
@@ -109,28 +145,107 @@ def cli():
         help="ログファイル名 (default: compound_fetch.log)"
     )
     
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="CAS検索でCompound/Substance→CIDエンドポイントを並行発行する（レイテンシ短縮）"
+    )
+    
+    parser.add_argument(
+        "--properties",
+        default=",".join(PROPERTY_FIELDS),
+        help="PUG-RESTで一括取得するプロパティ（カンマ区切り、Title/SMILESは常に取得）。"
+             "追加したプロパティはCSVの列になる "
+             f"(例: {','.join(OPTIONAL_PROPERTY_FIELDS)}, default: {','.join(PROPERTY_FIELDS)})"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="一括検索・プロパティ・CAS取得の各バッチと個別CAS検索をasyncioで並行発行する "
+             f"(同時実行数 {ASYNC_CONCURRENCY}、リクエスト数は共有レート制限に従う)"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="JSON Lines入力を逐次処理し、結果を1化合物1行のJSONLで追記する（.jsonl入力では自動で有効）"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="CID/SID検索・プロパティ取得・CAS取得を待ち合わせずに並行実行する"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回中断した実行のチェックポイント（data/checkpoints）から再開し、完了済みの処理を省略する"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="レスポンスキャッシュ（data/cache/responses）を使用しない"
+    )
+    
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="出力JSONをインデントなしのコンパクト形式で保存する"
+    )
+    
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default=JSON_BACKEND,
+        help=f"JSONの解析・出力に使うバックエンド（autoは orjson → simdjson → json の順で利用可能なもの、デフォルト: {JSON_BACKEND}）"
+    )
+    
     args = parser.parse_args()
     
     # ログ設定
     logger = setup_logging(args.log)
     
+    if args.no_cache:
+        disable_response_cache()
+    if args.json_backend != JSON_BACKEND or args.compact_json:
+        try:
+            configure_json_codec(backend=args.json_backend, compact=args.compact_json or JSON_COMPACT)
+        except ImportError as e:
+            parser.error(str(e))
+    
     # 入力ファイル検証
     input_path = Path(args.input)
     if not input_path.exists():
         logger.error(f"入力ファイルが存在しません: {input_path}")
         return 1
     
-    if not input_path.suffix.lower() == ".json":
-        logger.error(f"JSONファイルを指定してください: {input_path}")
+    suffix = input_path.suffix.lower()
+    if suffix not in SUPPORTED_INPUT_FORMATS:
+        logger.error(f"JSON / JSON Linesファイルを指定してください: {input_path}")
+        return 1
+    stream = args.stream or suffix == ".jsonl"
+    if stream and suffix != ".jsonl":
+        logger.error(f"--stream にはJSON Lines（.jsonl）ファイルを指定してください: {input_path}")
         return 1
     
     try:
-        process_compounds_file(input_path)
+        properties = [p for p in args.properties.split(",") if p.strip()]
+        process_compounds_file(input_path, speculative=args.speculative, properties=properties,
+                               pipeline=args.pipeline, resume=args.resume, stream=stream,
+                               use_async=args.use_async)
         return 0
     except Exception as e:
         logger.error(f"処理失敗: {e}")
         return 1
     finally:
+        log_pool_stats(logger)
+        log_throttle_stats(logger)
+        log_cache_stats(logger)
+        close_session()
         logger.info("=== モジュール化PubChem化合物情報取得スクリプト終了 ===")
 
 
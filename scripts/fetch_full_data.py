@@ -17,6 +17,7 @@ import argparse
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 
 # プロジェクトルートをPythonパスに追加
 project_root = Path(__file__).parent.parent
@@ -24,7 +25,14 @@ sys.path.insert(0, str(project_root))
 
 from src.data.processor import CompoundDataProcessor
 from src.data.full_data_processor import FullDataProcessor
-from config.settings import LOG_FORMAT, LOG_LEVEL
+from src.data.checkpoint import CheckpointJournal, checkpoint_path
+from src.pubchem.session import close_session, log_pool_stats
+from src.pubchem.throttling import log_throttle_stats
+from src.pubchem.cache import disable_response_cache, log_cache_stats
+from src.pubchem.json_codec import configure_json_codec, JSON_BACKENDS
+from src.pubchem.record_store import RecordStore
+from config.settings import (LOG_FORMAT, LOG_LEVEL, FULL_DATA_WORKERS, RECORD_COMPRESSION, ASYNC_CONCURRENCY,
+                             JSON_BACKEND, JSON_COMPACT)
 
 
 def setup_logging(log_file: str = "fetch_full_data.log"):
@@ -43,13 +51,17 @@ def setup_logging(log_file: str = "fetch_full_data.log"):
     return logger
 
 
-def process_full_data(input_path: Path, output_dir: Path) -> None:
+def process_full_data(input_path: Path, output_dir: Path, speculative: bool = False,
+                      resume: bool = False, workers: int = FULL_DATA_WORKERS,
+                      store: Optional[RecordStore] = None, use_async: bool = False) -> None:
     """化合物の完全データを取得して保存"""
     logger = logging.getLogger(__name__)
+    checkpoint = CheckpointJournal(checkpoint_path(input_path, "full_data"), resume=resume)
     
     # 基本データ処理クラス（データ読み込み用）
     basic_processor = CompoundDataProcessor()
-    full_processor = FullDataProcessor()
+    full_processor = FullDataProcessor(checkpoint=checkpoint, workers=workers, store=store, use_async=use_async)
+    full_processor.pubchem_client.speculative = speculative
     
     try:
         # データ読み込み
@@ -73,6 +85,10 @@ def process_full_data(input_path: Path, output_dir: Path) -> None:
     except Exception as e:
         logger.error(f"処理中にエラーが発生しました: {e}", exc_info=True)
         raise
+    finally:
+        full_processor.pubchem_client.close()
+        logger.info(f"チェックポイント: {checkpoint.summary()} → {checkpoint.db_path}")
+        checkpoint.close()
 
 
 def cli():
@@ -91,6 +107,10 @@ def cli():
 出力ファイル例:
     - 4436_550-99-2_ナファゾリン塩酸塩.json: 完全なPubChemデータ（約1500行）
     - 6041_61-76-7_フェニレフリン塩酸塩.json: 同上
+    
+圧縮保存:
+    python scripts/fetch_full_data.py --input data/input/compounds.json --output data/output/full_data --compress zstd
+    （既存の個別ファイルの変換・辞書の学習は scripts/compress_records.py）
         """
     )
     
@@ -112,11 +132,77 @@ def cli():
         help="ログファイル名 (default: fetch_full_data.log)"
     )
     
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="CAS検索でCompound/Substance→CIDエンドポイントを並行発行する（レイテンシ短縮）"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=FULL_DATA_WORKERS,
+        help=f"完全データの同時ダウンロード数 (default: {FULL_DATA_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="CAS検索（一括検索の各バッチと個別検索）をasyncioで並行発行する "
+             f"(同時実行数 {ASYNC_CONCURRENCY}、完全データの並行取得数は --workers)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回中断した実行のチェックポイント（data/checkpoints）から再開し、完了済みの処理を省略する"
+    )
+    
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "zstd"],
+        default=RECORD_COMPRESSION,
+        help="個別ファイルを圧縮して保存する（.json.gz / .json.zst、zstdはzstandardパッケージが必要）"
+    )
+    
+    parser.add_argument(
+        "--dictionary",
+        help="zstd圧縮に使う共有辞書ファイル（scripts/compress_records.py --train-dictionary で作成）"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="レスポンスキャッシュ（data/cache/responses）を使用しない"
+    )
+    
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="出力JSONをインデントなしのコンパクト形式で保存する"
+    )
+    
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default=JSON_BACKEND,
+        help=f"JSONの解析・出力に使うバックエンド（autoは orjson → simdjson → json の順で利用可能なもの、デフォルト: {JSON_BACKEND}）"
+    )
+    
     args = parser.parse_args()
     
     # ログ設定
     logger = setup_logging(args.log)
     
+    if args.no_cache:
+        disable_response_cache()
+    if args.json_backend != JSON_BACKEND or args.compact_json:
+        try:
+            configure_json_codec(backend=args.json_backend, compact=args.compact_json or JSON_COMPACT)
+        except ImportError as e:
+            parser.error(str(e))
+    
     # 入力ファイル検証
     input_path = Path(args.input)
     if not input_path.exists():
@@ -131,12 +217,23 @@ def cli():
     output_dir = Path(args.output)
     
     try:
-        process_full_data(input_path, output_dir)
+        store = RecordStore(args.compress, dictionary_path=Path(args.dictionary) if args.dictionary else None)
+    except (ValueError, ImportError) as e:
+        logger.error(f"保存形式の指定が不正です: {e}")
+        return 1
+    
+    try:
+        process_full_data(input_path, output_dir, speculative=args.speculative, resume=args.resume,
+                          workers=args.workers, store=store, use_async=args.use_async)
         return 0
     except Exception as e:
         logger.error(f"処理失敗: {e}")
         return 1
     finally:
+        log_pool_stats(logger)
+        log_throttle_stats(logger)
+        log_cache_stats(logger)
+        close_session()
         logger.info("=== PubChem完全データ取得スクリプト終了 ===")
 
 
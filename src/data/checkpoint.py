@@ -0,0 +1,183 @@
+"""
+Durable checkpoint journal for resumable fetch runs
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from itertools import batched
+except ImportError:
+    from more_itertools import batched
+
+from src.pubchem.models import RecordFile, SearchResult
+from config.settings import CHECKPOINT_DIR
+
+
+def checkpoint_path(input_path: Path, kind: str, checkpoint_dir: Path = CHECKPOINT_DIR) -> Path:
+    """
+    入力ファイルとスクリプト種別からチェックポイントファイルのパスを決定
+
+    同名の入力ファイルが別ディレクトリにあっても衝突しないよう、絶対パスのハッシュを含める。
+    """
+    resolved = str(Path(input_path).resolve())
+    digest = hashlib.sha1(resolved.encode("utf-8")).hexdigest()[:8]
+    return Path(checkpoint_dir) / f"{kind}_{Path(input_path).stem}_{digest}.sqlite"
+
+
+class CheckpointJournal:
+    """
+    完了した処理結果を1件ずつ永続化するSQLiteジャーナル
+
+    - (stage, key) 単位で結果を記録し、記録のたびにコミット（中断・クラッシュ時も記録済み分は残る）
+    - 値はJSONをzlib圧縮して保存（完全データレコードのような大きな値にも対応）
+    - resume=Falseの場合は既存の記録を破棄して新規に開始
+    - スレッドセーフ（パイプラインモードの各ステージから同時に記録可能）
+    """
+
+    SEARCH = "search"
+    PROPERTY = "property"
+    CAS = "cas"
+    FULL_RECORD = "full_record"
+    LOOKUP_BATCH_SIZE = 500  # get_manyで1クエリに含めるキー数（SQLiteのパラメータ数上限未満）
+
+    def __init__(self, db_path: Path, resume: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._recorded = 0
+        self._reused = 0
+
+        existing = self.db_path.exists()
+        with self._lock:
+            conn = self._connect()
+            if existing and not resume:
+                conn.execute("DELETE FROM entries")
+                conn.commit()
+        if existing and resume:
+            self.logger.info(f"チェックポイントから再開: {self.db_path} ({self.summary()})")
+        else:
+            self.logger.info(f"チェックポイント記録開始: {self.db_path}")
+
+    def get(self, stage: str, key: Any) -> Optional[Any]:
+        """記録済みの値を取得（未記録はNone）"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM entries WHERE stage = ? AND key = ?", (stage, str(key))
+            ).fetchone()
+        if row is None:
+            return None
+        self._reused += 1
+        return self._decode(row[0])
+
+    def load(self, stage: str) -> Dict[str, Any]:
+        """ステージの記録済みの値を全て取得"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, value FROM entries WHERE stage = ?", (stage,)
+            ).fetchall()
+        self._reused += len(rows)
+        return {key: self._decode(value) for key, value in rows}
+
+    def get_many(self, stage: str, keys: Iterable[Any]) -> Dict[str, Any]:
+        """指定したキーの記録済みの値のみ取得（未記録のキーは含まない）"""
+        keys = list(dict.fromkeys(str(key) for key in keys))
+        rows = []
+        with self._lock:
+            conn = self._connect()
+            for chunk in batched(keys, self.LOOKUP_BATCH_SIZE):
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT key, value FROM entries WHERE stage = ? AND key IN ({placeholders})", (stage, *chunk)
+                ).fetchall())
+        self._reused += len(rows)
+        return {key: self._decode(value) for key, value in rows}
+
+    def record(self, stage: str, key: Any, value: Any) -> None:
+        """1件の結果を記録"""
+        self.record_many(stage, [(key, value)])
+
+    def record_many(self, stage: str, items: Iterable[Tuple[Any, Any]]) -> None:
+        """複数の結果をまとめて記録（1トランザクション）"""
+        rows = [(stage, str(key), self._encode(value), time.time()) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (stage, key, value, created) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.commit()
+            self._recorded += len(rows)
+
+    def summary(self) -> str:
+        """ステージごとの記録件数"""
+        with self._lock:
+            counts = self._connect().execute(
+                "SELECT stage, COUNT(*) FROM entries GROUP BY stage ORDER BY stage"
+            ).fetchall()
+        return ", ".join(f"{stage} {count} 件" for stage, count in counts) or "記録なし"
+
+    def stats(self) -> Dict[str, int]:
+        """今回の実行での記録・再利用件数"""
+        return {"recorded": self._recorded, "reused": self._reused}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # SearchResultの変換（JSONに保存できる形式）
+    @staticmethod
+    def search_result_to_dict(result: SearchResult) -> Dict:
+        return {"cids": result.cids, "sids": result.sids, "success": result.success,
+                "search_type": result.search_type}
+
+    @staticmethod
+    def search_result_from_dict(data: Dict) -> SearchResult:
+        return SearchResult(data["cids"], data["sids"], data["success"], data["search_type"])
+
+    # RecordFileの変換（保存済みファイルの場所とメタデータのみ記録し、本体はファイルから再利用）
+    @staticmethod
+    def record_file_to_dict(record: RecordFile) -> Dict:
+        return {"path": str(record.path), "size_bytes": record.size_bytes,
+                "record_number": record.record_number, "basic_info": record.basic_info}
+
+    @staticmethod
+    def record_file_from_dict(data: Any) -> Optional[RecordFile]:
+        """記録済みのファイルが存在しない場合（旧形式の記録を含む）はNone"""
+        if not isinstance(data, dict) or "path" not in data or not Path(data["path"]).exists():
+            return None
+        return RecordFile(Path(data["path"]), data["size_bytes"], data["record_number"], data["basic_info"])
+
+    @staticmethod
+    def cas_pairs_from_list(data: List) -> List[Tuple[str, str]]:
+        return [tuple(pair) for pair in data]
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "stage TEXT, key TEXT, value BLOB, created REAL, PRIMARY KEY (stage, key))"
+            )
+        return self._conn
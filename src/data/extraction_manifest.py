@@ -0,0 +1,133 @@
+"""
+Extraction manifest for incremental property extraction
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.pubchem.record_store import open_record
+from config.settings import STREAM_COPY_BYTES
+
+
+def record_digest(path: Path) -> str:
+    """レコード内容（圧縮ファイルは展開後）のハッシュ（SHA-1）"""
+    digest = hashlib.sha1()
+    with open_record(path) as f:
+        for chunk in iter(lambda: f.read(STREAM_COPY_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionManifest:
+    """
+    個別化合物ファイルの物性値抽出結果を、レコード内容のハッシュをキーとして保存する
+
+    - 抽出結果は内容ハッシュで管理するため、ダウンロードごとに作られる individual_compounds_<timestamp>
+      ディレクトリ間や、圧縮形式を変換したファイルでも記録済みの結果を再利用（マニフェストは全実行で共有）
+    - ファイルごとの指紋（パス・サイズ・更新時刻 → 内容ハッシュ）も記録し、未変更のファイルはハッシュ計算を省略
+    - 抽出処理のバージョン（version）が異なる記録は再抽出の対象
+    """
+
+    def __init__(self, db_path: Path, version: int):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.version = version
+        self._conn: Optional[sqlite3.Connection] = None
+        self._digests: Dict[str, str] = {}
+        self._fingerprints: Dict[str, Tuple[int, int, str]] = {}
+
+    def partition(self, files: List[Path]) -> Tuple[Dict[str, Dict], List[Path]]:
+        """
+        ファイルを「記録済みの結果を再利用できるもの」と「抽出が必要なもの」に分ける
+
+        Returns:
+            (ファイルパス → 記録済みの抽出結果, 記録のないファイルのリスト)
+        """
+        conn = self._connect()
+        cached: Dict[str, Dict] = {}
+        stale: List[Path] = []
+        for path in files:
+            digest = self._digest(conn, path)
+            row = conn.execute(
+                "SELECT properties FROM results WHERE sha1 = ? AND version = ?", (digest, self.version)
+            ).fetchone()
+            if row is None:
+                stale.append(path)
+            else:
+                cached[str(path)] = json.loads(row[0])
+        return cached, stale
+
+    def record_many(self, items: Iterable[Tuple[Path, Dict]]) -> None:
+        """抽出結果を内容ハッシュと共に記録（partitionで計算したファイルの指紋もここで保存）"""
+        now = time.time()
+        rows = [(self._digests.get(str(path)) or record_digest(path), self.version,
+                 json.dumps(properties, ensure_ascii=False), now)
+                for path, properties in items]
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO results (sha1, version, properties, updated) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+            [(path, *fingerprint) for path, fingerprint in self._fingerprints.items()]
+        )
+        conn.commit()
+        self._fingerprints = {}
+
+    def prune(self) -> int:
+        """
+        削除されたファイルの指紋と、どのファイルからも参照されなくなった抽出結果を削除
+
+        Returns:
+            削除した抽出結果の件数
+        """
+        conn = self._connect()
+        removed = [(path,) for (path,) in conn.execute("SELECT path FROM fingerprints") if not os.path.exists(path)]
+        conn.executemany("DELETE FROM fingerprints WHERE path = ?", removed)
+        count = conn.execute("DELETE FROM results WHERE sha1 NOT IN (SELECT sha1 FROM fingerprints)").rowcount
+        conn.commit()
+        return count
+
+    def clear(self) -> None:
+        """全ての記録を削除（全件再抽出）"""
+        conn = self._connect()
+        conn.execute("DELETE FROM results")
+        conn.execute("DELETE FROM fingerprints")
+        conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _digest(self, conn: sqlite3.Connection, path: Path) -> str:
+        """ファイルの内容ハッシュ（サイズ・更新時刻が記録と一致すれば記録済みのハッシュを使用）"""
+        key = str(path.resolve())
+        stat = path.stat()
+        row = conn.execute("SELECT size, mtime_ns, sha1 FROM fingerprints WHERE path = ?", (key,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            digest = row[2]
+        else:
+            digest = record_digest(path)
+            self._fingerprints[key] = (stat.st_size, stat.st_mtime_ns, digest)
+        self._digests[str(path)] = digest
+        return digest
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "sha1 TEXT PRIMARY KEY, version INTEGER, properties TEXT, updated REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha1 TEXT)"
+            )
+        return self._conn
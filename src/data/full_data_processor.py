@@ -1,26 +1,39 @@
 """
 Full data processing for comprehensive PubChem compound information
 """
-import json
 import logging
 import datetime
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from tqdm import tqdm
-import time
 
 from src.pubchem.client import PubChemClient
+from src.pubchem.async_client import ConcurrentPubChemClient
 from src.pubchem.full_data_client import PubChemFullDataClient
-from config.settings import OUTPUT_TIMESTAMP_FORMAT, SLEEP_CID
+from src.pubchem.utils import normalize_cas
+from src.pubchem.downloader import FullRecordDownloader
+from src.pubchem.models import RecordFile
+from src.pubchem.record_store import RecordStore, iter_record_files, load_record, record_stem
+from src.pubchem.record_index import RecordIndex
+from src.data.checkpoint import CheckpointJournal
+from config.settings import OUTPUT_TIMESTAMP_FORMAT, FULL_DATA_WORKERS
 
 
 class FullDataProcessor:
     """化合物の完全データ取得と処理を担当するクラス"""
     
-    def __init__(self):
+    def __init__(self, checkpoint: Optional[CheckpointJournal] = None, workers: int = FULL_DATA_WORKERS,
+                 store: Optional[RecordStore] = None, use_async: bool = False):
+        """
+        Args:
+            use_async: Trueの場合、CAS検索（一括検索のバッチと個別検索）をasyncioで並行実行する。
+                完全データはFullRecordDownloaderがworkers本のスレッドで並行取得する
+        """
         self.logger = logging.getLogger(__name__)
-        self.pubchem_client = PubChemClient()
-        self.full_data_client = PubChemFullDataClient()
+        self.pubchem_client = ConcurrentPubChemClient() if use_async else PubChemClient()
+        self.full_data_client = PubChemFullDataClient(store)
+        self.downloader = FullRecordDownloader(self.full_data_client, workers=workers)
+        self.checkpoint = checkpoint
     
     def process_compounds_full_data(self, input_data: List[Dict], output_dir: Path) -> None:
         """
@@ -36,11 +49,35 @@ class FullDataProcessor:
         self.logger.info("STEP1: CAS番号からCID/SID検索")
         compounds_info = []
         
+        # チェックポイント記録済み・POSTによる一括検索で解決できたCASは個別検索を省略
+        journaled = self.checkpoint.load(CheckpointJournal.SEARCH) if self.checkpoint else {}
+        if journaled:
+            self.logger.info(f"チェックポイントから検索結果を再利用: {len(journaled)} 件")
+        # 同じ正規化CASは1回だけ検索し、結果を全ての行で共有
+        unique_cas = list(dict.fromkeys(normalize_cas(item.get("cas", "")) for item in input_data))
+        searched = {cas: CheckpointJournal.search_result_from_dict(journaled[cas])
+                    for cas in unique_cas if cas in journaled}
+        bulk_results = self.pubchem_client.get_cids_from_cas_bulk(
+            [cas for cas in unique_cas if cas not in searched]
+        )
+        self._record(CheckpointJournal.SEARCH, [
+            (cas, CheckpointJournal.search_result_to_dict(result)) for cas, result in bulk_results.items()
+        ])
+        searched.update(bulk_results)
+        
         for idx, item in enumerate(tqdm(input_data, desc="CID/SID検索")):
             cas_number = item.get("cas", "").strip()
             inci_name = item.get("inci", "").strip()
+            cas_key = normalize_cas(cas_number)
             
-            search_result = self.pubchem_client.get_cid_from_cas(cas_number)
+            search_result = searched.get(cas_key)
+            if search_result is None:
+                search_result = self.pubchem_client.get_cid_from_cas(cas_key)
+                searched[cas_key] = search_result
+                if search_result.cids or search_result.sids:
+                    self._record(CheckpointJournal.SEARCH, [
+                        (cas_key, CheckpointJournal.search_result_to_dict(search_result))
+                    ])
             
             if search_result.cids:
                 compound_id = search_result.cids[0]
@@ -56,51 +93,94 @@ class FullDataProcessor:
                 continue
             
             compounds_info.append((compound_id, inci_name, cas_number, data_type, None))
-            time.sleep(SLEEP_CID)
         
-        # Step 2: 完全データ取得
+        # Step 2: 完全データ取得（並行ダウンロード、レコードはパースせずに個別ファイルへストリーミング保存）
         self.logger.info("STEP2: 化合物完全データ取得")
-        compounds_with_data = []
+        timestamp = datetime.datetime.now().strftime(OUTPUT_TIMESTAMP_FORMAT)
+        individual_dir = output_dir / f"individual_compounds_{timestamp}"
         
-        for compound_id, inci_name, cas_number, data_type, _ in tqdm(compounds_info, desc="完全データ取得"):
+        # 同じCID/SIDのレコードは1回だけ取得し、該当する全ての行に書き出す
+        rows_by_key: Dict[str, List[Tuple]] = {}
+        tasks = []
+        for compound_id, inci_name, cas_number, data_type, _ in compounds_info:
             if compound_id is None:
-                compounds_with_data.append((None, inci_name, cas_number, None))
                 continue
-            
-            # データ取得
-            if data_type == "CID":
-                full_data = self.full_data_client.get_full_compound_data(compound_id)
-            elif data_type == "SID":
-                full_data = self.full_data_client.get_full_substance_data(compound_id)
-            else:
-                full_data = None
-            
-            compounds_with_data.append((compound_id, inci_name, cas_number, full_data))
-            time.sleep(SLEEP_CID)
+            record_key = f"{data_type}:{compound_id}"
+            if record_key not in rows_by_key:
+                rows_by_key[record_key] = []
+                tasks.append((record_key, data_type, compound_id))
+            rows_by_key[record_key].append((compound_id, inci_name, cas_number))
         
-        # Step 3: データ保存
-        self.logger.info("STEP3: データ保存")
-        timestamp = datetime.datetime.now().strftime(OUTPUT_TIMESTAMP_FORMAT)
+        def row_path(row: Tuple) -> Path:
+            compound_id, inci_name, cas_number = row
+            return self.full_data_client.compound_file_path(compound_id, inci_name, cas_number, individual_dir)
         
-        # 個別ファイル保存
-        individual_dir = output_dir / f"individual_compounds_{timestamp}"
-        self.full_data_client.save_individual_compound_files(compounds_with_data, individual_dir)
+        # 行ごとの保存済みファイル
+        saved: Dict[Tuple, Optional[RecordFile]] = {}
+        
+        def on_record(record_key: str, record: Optional[RecordFile]) -> None:
+            # 1行目のファイルにダウンロード済みのため、残りの行にはコピー
+            for row in rows_by_key[record_key]:
+                saved[row] = self.full_data_client.copy_record_file(record, row_path(row)) if record else None
+        
+        reused = set()
+        if self.checkpoint is not None:
+            for record_key, _, _ in tasks:
+                record = CheckpointJournal.record_file_from_dict(
+                    self.checkpoint.get(CheckpointJournal.FULL_RECORD, record_key)
+                )
+                if record is not None:
+                    # 前回の出力ファイルを今回の出力先へコピー（保存形式が異なる場合は再取得）
+                    record = self.full_data_client.copy_record_file(record, row_path(rows_by_key[record_key][0]))
+                if record is not None:
+                    reused.add(record_key)
+                    on_record(record_key, record)
+        if reused:
+            self.logger.info(f"チェックポイントから完全データを再利用: {len(reused)} 件")
+        
+        def on_download(record_key: str, record: Optional[RecordFile]) -> None:
+            if record is not None:
+                self._record(CheckpointJournal.FULL_RECORD,
+                             [(record_key, CheckpointJournal.record_file_to_dict(record))])
+            on_record(record_key, record)
         
-        # 概要ファイル作成
+        self.downloader.download([task for task in tasks if task[0] not in reused],
+                                 lambda record_key: row_path(rows_by_key[record_key][0]), on_download)
+        
+        compounds_with_data = [
+            (compound_id, inci_name, cas_number,
+             saved.get((compound_id, inci_name, cas_number)) if compound_id is not None else None)
+            for compound_id, inci_name, cas_number, data_type, _ in compounds_info
+        ]
+        
+        record_rows = sum(1 for info in compounds_info if info[0] is not None)
+        self.logger.info(
+            f"重複排除: CAS検索 {len(input_data)}→{len(searched)} 件, "
+            f"完全データ取得 {record_rows}→{len(tasks)} 件"
+            f"（計 {len(input_data) - len(searched) + record_rows - len(tasks)} 件の問い合わせを削減）"
+        )
+        
+        # Step 3: 概要ファイル作成（個別ファイルはStep 2で保存済み）
+        self.logger.info("STEP3: データ保存")
         summary_path = output_dir / f"compounds_full_data_summary_{timestamp}.json"
         self.full_data_client.create_compound_summary(compounds_with_data, summary_path)
         
         # 統計情報
         self._log_statistics(compounds_with_data, individual_dir, summary_path)
     
+    def _record(self, stage: str, items: List[Tuple]) -> None:
+        """結果をチェックポイントに記録"""
+        if self.checkpoint is not None:
+            self.checkpoint.record_many(stage, items)
+    
     def _log_statistics(self, compounds_data: List[Tuple], individual_dir: Path, summary_path: Path) -> None:
         """処理結果の統計情報をログ出力"""
         total_compounds = len(compounds_data)
         successful_retrievals = sum(1 for _, _, _, data in compounds_data if data is not None)
         failed_retrievals = total_compounds - successful_retrievals
         
-        # データサイズ統計
-        total_size = sum(len(json.dumps(data)) for _, _, _, data in compounds_data if data is not None)
+        # データサイズ統計（保存したファイルのバイト数）
+        total_size = sum(record.size_bytes for _, _, _, record in compounds_data if record is not None)
         avg_size = total_size / successful_retrievals if successful_retrievals > 0 else 0
         
         self.logger.info("✅ 完全データ取得処理完了:")
@@ -108,8 +188,8 @@ class FullDataProcessor:
         self.logger.info(f"  取得成功: {successful_retrievals} 件")
         self.logger.info(f"  取得失敗: {failed_retrievals} 件")
         self.logger.info(f"  成功率: {successful_retrievals/total_compounds*100:.1f}%")
-        self.logger.info(f"  平均データサイズ: {avg_size:,.0f} 文字")
-        self.logger.info(f"  総データサイズ: {total_size:,} 文字")
+        self.logger.info(f"  平均データサイズ: {avg_size:,.0f} バイト")
+        self.logger.info(f"  総データサイズ: {total_size:,} バイト")
         self.logger.info(f"  個別ファイル: {individual_dir}")
         self.logger.info(f"  概要ファイル: {summary_path}")
 
@@ -135,14 +215,13 @@ class FullDataAnalyzer:
         self.logger.info(f"プロパティ抽出開始: {full_data_dir}")
         
         extracted_data = {}
-        json_files = list(full_data_dir.glob("*.json"))
+        json_files = list(iter_record_files(full_data_dir))
         
         for json_file in tqdm(json_files, desc="プロパティ抽出"):
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = load_record(json_file)
                 
-                compound_id = json_file.stem.split('_')[0]
+                compound_id = record_stem(json_file).split('_')[0]
                 extracted_data[compound_id] = self._extract_properties_from_data(
                     data, properties_of_interest
                 )
@@ -158,31 +237,33 @@ class FullDataAnalyzer:
         完全データから指定されたプロパティを抽出する内部メソッド
         """
         extracted = {}
+        # Section階層の走査は1回だけ行い、各プロパティは索引から取得
+        index = RecordIndex.from_data(full_data)
         
         # 実装例：分子量、SMILES、分子式など
         if "Molecular Weight" in properties_of_interest:
             extracted["molecular_weight"] = self._find_property_value(
-                full_data, "Molecular Weight"
+                index, "Molecular Weight"
             )
         
         if "SMILES" in properties_of_interest:
             extracted["smiles"] = self._find_property_value(
-                full_data, "SMILES"
+                index, "SMILES"
             )
         
         if "Molecular Formula" in properties_of_interest:
             extracted["molecular_formula"] = self._find_property_value(
-                full_data, "Molecular Formula"
+                index, "Molecular Formula"
             )
         
         # 他のプロパティも同様に追加可能
         
         return extracted
     
-    def _find_property_value(self, data: Dict, property_name: str) -> Optional[str]:
+    def _find_property_value(self, index: Optional[RecordIndex], property_name: str) -> Optional[str]:
         """
-        完全データから特定のプロパティ値を検索
+        完全データの索引から特定のプロパティ値を検索（TOCHeadingにproperty_nameを含む最初のセクションの値）
         """
-        # PubChemのJSON構造を再帰的に検索する実装
-        # 実際の実装では、PubChemの構造に合わせて詳細に実装する必要がある
-        return None  # プレースホルダー
\ No newline at end of file
+        if index is None:
+            return None
+        return index.first_value(property_name)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Pipelined execution of the search, property and CAS stages
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+from tqdm import tqdm
+
+try:
+    from itertools import batched
+except ImportError:
+    from more_itertools import batched
+
+from src.data.processor import CompoundDataProcessor
+from src.pubchem.batching import AdaptiveChunkSizer
+from src.pubchem.session import get_session
+from config.settings import CAS_BATCH_SIZE, PIPELINE_QUEUE_SIZE, PIPELINE_FLUSH_SECONDS
+
+_END = object()  # キュー終端の目印
+
+
+class CompoundPipeline:
+    """
+    CID/SID検索・プロパティ取得・CAS取得を並行実行するパイプライン
+
+    - 検索ステージ: CASをCAS_BATCH_SIZE件ずつ一括検索し、解決したCIDを順次下流のキューへ送る
+    - プロパティステージ: CIDを適応的バッチサイズ分たまり次第取得（SIDは検索完了後に一括取得）
+    - CASステージ: CIDをCAS_BATCH_SIZE件たまり次第取得
+    ステージ間は上限付きキューで接続し、全リクエストは共有レートリミッターを通るため、
+    全体の所要時間は3ステージの合計ではなく最も遅いステージに近づく。
+    結果のDataFrame・all_idsはCompoundDataProcessorの逐次実行と同じ形式。
+    """
+
+    def __init__(self, processor: CompoundDataProcessor, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 flush_seconds: float = PIPELINE_FLUSH_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.processor = processor
+        self.client = processor.pubchem_client
+        self.queue_size = queue_size
+        self.flush_seconds = flush_seconds
+        self._sizer = AdaptiveChunkSizer()
+        self._lock = threading.Lock()
+
+    def run(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict, List[Tuple]]:
+        """
+        パイプラインを実行
+
+        Returns:
+            (DataFrame, all_ids, 検索失敗リスト)
+        """
+        self.logger.info("パイプライン実行開始: 検索・プロパティ取得・CAS取得を並行処理")
+        get_session(workers=3)
+
+        property_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        cas_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        cid_props: Dict[int, dict] = {}
+        cas_map: Dict[int, List[Tuple[str, str]]] = {}
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+            property_future = executor.submit(
+                self._consume, property_queue, lambda: self._sizer.size, self._fetch_properties, cid_props, "プロパティ"
+            )
+            cas_future = executor.submit(
+                self._consume, cas_queue, lambda: CAS_BATCH_SIZE, self._fetch_cas, cas_map, "CAS"
+            )
+            try:
+                df, notfound = self._search(df, (property_queue, cas_queue))
+            finally:
+                property_queue.put(_END)
+                cas_queue.put(_END)
+            property_future.result()
+            cas_future.result()
+
+        # SIDは件数が少なく後続ステージも無いため、検索完了後にまとめて取得
+        sid_props = {}
+        successful_sids = df["SID"].dropna().astype(int).tolist()
+        if successful_sids:
+            self.logger.info(f"SIDプロパティ取得: {len(successful_sids)} 件")
+            sid_props = self.client.fetch_sid_properties_batched(successful_sids)
+
+        df = self.processor.apply_properties(df, cid_props, sid_props)
+        df, all_ids = self.processor.apply_cas_information(df, cas_map)
+        self.logger.info(
+            f"パイプライン実行完了: プロパティ {len(cid_props)} 件, CAS {len(cas_map)} CID"
+        )
+        return df, all_ids, notfound
+
+    def _search(self, df: pd.DataFrame, downstream: Tuple[queue.Queue, ...]) -> Tuple[pd.DataFrame, List[Tuple]]:
+        """検索ステージ: 解決したCIDを下流キューへ送りながらDataFrameに設定"""
+        notfound = []
+        found: Dict[object, Tuple[str, int]] = {}
+        counts = {"CID": 0, "SID": 0}
+        sent = set()
+        progress_bar = tqdm(total=len(df), desc="CID/SID検索")
+
+        for chunk in batched(list(df.index), CAS_BATCH_SIZE):
+            known_results = self.processor.bulk_search(df.loc[list(chunk), "original_cas"].tolist())
+            for idx in chunk:
+                cas_number = df.at[idx, "original_cas"]
+                search_result = self.processor.resolve_cas(cas_number, known_results)
+
+                match = self.processor.classify_search_result(idx, cas_number, search_result)
+                progress_bar.update(1)
+                if match is None:
+                    notfound.append((idx, df.at[idx, "inci_name"], cas_number))
+                    continue
+                found[idx] = match
+                counts[match[0]] += 1
+                if match[0] == "CID" and match[1] not in sent:
+                    sent.add(match[1])
+                    for q in downstream:
+                        q.put(match[1])
+            progress_bar.set_description(f"検索 (CID: {counts['CID']}, SID: {counts['SID']})")
+
+        progress_bar.close()
+        df = self.processor.apply_search_results(df, found)
+        self.logger.info(f"検索ステージ完了: CID {len(sent)} 件（重複除く）, 失敗 {len(notfound)} 件")
+        return df, notfound
+
+    def _consume(self, source: queue.Queue, batch_size: Callable[[], int],
+                 fetch: Callable[[List[int]], Dict], results: Dict, label: str) -> None:
+        """
+        下流ステージ: キューからCIDを受け取り、バッチがたまるか入力が途切れたら取得
+
+        バッチ単位の失敗はログに記録して処理を続ける（上流がキュー満杯で停止しないよう常に消費し続ける）。
+        """
+        pending: List[int] = []
+        finished = False
+        while not finished:
+            try:
+                item = source.get(timeout=self.flush_seconds)
+                if item is _END:
+                    finished = True
+                else:
+                    pending.append(item)
+                    if len(pending) < batch_size():
+                        continue
+            except queue.Empty:
+                pass
+
+            if pending:
+                try:
+                    fetched = fetch(pending)
+                    with self._lock:
+                        results.update(fetched)
+                except Exception as e:
+                    self.logger.error(f"{label}ステージ: {len(pending)} CID の取得失敗 - {e}")
+                pending = []
+
+    def _fetch_properties(self, cids: List[int]) -> Dict[int, dict]:
+        return self.processor.fetch_cid_properties(cids, sizer=self._sizer)
+
+    def _fetch_cas(self, cids: List[int]) -> Dict[int, List[Tuple[str, str]]]:
+        return self.processor.fetch_cas_map(cids)
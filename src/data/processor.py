@@ -1,34 +1,58 @@
 """
 Data processing and transformation functions
 """
-import json
 import logging
 import datetime
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import pandas as pd
 from tqdm import tqdm
 
 from src.pubchem.client import PubChemClient
-from src.pubchem.models import CompoundInfo
-from config.settings import OUTPUT_TIMESTAMP_FORMAT, SLEEP_CID
-import time
+from src.pubchem.async_client import ConcurrentPubChemClient
+from src.pubchem.models import CompoundInfo, SearchResult
+from src.pubchem.cache import get_negative_cache
+from src.pubchem.batching import AdaptiveChunkSizer
+from src.pubchem.utils import normalize_cas
+from src.pubchem.json_codec import get_json_codec
+from src.data.checkpoint import CheckpointJournal
+from config.settings import OUTPUT_TIMESTAMP_FORMAT, BASE_PROPERTY_FIELDS
 
 
 class CompoundDataProcessor:
     """化合物データの処理を担当するクラス"""
     
-    def __init__(self):
+    def __init__(self, properties: Optional[List[str]] = None, checkpoint: Optional[CheckpointJournal] = None,
+                 memo_size: Optional[int] = None, use_async: bool = False):
+        """
+        Args:
+            properties: 取得するプロパティ名（Noneは既定のプロパティ）
+            checkpoint: 結果を記録・再利用するチェックポイント
+            memo_size: 検索結果を保持するCASの上限（ストリーミングモード用、Noneは無制限）。
+                指定した場合は最近のCASのみ保持し、チェックポイントの記録もメモリに読み込まず必要な分だけ参照する
+            use_async: Trueの場合、各ステップのバッチと個別CAS検索をasyncioで並行実行する（ConcurrentPubChemClient）
+        """
         self.logger = logging.getLogger(__name__)
-        self.pubchem_client = PubChemClient()
+        client_class = ConcurrentPubChemClient if use_async else PubChemClient
+        self.pubchem_client = client_class(properties=properties)
+        self.checkpoint = checkpoint
+        self.memo_size = memo_size
+        self._journaled: Dict[str, Dict[str, object]] = {}
+        # 正規化CAS → 検索結果（重複行は再検索しない、memo_size指定時は最近使ったものから保持）
+        self._search_memo: "OrderedDict[str, SearchResult]" = OrderedDict()
+    
+    @property
+    def extra_properties(self) -> List[str]:
+        """Title/SMILES以外に取得するプロパティ（DataFrameではプロパティ名をそのまま列名に使用）"""
+        return [p for p in self.pubchem_client.properties if p not in BASE_PROPERTY_FIELDS]
     
     def load_json_data(self, json_path: Path) -> List[Dict]:
         """JSONファイルから化合物データを読み込み"""
         self.logger.info(f"JSONファイル読み込み: {json_path}")
         
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = get_json_codec().load(json_path)
             self.logger.info(f"JSONデータ読み込み完了: {len(data)} 件")
             return data
         except Exception as e:
@@ -36,13 +60,13 @@ class CompoundDataProcessor:
             raise
     
     def validate_and_filter_data(self, data: List[Dict]) -> List[Dict]:
-        """有効なCAS番号を持つデータのみフィルタリング"""
+        """有効なCAS番号を持つデータのみフィルタリング（全角数字・各種ハイフンは正規化してから判定）"""
         from src.pubchem.utils import validate_cas
         
         valid_data = []
         for item in data:
             cas_number = item.get("cas", "").strip()
-            if validate_cas(cas_number):
+            if validate_cas(normalize_cas(cas_number)):
                 valid_data.append(item)
         
         self.logger.info(f"有効なCAS番号を持つデータ: {len(valid_data)} 件 / {len(data)} 件")
@@ -51,6 +75,7 @@ class CompoundDataProcessor:
     def create_dataframe(self, data: List[Dict]) -> pd.DataFrame:
         """化合物データからDataFrameを作成"""
         df_data = []
+        extra_columns = {name: pd.NA for name in self.extra_properties}
         for item in data:
             inci_name = item.get("inci", "").strip()
             function = item.get("function", "").strip()
@@ -66,6 +91,7 @@ class CompoundDataProcessor:
                 "CAS": pd.NA,
                 "SMILES": pd.NA,
                 "IsomericSM": pd.NA,
+                **extra_columns,
                 "Data_Source": pd.NA  # "CID" or "SID"
             })
         
@@ -78,102 +104,254 @@ class CompoundDataProcessor:
         self.logger.info("STEP1: CAS番号からCID/SID検索開始")
         notfound = []
         
-        progress_bar = tqdm(df.iterrows(), total=len(df), desc="CID/SID検索")
+        # POSTによる一括検索・チェックポイントで解決できたCASは個別検索を省略
+        known_results = self.bulk_search(df["original_cas"].tolist())
         
-        for idx, row in progress_bar:
-            cas_number = row["original_cas"]
-            
-            search_result = self.pubchem_client.get_cid_from_cas(cas_number)
+        # 結果は行インデックス → (種別, ID) に集約し、最後に列単位で設定
+        found: Dict[object, Tuple[str, int]] = {}
+        counts = {"CID": 0, "SID": 0}
+        rows = zip(df.index, df["original_cas"], df["inci_name"])
+        progress_bar = tqdm(rows, total=len(df), desc="CID/SID検索")
+        
+        for idx, cas_number, inci_name in progress_bar:
+            search_result = self.resolve_cas(cas_number, known_results)
             
-            if search_result.cids:
-                # CIDが見つかった場合
-                df.at[idx, "CID"] = search_result.cids[0]
-                df.at[idx, "Data_Source"] = "CID"
-                self.logger.debug(f"行 {idx}: CAS '{cas_number}' → CID {search_result.cids[0]}")
-            elif search_result.sids:
-                # SIDのみ見つかった場合
-                df.at[idx, "SID"] = search_result.sids[0]
-                df.at[idx, "Data_Source"] = "SID"
-                self.logger.debug(f"行 {idx}: CAS '{cas_number}' → SID {search_result.sids[0]}")
-            else:
-                # 何も見つからない場合
-                notfound.append((idx, row["inci_name"], cas_number))
-                self.logger.warning(f"行 {idx}: CAS '{cas_number}' の検索失敗")
+            match = self.classify_search_result(idx, cas_number, search_result)
+            if match is None:
+                notfound.append((idx, inci_name, cas_number))
                 continue
+            found[idx] = match
+            counts[match[0]] += 1
             
-            # プログレスバーの説明を更新
-            cid_count = df["CID"].notna().sum()
-            sid_count = df["SID"].notna().sum()
-            progress_bar.set_description(f"検索 (CID: {cid_count}, SID: {sid_count})")
-            
-            time.sleep(SLEEP_CID)
+            # プログレスバーの説明を更新（件数は逐次カウント）
+            progress_bar.set_description(f"検索 (CID: {counts['CID']}, SID: {counts['SID']})")
         
-        successful_cids = df["CID"].dropna().astype(int).tolist()
-        successful_sids = df["SID"].dropna().astype(int).tolist()
-        self.logger.info(f"STEP1完了: CID {len(successful_cids)} 件, SID {len(successful_sids)} 件取得成功")
+        df = self.apply_search_results(df, found)
+        self.logger.info(f"STEP1完了: CID {counts['CID']} 件, SID {counts['SID']} 件取得成功")
         
         return df, notfound
     
+    def bulk_search(self, cas_numbers: List[str]) -> Dict[str, SearchResult]:
+        """
+        チェックポイント記録済みの結果と、未記録分のPOST一括検索の結果を取得
+        
+        CASは正規化して重複を除いてから検索する（既に解決済みのCASは対象外）。
+        
+        Returns:
+            cas_numbersのうち解決済みのCAS（正規化CAS番号 → SearchResult、含まれないCASは個別検索の対象）
+        """
+        requested = list(dict.fromkeys(normalize_cas(c) for c in cas_numbers))
+        known = {cas: self._search_memo[cas] for cas in requested if cas in self._search_memo}
+        unique_cas = [cas for cas in requested if cas not in known]
+        
+        journaled = self._journal_lookup(CheckpointJournal.SEARCH, unique_cas)
+        reused = {cas: CheckpointJournal.search_result_from_dict(journaled[cas])
+                  for cas in unique_cas if cas in journaled}
+        if reused:
+            self.logger.info(f"チェックポイントから検索結果を再利用: {len(reused)} 件")
+        
+        remaining = [cas for cas in unique_cas if cas not in reused]
+        bulk_results = self.pubchem_client.get_cids_from_cas_bulk(remaining) if remaining else {}
+        self._record_journal(CheckpointJournal.SEARCH, [
+            (cas, CheckpointJournal.search_result_to_dict(result)) for cas, result in bulk_results.items()
+        ])
+        known.update(reused)
+        known.update(bulk_results)
+        for cas, result in known.items():
+            self._remember(cas, result)
+        return known
+    
+    def resolve_cas(self, cas_number: str, known_results: Dict[str, SearchResult]) -> SearchResult:
+        """
+        CAS番号の検索結果を取得（同じ正規化CASは1回だけ検索し、結果を全ての行で共有）
+        
+        一括検索で未解決のCASは個別検索し、見つかった結果をチェックポイントに記録する。
+        """
+        key = normalize_cas(cas_number)
+        search_result = self._search_memo.get(key) or known_results.get(key)
+        if search_result is None:
+            search_result = self.pubchem_client.get_cid_from_cas(key)
+            # 該当なしは一時的エラーの可能性があるため記録しない（確定的な404はネガティブキャッシュが担当）
+            if search_result.cids or search_result.sids:
+                self._record_journal(CheckpointJournal.SEARCH, [
+                    (key, CheckpointJournal.search_result_to_dict(search_result))
+                ])
+        self._remember(key, search_result)
+        return search_result
+    
+    def _remember(self, cas: str, result: SearchResult) -> None:
+        """検索結果を保持（memo_size指定時は上限を超えた分を古いものから破棄）"""
+        self._search_memo[cas] = result
+        if self.memo_size is not None:
+            self._search_memo.move_to_end(cas)
+            while len(self._search_memo) > self.memo_size:
+                self._search_memo.popitem(last=False)
+    
+    def classify_search_result(self, idx, cas_number: str,
+                               search_result: SearchResult) -> Optional[Tuple[str, int]]:
+        """
+        検索結果から行に設定するIDを決定（CIDを優先、無ければSID）
+        
+        Returns:
+            ("CID" または "SID", ID)、何も見つからない場合はNone
+        """
+        if search_result.cids:
+            # CIDが見つかった場合
+            self.logger.debug(f"行 {idx}: CAS '{cas_number}' → CID {search_result.cids[0]}")
+            return "CID", search_result.cids[0]
+        if search_result.sids:
+            # SIDのみ見つかった場合
+            self.logger.debug(f"行 {idx}: CAS '{cas_number}' → SID {search_result.sids[0]}")
+            return "SID", search_result.sids[0]
+        # 何も見つからない場合
+        self.logger.warning(f"行 {idx}: CAS '{cas_number}' の検索失敗")
+        return None
+    
+    def apply_search_results(self, df: pd.DataFrame, found: Dict[object, Tuple[str, int]]) -> pd.DataFrame:
+        """行インデックス → (種別, ID) の検索結果をCID/SID/Data_Source列にまとめて設定"""
+        self._assign_column(df, "CID", {idx: value for idx, (kind, value) in found.items() if kind == "CID"})
+        self._assign_column(df, "SID", {idx: value for idx, (kind, value) in found.items() if kind == "SID"})
+        self._assign_column(df, "Data_Source", {idx: kind for idx, (kind, _) in found.items()})
+        return df
+    
+    @staticmethod
+    def _assign_column(df: pd.DataFrame, column: str, values: Dict) -> None:
+        """行インデックス → 値 の辞書を1回の列代入で設定（object型を維持）"""
+        if values:
+            df.loc[list(values.keys()), column] = pd.Series(values, dtype=object)
+    
     def fetch_properties(self, df: pd.DataFrame) -> pd.DataFrame:
         """CIDおよびSIDからプロパティを取得"""
         self.logger.info("STEP2: プロパティ取得開始")
         
         # CIDのプロパティをバッチ取得
         successful_cids = df["CID"].dropna().astype(int).tolist()
-        cid_props = self.pubchem_client.fetch_properties_batched(successful_cids)
+        cid_props = self.fetch_cid_properties(successful_cids)
         
-        # SIDのプロパティを個別取得
+        # SIDのプロパティをバッチ取得
         successful_sids = df["SID"].dropna().astype(int).tolist()
         sid_props = {}
         if successful_sids:
             self.logger.info(f"SIDプロパティ取得: {len(successful_sids)} 件")
-            for sid in tqdm(successful_sids, desc="SIDプロパティ"):
-                sid_props[sid] = self.pubchem_client.get_sid_properties(sid)
-                time.sleep(SLEEP_CID)
-        
-        # DataFrameにプロパティを設定
-        for idx, row in df.iterrows():
-            if pd.notna(row["CID"]):
-                # CIDからのプロパティ
-                cid = int(row["CID"])
-                p = cid_props.get(cid, {})
-                df.at[idx, "Title"] = p.get("Title")
-                df.at[idx, "SMILES"] = p.get("CanonicalSMILES")
-                df.at[idx, "IsomericSM"] = p.get("IsomericSMILES")
-            elif pd.notna(row["SID"]):
-                # SIDからのプロパティ
-                sid = int(row["SID"])
-                p = sid_props.get(sid, {})
-                df.at[idx, "Title"] = p.get("Title", "SID Record")
-                
-                # SIDからSMILES情報を取得（利用可能な場合）
-                df.at[idx, "SMILES"] = p.get("SMILES", pd.NA)
-                df.at[idx, "IsomericSM"] = p.get("IsomericSMILES", pd.NA)
-                
-                # 関連CIDがある場合は記録
-                if "Related_CIDs" in p:
-                    self.logger.info(f"SID {sid}: 関連CID {p['Related_CIDs']}")
-                
-                # SMILES取得状況をログ出力
-                smiles_available = pd.notna(df.at[idx, "SMILES"]) or pd.notna(df.at[idx, "IsomericSM"])
-                if smiles_available:
-                    self.logger.info(f"SID {sid}: SMILES取得成功")
-                else:
-                    self.logger.debug(f"SID {sid}: SMILES取得不可")
+            sid_props = self.pubchem_client.fetch_sid_properties_batched(successful_sids)
         
+        df = self.apply_properties(df, cid_props, sid_props)
         self.logger.info("STEP2完了: プロパティ設定完了")
         return df
     
+    def fetch_cid_properties(self, cids: List[int], sizer: Optional[AdaptiveChunkSizer] = None) -> Dict[int, dict]:
+        """CIDのプロパティを取得（チェックポイント記録済みのCIDは再取得しない）"""
+        cids = list(dict.fromkeys(cids))
+        journaled = self._journal_lookup(CheckpointJournal.PROPERTY, cids)
+        props = {cid: journaled[str(cid)] for cid in cids if str(cid) in journaled}
+        missing = [cid for cid in cids if cid not in props]
+        if props:
+            self.logger.info(f"チェックポイントからプロパティを再利用: {len(props)} 件")
+        if missing:
+            # バッチ完了ごとに記録し、途中で中断しても完了済みのバッチは再取得しない
+            fetched = self.pubchem_client.fetch_properties_batched(
+                missing, sizer=sizer,
+                on_batch=lambda batch: self._record_journal(CheckpointJournal.PROPERTY, batch.items()),
+            )
+            props.update(fetched)
+        return props
+    
+    def apply_properties(self, df: pd.DataFrame, cid_props: Dict[int, dict], sid_props: Dict[int, dict]) -> pd.DataFrame:
+        """取得済みのCID/SIDプロパティをDataFrameに列単位で設定"""
+        cid_rows = df["CID"].dropna()
+        cid_records = [cid_props.get(int(cid), {}) for cid in cid_rows]
+        sid_rows = df.loc[df["CID"].isna(), "SID"].dropna()
+        sid_records = [sid_props.get(int(sid), {}) for sid in sid_rows]
+        
+        def assign(rows: pd.Series, records: List[dict], column: str, key: str, default=None) -> None:
+            self._assign_column(df, column, dict(zip(rows.index, (p.get(key, default) for p in records))))
+        
+        # CIDからのプロパティ
+        assign(cid_rows, cid_records, "Title", "Title")
+        assign(cid_rows, cid_records, "SMILES", "CanonicalSMILES")
+        assign(cid_rows, cid_records, "IsomericSM", "IsomericSMILES")
+        for name in self.extra_properties:
+            assign(cid_rows, cid_records, name, name, pd.NA)
+        
+        # SIDからのプロパティ（SMILES情報は利用可能な場合のみ）
+        assign(sid_rows, sid_records, "Title", "Title", "SID Record")
+        assign(sid_rows, sid_records, "SMILES", "SMILES", pd.NA)
+        assign(sid_rows, sid_records, "IsomericSM", "IsomericSMILES", pd.NA)
+        
+        for sid in dict.fromkeys(int(sid) for sid in sid_rows):
+            p = sid_props.get(sid, {})
+            # 関連CIDがある場合は記録
+            if "Related_CIDs" in p:
+                self.logger.info(f"SID {sid}: 関連CID {p['Related_CIDs']}")
+            
+            # SMILES取得状況をログ出力
+            if p.get("SMILES") is not None or p.get("IsomericSMILES") is not None:
+                self.logger.info(f"SID {sid}: SMILES取得成功")
+            else:
+                self.logger.debug(f"SID {sid}: SMILES取得不可")
+        
+        return df
+    
     def fetch_cas_information(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
         """CIDからCAS情報を取得"""
         self.logger.info("STEP3: CAS 取得開始")
         
         successful_cids = df["CID"].dropna().astype(int).tolist()
-        cas_map = self.pubchem_client.fetch_cas_parallel(successful_cids, workers=2)
+        cas_map = self.fetch_cas_map(successful_cids)
+        
+        df, all_ids = self.apply_cas_information(df, cas_map)
+        self.logger.info("STEP3完了: CAS情報設定完了")
+        return df, all_ids
+    
+    def fetch_cas_map(self, cids: List[int]) -> Dict[int, List[Tuple[str, str]]]:
+        """CIDのCAS情報を取得（チェックポイント記録済みのCIDは再取得しない）"""
+        cids = list(dict.fromkeys(cids))
+        journaled = self._journal_lookup(CheckpointJournal.CAS, cids)
+        cas_map = {cid: CheckpointJournal.cas_pairs_from_list(journaled[str(cid)])
+                   for cid in cids if str(cid) in journaled}
+        missing = [cid for cid in cids if cid not in cas_map]
+        if cas_map:
+            self.logger.info(f"チェックポイントからCAS情報を再利用: {len(cas_map)} 件")
+        if missing:
+            fetched = self.pubchem_client.fetch_cas_batched(
+                missing, on_batch=lambda batch: self._record_journal(CheckpointJournal.CAS, batch.items())
+            )
+            cas_map.update(fetched)
+        return cas_map
+    
+    def _journal_lookup(self, stage: str, keys) -> Dict[str, object]:
+        """
+        チェックポイントの記録済みの値のうち、keysに該当するもの（キーは文字列）
         
+        memo_size指定時（ストリーミングモード）は必要なキーのみSQLiteから取得し、
+        それ以外はステージの記録を初回に全て読み込んで以降はメモリ上で参照する。
+        """
+        if self.checkpoint is None:
+            return {}
+        keys = [str(key) for key in keys]
+        if self.memo_size is not None:
+            return self.checkpoint.get_many(stage, keys)
+        if stage not in self._journaled:
+            self._journaled[stage] = self.checkpoint.load(stage)
+        journaled = self._journaled[stage]
+        return {key: journaled[key] for key in keys if key in journaled}
+    
+    def _record_journal(self, stage: str, items) -> None:
+        """結果をチェックポイントに記録"""
+        if self.checkpoint is None:
+            return
+        items = list(items)
+        self.checkpoint.record_many(stage, items)
+        if stage in self._journaled:
+            self._journaled[stage].update((str(key), value) for key, value in items)
+    
+    def apply_cas_information(self, df: pd.DataFrame,
+                              cas_map: Dict[int, List[Tuple[str, str]]]) -> Tuple[pd.DataFrame, Dict]:
+        """取得済みのCAS情報をDataFrameに設定し、all_ids用のデータを構築"""
         all_ids = {}
+        cas_values = {}
         
-        for idx, row in df.iterrows():
+        for idx, row in zip(df.index, df.to_dict("records")):
             if pd.notna(row["CID"]):
                 # CIDの場合：詳細なCAS情報を取得
                 cid = int(row["CID"])
@@ -181,11 +359,11 @@ class CompoundDataProcessor:
                 
                 if not pairs:
                     # CASが見つからなくても、元のCASを使用
-                    df.at[idx, "CAS"] = row["original_cas"]
+                    cas_values[idx] = row["original_cas"]
                     self.logger.info(f"行 {idx}: CID {cid} のCAS情報なし、元のCAS使用")
                 else:
                     cid_sel, cas_sel = self.pubchem_client.choose_best_cas({str(cid): pairs}, row["original_cas"])
-                    df.at[idx, "CAS"] = cas_sel if cas_sel else row["original_cas"]
+                    cas_values[idx] = cas_sel if cas_sel else row["original_cas"]
                 
                 # all_ids用のデータ構築（CID）
                 all_ids[str(idx)] = {
@@ -202,12 +380,13 @@ class CompoundDataProcessor:
                     "Title": row["Title"],
                     "SMILES": row["SMILES"],
                     "IsomericSMILES": row["IsomericSM"],
+                    **self._extra_property_values(row),
                 }
                 
             elif pd.notna(row["SID"]):
                 # SIDの場合：元のCASのみ使用
                 sid = int(row["SID"])
-                df.at[idx, "CAS"] = row["original_cas"]
+                cas_values[idx] = row["original_cas"]
                 
                 # all_ids用のデータ構築（SID）
                 all_ids[str(idx)] = {
@@ -224,11 +403,16 @@ class CompoundDataProcessor:
                     "Title": row["Title"],
                     "SMILES": row["SMILES"] if pd.notna(row["SMILES"]) else None,
                     "IsomericSMILES": row["IsomericSM"] if pd.notna(row["IsomericSM"]) else None,
+                    **self._extra_property_values(row),
                 }
         
-        self.logger.info("STEP3完了: CAS情報設定完了")
+        self._assign_column(df, "CAS", cas_values)
         return df, all_ids
     
+    def _extra_property_values(self, row: Dict) -> Dict:
+        """all_ids用に追加プロパティの値を取得（欠損はNone）"""
+        return {name: row[name] if pd.notna(row[name]) else None for name in self.extra_properties}
+    
     def save_results(self, df: pd.DataFrame, all_ids: Dict, notfound: List[Tuple], json_path: Path) -> None:
         """結果をファイルに保存"""
         timestamp = datetime.datetime.now().strftime(OUTPUT_TIMESTAMP_FORMAT)
@@ -240,8 +424,7 @@ class CompoundDataProcessor:
         df.to_csv(out_csv, index=False, encoding="utf-8-sig")
         self.logger.info(f"CSV保存完了: {out_csv.name}")
         
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump(all_ids, f, ensure_ascii=False, indent=2)
+        get_json_codec().dump(all_ids, out_json)
         self.logger.info(f"JSON保存完了: {out_json.name}")
         
         # 統計情報をログ出力
@@ -250,10 +433,20 @@ class CompoundDataProcessor:
         # 失敗記録の保存
         if notfound:
             miss_file = json_path.with_name(f"{json_path.stem}_miss_{timestamp}.json")
-            with open(miss_file, "w", encoding="utf-8") as f:
-                json.dump([{"row": i, "inci_name": n, "cas": c} for i, n, c in notfound], 
-                         f, ensure_ascii=False, indent=2)
+            get_json_codec().dump([{"row": i, "inci_name": n, "cas": c} for i, n, c in notfound], miss_file)
             self.logger.info(f"失敗記録: {len(notfound)} 行 → {miss_file.name}")
+            self._check_negative_cache(miss_file)
+    
+    def _check_negative_cache(self, miss_file: Path) -> None:
+        """失敗記録をネガティブキャッシュと照合し、次回スキップされる件数をログ出力"""
+        negative = get_negative_cache()
+        if negative is None:
+            return
+        checked = negative.check_miss_file(miss_file)
+        self.logger.info(
+            f"  ネガティブキャッシュ照合: 次回即時スキップ {len(checked['cached'])} 件, "
+            f"次回再検索 {len(checked['uncached'])} 件（一時的エラー等）"
+        )
     
     def _log_statistics(self, df: pd.DataFrame, notfound: List[Tuple], out_csv: Path, out_json: Path) -> None:
         """処理結果の統計情報をログ出力"""
@@ -274,5 +467,20 @@ class CompoundDataProcessor:
         self.logger.info(f"  全体成功率: {total_success}/{total_records} 件 ({total_success/total_records*100:.1f}%)")
         self.logger.info(f"  CAS取得成功: {cas_success}/{total_records} 件")
         self.logger.info(f"  SMILES取得: {smiles_total}/{total_records} 件 (CID: {smiles_from_cid}, SID: {smiles_from_sid})")
+        self._log_dedup_statistics(df)
         self.logger.info(f"  CSV結果: {out_csv.name}")
-        self.logger.info(f"  JSON詳細: {out_json.name}")
\ No newline at end of file
+        self.logger.info(f"  JSON詳細: {out_json.name}")
+    
+    def _log_dedup_statistics(self, df: pd.DataFrame) -> None:
+        """重複排除による削減件数をログ出力（行数 → 実際に問い合わせた一意な件数）"""
+        cas_rows = len(df)
+        cas_unique = df["original_cas"].map(normalize_cas).nunique()
+        cid_rows = int(df["CID"].notna().sum())
+        cid_unique = df["CID"].dropna().nunique()
+        sid_rows = int(df["SID"].notna().sum())
+        sid_unique = df["SID"].dropna().nunique()
+        saved = (cas_rows - cas_unique) + (cid_rows - cid_unique) + (sid_rows - sid_unique)
+        self.logger.info(
+            f"  重複排除: CAS検索 {cas_rows}→{cas_unique} 件, CID {cid_rows}→{cid_unique} 件, "
+            f"SID {sid_rows}→{sid_unique} 件（計 {saved} 件の問い合わせを削減）"
+        )
\ No newline at end of file
@@ -1,16 +1,63 @@
 """
 Chemical properties extraction from PubChem full data files
 """
+import heapq
 import json
 import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from src.pubchem.record_store import iter_record_files, record_stem
+from src.pubchem.partial_reader import load_record_sections
+from src.pubchem.record_index import RecordIndex
+from src.data.extraction_manifest import ExtractionManifest
+from src.pubchem.json_codec import get_json_codec
+from config.settings import EXTRACT_WORKERS
+
+# (ファイルパス, 抽出プロパティ, エラーメッセージ)
+ExtractResult = Tuple[str, Optional[Dict[str, str]], Optional[str]]
+
+
+def shard_by_size(files: List[Path], shards: int) -> List[List[Path]]:
+    """
+    ファイルサイズの合計が均等になるようにファイルを分割（大きいファイルから順に最も軽いシャードへ割り当て）
+    
+    JSONの解析時間はファイルサイズにほぼ比例するため、件数ではなくサイズで負荷を揃える。
+    """
+    shards = max(1, min(shards, len(files)))
+    heap = [(0, i) for i in range(shards)]
+    assigned: List[List[Path]] = [[] for _ in range(shards)]
+    for size, path in sorted(((path.stat().st_size, path) for path in files), reverse=True):
+        load, i = heapq.heappop(heap)
+        assigned[i].append(path)
+        heapq.heappush(heap, (load + size, i))
+    return [shard for shard in assigned if shard]
+
+
+def _extract_shard(files: List[str]) -> List[ExtractResult]:
+    """ワーカープロセスで1シャード分のファイルから物性値を抽出"""
+    extractor = PropertyExtractor()
+    results = []
+    for file_path in files:
+        try:
+            results.append((file_path, extractor.extract_properties_from_file(Path(file_path)), None))
+        except Exception as e:
+            results.append((file_path, None, str(e)))
+    return results
 
 
 class PropertyExtractor:
     """PubChemの完全データから化学物性値を抽出するクラス"""
     
+    # 抽出ロジック・抽出項目を変更したら上げる（マニフェストに記録済みの結果を無効化する）
+    VERSION = 1
+    
+    # 物性値の抽出に使う最上位セクション（他のセクションはファイルから読み込まない）
+    SECTIONS = ("Names and Identifiers", "Chemical and Physical Properties")
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
@@ -18,8 +65,10 @@ class PropertyExtractor:
         """
         個別の化合物JSONファイルから指定されたプロパティを抽出
         
+        ファイル全体は解析せず、SECTIONSの最上位セクションのみを逐次読み込みで取得する。
+        
         Args:
-            file_path: 化合物の完全データJSONファイルのパス
+            file_path: 化合物の完全データJSONファイルのパス（.json / .json.gz / .json.zst）
             
         Returns:
             抽出されたプロパティの辞書
@@ -37,31 +86,29 @@ class PropertyExtractor:
         }
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_record_sections(file_path, self.SECTIONS)
 
             # Record構造の確認
-            if 'Record' not in data:
+            if data is None:
                 self.logger.warning(f"'{file_path.name}' にRecord構造が見つかりません。")
                 return extracted_data
                 
-            record = data['Record']
+            # Section階層を1回だけ走査して索引を作成し、以降は索引から取得
+            index = RecordIndex(data['Record'])
             
-            # 1. Chemical and Physical Properties セクションを探す
-            chem_phys_section = self._find_section(record, 'Chemical and Physical Properties')
-            if chem_phys_section:
-                # Experimental Properties を探索
-                experimental_props = self._find_section(chem_phys_section, 'Experimental Properties')
-                if experimental_props:
-                    self._extract_experimental_properties(experimental_props, extracted_data, file_path.name)
-                
-                # Computed Properties も探索
-                computed_props = self._find_section(chem_phys_section, 'Computed Properties')
-                if computed_props:
-                    self._extract_computed_properties(computed_props, extracted_data, file_path.name)
+            # 1. Chemical and Physical Properties セクション
+            # Experimental Properties を探索
+            experimental_props = index.section('Chemical and Physical Properties', 'Experimental Properties')
+            if experimental_props:
+                self._extract_experimental_properties(experimental_props, extracted_data, file_path.name)
+            
+            # Computed Properties も探索
+            computed_props = index.section('Chemical and Physical Properties', 'Computed Properties')
+            if computed_props:
+                self._extract_computed_properties(computed_props, extracted_data, file_path.name)
             
             # 2. その他のセクションからも情報を抽出
-            self._extract_additional_properties(record, extracted_data)
+            self._extract_additional_properties(index, extracted_data)
                     
         except (json.JSONDecodeError, FileNotFoundError) as e:
             self.logger.error(f"ファイル読み込みエラー {file_path}: {e}")
@@ -69,14 +116,6 @@ class PropertyExtractor:
         
         return extracted_data
     
-    def _find_section(self, parent_section: Dict, target_heading: str) -> Optional[Dict]:
-        """指定されたTOCHeadingのセクションを検索"""
-        sections = parent_section.get('Section', [])
-        for section in sections:
-            if section.get('TOCHeading') == target_heading:
-                return section
-        return None
-    
     def _extract_experimental_properties(self, experimental_section: Dict, extracted_data: Dict, filename: str):
         """Experimental Propertiesセクションから物性値を抽出"""
         self.logger.debug(f"'{filename}' の 'Experimental Properties' を探索中...")
@@ -132,7 +171,7 @@ class PropertyExtractor:
                     extracted_data['logp'] = value
                     self.logger.debug(f"    -> LogPを抽出: {value}")
     
-    def _extract_additional_properties(self, record: Dict, extracted_data: Dict):
+    def _extract_additional_properties(self, index: RecordIndex, extracted_data: Dict):
         """その他のセクションから追加プロパティを抽出"""
         # Names and Identifiers セクションからの情報抽出など
         # 必要に応じて拡張
@@ -182,41 +221,50 @@ class PropertyExtractor:
                 break
     
     def batch_extract_properties(self, individual_files_dir: Path, 
-                               summary_file_path: Path) -> Dict[str, Dict]:
+                               summary_file_path: Path, workers: int = EXTRACT_WORKERS,
+                               manifest: Optional[ExtractionManifest] = None) -> Dict[str, Dict]:
         """
         個別ファイルディレクトリから全化合物の物性値を一括抽出
         
         Args:
             individual_files_dir: 個別化合物ファイルが保存されているディレクトリ
             summary_file_path: 概要ファイル（CIDマッピング用）
+            workers: 抽出プロセス数（2以上でファイルサイズ別に分割して並列処理）
+            manifest: 抽出マニフェスト（指定時は新規・変更されたファイルのみ抽出し、他は記録済みの結果を使用）
             
         Returns:
-            CIDをキーとした抽出プロパティの辞書
+            CIDをキーとした抽出プロパティの辞書（ワーカー数に関係なくファイル名順に統合）
         """
         self.logger.info(f"物性値一括抽出開始: {individual_files_dir}")
         
         # 概要ファイルからCID情報を読み込み
         cid_mapping = {}
         if summary_file_path.exists():
-            with open(summary_file_path, 'r', encoding='utf-8') as f:
-                summary_data = json.load(f)
-                for compound in summary_data.get('compounds', []):
-                    cid = compound.get('compound_id')
-                    if cid:
-                        cid_mapping[str(cid)] = compound
+            summary_data = get_json_codec().load(summary_file_path)
+            for compound in summary_data.get('compounds', []):
+                cid = compound.get('compound_id')
+                if cid:
+                    cid_mapping[str(cid)] = compound
         
         extracted_results = {}
-        json_files = list(individual_files_dir.glob('*.json'))
+        json_files = list(iter_record_files(individual_files_dir))
         
         self.logger.info(f"{len(json_files)} 個のファイルを処理します。")
+        started = time.monotonic()
+        if manifest is None:
+            file_results = self._extract_files(json_files, workers)
+        else:
+            file_results = self._extract_changed_files(json_files, workers, manifest)
         
         for json_file in json_files:
             try:
                 # ファイル名からCIDを抽出
-                cid_str = json_file.stem.split('_')[0]
+                cid_str = record_stem(json_file).split('_')[0]
                 
-                # 物性値抽出
-                properties = self.extract_properties_from_file(json_file)
+                # 物性値抽出（結果はワーカーから受け取り済み）
+                properties, error = file_results[str(json_file)]
+                if error is not None:
+                    raise RuntimeError(error)
                 
                 # 基本情報も含める
                 result = properties.copy()
@@ -243,15 +291,56 @@ class PropertyExtractor:
             except Exception as e:
                 self.logger.error(f"ファイル処理失敗 {json_file}: {e}")
         
-        self.logger.info(f"物性値抽出完了: {len(extracted_results)} 化合物処理")
+        self.logger.info(
+            f"物性値抽出完了: {len(extracted_results)} 化合物処理 ({time.monotonic() - started:.1f}秒)"
+        )
         return extracted_results
     
+    def _extract_changed_files(self, files: List[Path], workers: int,
+                               manifest: ExtractionManifest) -> Dict[str, Tuple[Optional[Dict], Optional[str]]]:
+        """新規・変更されたファイルのみ抽出し、未変更のファイルはマニフェストの結果と統合"""
+        cached, stale = manifest.partition(files)
+        self.logger.info(f"差分抽出: 抽出済み {len(cached)} 件（記録済みの結果を使用）, 新規・変更 {len(stale)} 件")
+        
+        file_results = {file_path: (properties, None) for file_path, properties in cached.items()}
+        extracted = self._extract_files(stale, workers)
+        file_results.update(extracted)
+        
+        manifest.record_many(
+            (path, extracted[str(path)][0]) for path in stale if extracted[str(path)][1] is None
+        )
+        removed = manifest.prune()
+        if removed:
+            self.logger.info(f"削除されたファイルのみが参照していた抽出結果を削除: {removed} 件")
+        return file_results
+    
+    def _extract_files(self, files: List[Path], workers: int) -> Dict[str, Tuple[Optional[Dict], Optional[str]]]:
+        """
+        ファイルごとの抽出結果を取得（workers >= 2 ではサイズ別シャードをプロセスプールで並列処理）
+        
+        Returns:
+            ファイルパス → (抽出プロパティ, エラーメッセージ)
+        """
+        if workers <= 1 or len(files) <= 1:
+            shard_results = [_extract_shard([str(path) for path in files])]
+        else:
+            shards = shard_by_size(files, workers)
+            self.logger.info(
+                f"{len(shards)} プロセスで並列抽出（1プロセスあたり約 "
+                f"{sum(path.stat().st_size for path in files) // len(shards):,} バイト）"
+            )
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                shard_results = list(executor.map(
+                    _extract_shard, [[str(path) for path in shard] for shard in shards]
+                ))
+        return {file_path: (properties, error)
+                for results in shard_results for file_path, properties, error in results}
+    
     def save_extracted_properties(self, extracted_data: Dict[str, Dict], 
                                  output_path: Path):
         """抽出された物性値をJSONファイルに保存"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+            get_json_codec().dump(extracted_data, output_path)
             
             self.logger.info(f"抽出プロパティ保存完了: {output_path}")
             
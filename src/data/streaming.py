@@ -0,0 +1,134 @@
+"""
+Streaming JSON Lines mode for the basic fetch pipeline
+"""
+import datetime
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from itertools import batched
+except ImportError:
+    from more_itertools import batched
+
+from src.data.processor import CompoundDataProcessor
+from src.data.pipeline import CompoundPipeline
+from src.pubchem.json_codec import get_json_codec
+from config.settings import OUTPUT_TIMESTAMP_FORMAT, STREAM_CHUNK_SIZE
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    """JSON Linesファイルを1行ずつ読み込む（空行は無視）"""
+    logger = logging.getLogger(__name__)
+    codec = get_json_codec()
+    with open(path, "rb") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield codec.loads(line)
+            except ValueError as e:  # json.JSONDecodeError / orjson.JSONDecodeError はValueErrorのサブクラス
+                logger.warning(f"{path.name} {line_no}行目: JSONとして解析できないためスキップ - {e}")
+
+
+class CompoundStreamProcessor:
+    """
+    JSON Lines入力をSTREAM_CHUNK_SIZE行ずつ処理し、結果を1化合物1行のJSONLで逐次追記する
+
+    - メモリ上に保持するのは処理中のチャンクのみ（入力サイズに関わらず一定）
+      processorはmemo_sizeを指定して作成すること（検索結果は最近のCASのみ保持し、再開時の記録はSQLiteから参照）
+    - チャンクごとに書き出し・flushするため、出力ファイルをtail等で随時確認できる
+    - 結果レコードはall_idsの1エントリに "row"（入力の行番号）と "Selected_CAS"（CSVのCAS列）を加えたもの
+    - 検索失敗は *_miss_*.jsonl に {"row", "inci_name", "cas"} 形式で追記
+    """
+
+    def __init__(self, processor: CompoundDataProcessor, chunk_size: int = STREAM_CHUNK_SIZE,
+                 pipeline: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.processor = processor
+        self.chunk_size = chunk_size
+        self.pipeline = pipeline
+        self._counts = {"rows": 0, "valid": 0, "CID": 0, "SID": 0, "notfound": 0}
+
+    def process_file(self, input_path: Path, output_dir: Optional[Path] = None) -> Tuple[Path, Path]:
+        """
+        JSONLファイルを処理
+
+        Returns:
+            (結果JSONLのパス, 失敗記録JSONLのパス)
+        """
+        timestamp = datetime.datetime.now().strftime(OUTPUT_TIMESTAMP_FORMAT)
+        output_dir = output_dir or input_path.parent
+        out_path = output_dir / f"{input_path.stem}_pubchem_results_{timestamp}.jsonl"
+        miss_path = output_dir / f"{input_path.stem}_miss_{timestamp}.jsonl"
+        self.logger.info(f"ストリーミング処理開始: {input_path.name} → {out_path.name}（{self.chunk_size} 行単位）")
+
+        offset = 0
+        with open(out_path, "wb") as out, open(miss_path, "wb") as miss:
+            for chunk_idx, chunk in enumerate(batched(iter_jsonl(input_path), self.chunk_size), 1):
+                self._process_chunk(list(chunk), offset, out, miss)
+                offset += len(chunk)
+                self.logger.info(
+                    f"チャンク {chunk_idx}: 累計 {self._counts['rows']} 行処理 "
+                    f"(CID: {self._counts['CID']}, SID: {self._counts['SID']}, 失敗: {self._counts['notfound']})"
+                )
+
+        self._log_statistics(out_path, miss_path)
+        return out_path, miss_path
+
+    def _process_chunk(self, items: List[Dict], offset: int, out, miss) -> None:
+        """1チャンクを検索・プロパティ取得・CAS取得し、結果を追記"""
+        self._counts["rows"] += len(items)
+        # 入力の行番号を保持したまま有効なCASの行のみ処理
+        numbered = [(offset + i, item) for i, item in enumerate(items)]
+        valid = self.processor.validate_and_filter_data([item for _, item in numbered])
+        valid_ids = {id(item) for item in valid}
+        rows = [row for row, item in numbered if id(item) in valid_ids]
+        if not valid:
+            return
+        self._counts["valid"] += len(valid)
+
+        df = self.processor.create_dataframe(valid)
+        df.index = pd.Index(rows)
+        if self.pipeline:
+            df, all_ids, notfound = CompoundPipeline(self.processor).run(df)
+        else:
+            df, notfound = self.processor.search_compounds(df)
+            df = self.processor.fetch_properties(df)
+            df, all_ids = self.processor.fetch_cas_information(df)
+
+        codec = get_json_codec()
+        for idx in df.index:
+            record = all_ids.get(str(idx))
+            if record is None:
+                continue
+            self._counts[record["Data_Source"]] += 1
+            selected = df.at[idx, "CAS"]
+            out.write(codec.dumps({"row": int(idx), **record,
+                                   "Selected_CAS": selected if pd.notna(selected) else None},
+                                  compact=True, default=str) + b"\n")
+        for i, n, c in notfound:
+            self._counts["notfound"] += 1
+            miss.write(codec.dumps({"row": int(i), "inci_name": n, "cas": c}, compact=True) + b"\n")
+        out.flush()
+        miss.flush()
+
+    def _log_statistics(self, out_path: Path, miss_path: Path) -> None:
+        """処理結果の統計情報をログ出力"""
+        counts = self._counts
+        found = counts["CID"] + counts["SID"]
+        total = counts["valid"]
+        self.logger.info("✅ ストリーミング処理完了:")
+        self.logger.info(f"  入力: {counts['rows']} 行（有効なCAS: {total} 行）")
+        self.logger.info(f"  CID取得成功: {counts['CID']}/{total} 件")
+        self.logger.info(f"  SID取得成功: {counts['SID']}/{total} 件")
+        if total:
+            self.logger.info(f"  全体成功率: {found}/{total} 件 ({found / total * 100:.1f}%)")
+        self.logger.info(f"  JSONL結果: {out_path.name}")
+        if counts["notfound"]:
+            self.logger.info(f"  失敗記録: {counts['notfound']} 行 → {miss_path.name}")
+            self.processor._check_negative_cache(miss_path)
+        else:
+            miss_path.unlink(missing_ok=True)
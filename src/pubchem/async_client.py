@@ -0,0 +1,660 @@
+"""
+asyncio-based PubChem API client with bounded concurrency
+"""
+import asyncio
+import logging
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+try:
+    from itertools import batched
+except ImportError:
+    from more_itertools import batched
+
+from .client import PubChemClient
+from .full_data_client import PubChemFullDataClient
+from .batching import AdaptiveChunkSizer
+from .models import SearchResult
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .throttling import get_throttle_controller
+from .cache import get_response_cache, get_negative_cache, get_cached_per_id, cache_per_id
+from .utils import validate_cas, is_not_found_error
+from .json_codec import get_json_codec
+from config.settings import (
+    USER_AGENT, TIMEOUT, MAX_RETRY, RATE_LIMIT_PAUSE, ASYNC_CONCURRENCY, CAS_BATCH_SIZE,
+    SPECULATIVE_CAS_SEARCH
+)
+
+# 確定的エラー（リトライしない）
+_DEFINITIVE_STATUS = {400, 401, 403, 404, 405, 410}
+
+
+def _not_found_error(url: str, method: str = "GET") -> aiohttp.ClientResponseError:
+    """
+    ネガティブキャッシュ命中時に送出する404相当のClientResponseErrorを作成
+
+    request_infoが無いとstr(e)が失敗するため、リクエストしたURLを設定する
+    （同期版のbuild_not_found_errorに相当）。
+    """
+    request_info = aiohttp.RequestInfo(URL(url), method, CIMultiDictProxy(CIMultiDict()))
+    return aiohttp.ClientResponseError(request_info, (), status=404, message="Not Found (negative cache)")
+
+
+class AsyncPubChemClient:
+    """
+    PubChemClient / PubChemFullDataClient の非同期版
+
+    - aiohttpの単一ClientSession（Keep-Alive接続プール）を使用
+    - Semaphoreで同時実行数をconcurrencyに制限
+    - 全リクエストを同期版と共有のレートリミッター・スロットリング制御経由で発行
+    - レスポンスの解析ロジックは同期版クライアントのものを再利用
+    - 一括取得（POST）・適応的バッチサイズ・失敗バッチの二分割は同期版と同じ
+    - スクリプトの --async ではConcurrentPubChemClient経由で処理ステップから使用する
+
+    使用例:
+        async with AsyncPubChemClient() as client:
+            results = await client.get_cids_from_cas_many(cas_list)
+    """
+
+    def __init__(self, concurrency: int = ASYNC_CONCURRENCY, speculative: bool = SPECULATIVE_CAS_SEARCH,
+                 properties: Optional[List[str]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.concurrency = concurrency
+        self.speculative = speculative
+        self._sync_client = PubChemClient(properties=properties)
+        self._full_data_client = PubChemFullDataClient()
+        self._limiter = get_rate_limiter()
+        self._throttle = get_throttle_controller()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPubChemClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """ClientSessionとSemaphoreを作成（イベントループ内で呼び出すこと）"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=USER_AGENT,
+                timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        """ClientSessionをクローズ"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._semaphore = None
+
+    async def get_json(self, url: str) -> Dict:
+        """safe_getの非同期版：JSONを取得（詳細はrequest_json参照）"""
+        return await self.request_json(url)
+
+    async def post_json(self, url: str, data: Dict[str, str], cache: bool = True,
+                        retry_timeouts: bool = True) -> Dict:
+        """safe_postの非同期版：識別子リストをボディで送り、JSONを取得（キャッシュキーはURLとボディ）"""
+        return await self.request_json(url, urllib.parse.urlencode(data), use_cache=cache,
+                                       retry_timeouts=retry_timeouts)
+
+    async def request_json(self, url: str, body: Optional[str] = None, use_cache: bool = True,
+                           retry_timeouts: bool = True) -> Dict:
+        """
+        _safe_requestの非同期版：JSONを取得（bodyがあればPOST）
+        - 404等の確定的エラーは即座にaiohttp.ClientResponseErrorを送出
+        - 429はリミッター全体を停止してリトライ、500系・ネットワークエラーは指数バックオフでリトライ
+        - 同期版と共有のディスクキャッシュ・ネガティブキャッシュを参照・更新（use_cache=Falseでは使わない）
+        - retry_timeouts=Falseではタイムアウトをリトライせず即座に送出
+        """
+        method = "GET" if body is None else "POST"
+        # キャッシュはSQLite・ファイルI/Oを伴うため、イベントループを止めないよう別スレッドで実行
+        cache = get_response_cache() if use_cache else None
+        if cache is not None:
+            content = await asyncio.to_thread(cache.get, url, body)
+            if content is not None:
+                return get_json_codec().loads(content)
+        negative = get_negative_cache() if use_cache else None
+        if negative is not None and await asyncio.to_thread(negative.url_missed, url, body):
+            raise _not_found_error(url, method)
+
+        if self._session is None:
+            await self.open()
+
+        for i in range(MAX_RETRY):
+            retry_after = None
+            try:
+                await self._limiter.acquire_async()
+                async with self._semaphore:
+                    async with self._open(url, body) as response:
+                        self._throttle.observe(response.headers)
+                        if response.status < 400:
+                            content = await response.read()
+                            if cache is not None:
+                                await asyncio.to_thread(cache.put, url, content, body)
+                            return get_json_codec().loads(content)
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        response.raise_for_status()
+            except aiohttp.ClientResponseError as e:
+                if e.status in _DEFINITIVE_STATUS:
+                    self.logger.debug(f"確定的エラー {e.status}: 即座に次のエンドポイントへ")
+                    if e.status == 404 and negative is not None:
+                        await asyncio.to_thread(negative.record_url_miss, url, body)
+                    raise
+                if i >= MAX_RETRY - 1:
+                    raise
+                if e.status == 429:
+                    wait_time = retry_after if retry_after is not None else RATE_LIMIT_PAUSE + (2 ** i)
+                    self.logger.warning(f"レート制限 (試行{i+1}/{MAX_RETRY}): {wait_time}秒待機")
+                    self._throttle.on_rate_limited()
+                    self._limiter.pause(wait_time, "(HTTP 429)")
+                else:
+                    wait_time = 2 ** (i + 1)
+                    self.logger.warning(f"HTTPエラー {e.status} (試行{i+1}/{MAX_RETRY}): {wait_time}秒後リトライ")
+                    await asyncio.sleep(wait_time)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if i >= MAX_RETRY - 1 or (not retry_timeouts and isinstance(e, asyncio.TimeoutError)):
+                    raise
+                wait_time = 2 ** (i + 1)
+                self.logger.warning(f"ネットワークエラー (試行{i+1}/{MAX_RETRY}): {e} - {wait_time}秒後リトライ")
+                await asyncio.sleep(wait_time)
+
+    def _open(self, url: str, body: Optional[str]):
+        if body is None:
+            return self._session.get(url)
+        return self._session.post(url, data=body, headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+    async def get_cid_from_cas(self, cas_number: str, speculative: Optional[bool] = None) -> SearchResult:
+        """CAS番号からCID候補を取得（PubChemClient.get_cid_from_casの非同期版）"""
+        if not validate_cas(cas_number):
+            self.logger.warning(f"無効なCAS番号: {cas_number}")
+            return SearchResult([], [], False, "invalid")
+
+        cas_cleaned = cas_number.strip()
+        client = self._sync_client
+        if await asyncio.to_thread(client._is_known_cas_miss, cas_cleaned):
+            return SearchResult([], [], False, "not_found")
+
+        phases = client._cas_search_phases(cas_cleaned)
+        definitive = True
+
+        if self.speculative if speculative is None else speculative:
+            result, definitive = await self._race_cid_endpoints(cas_cleaned, phases)
+            if result is not None:
+                return result
+            phases = [phase for phase in phases if phase[2] != "CID"]
+
+        for search_type, label, id_key, urls in phases:
+            for endpoint_idx, url in enumerate(urls):
+                try:
+                    ids = client._parse_identifier_list(await self.get_json(url), id_key)
+                    if ids:
+                        return client._make_search_result(cas_cleaned, search_type, label, id_key, endpoint_idx, ids)
+                except Exception as e:
+                    definitive = definitive and is_not_found_error(e)
+                    client._log_endpoint_failure(cas_cleaned, label, endpoint_idx, e)
+                    continue
+
+        return await asyncio.to_thread(client._not_found_result, cas_cleaned, definitive)
+
+    async def _race_cid_endpoints(self, cas_cleaned: str,
+                                  phases: List[Tuple[str, str, str, List[str]]]) -> Tuple[Optional[SearchResult], bool]:
+        """PubChemClient._race_cid_endpointsの非同期版（勝者確定後は残りのタスクをキャンセル）"""
+        client = self._sync_client
+        candidates = [
+            (search_type, label, id_key, endpoint_idx, url)
+            for search_type, label, id_key, urls in phases if id_key == "CID"
+            for endpoint_idx, url in enumerate(urls)
+        ]
+        tasks = {asyncio.ensure_future(self._query_identifiers(url, id_key)): pos
+                 for pos, (_, _, id_key, _, url) in enumerate(candidates)}
+        outcomes: List[Optional[Tuple[bool, object]]] = [None] * len(candidates)
+        definitive = True
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pos = tasks[task]
+                    _, label, _, endpoint_idx, _ = candidates[pos]
+                    try:
+                        outcomes[pos] = (True, task.result())
+                    except Exception as e:
+                        outcomes[pos] = (False, e)
+                        definitive = definitive and is_not_found_error(e)
+                        client._log_endpoint_failure(cas_cleaned, label, endpoint_idx, e)
+
+                winner = client._pick_race_winner(outcomes)
+                if winner is not None:
+                    search_type, label, id_key, endpoint_idx, _ = candidates[winner]
+                    return client._make_search_result(cas_cleaned, search_type, label, id_key,
+                                                      endpoint_idx, outcomes[winner][1]), definitive
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return None, definitive
+
+    async def _query_identifiers(self, url: str, id_key: str) -> List[int]:
+        return self._sync_client._parse_identifier_list(await self.get_json(url), id_key)
+
+    async def get_sid_properties(self, sid: int) -> Dict[str, Any]:
+        """SIDから利用可能なプロパティを取得（PubChemClient.get_sid_propertiesの非同期版）"""
+        client = self._sync_client
+        try:
+            data = await self.get_json(f"{client.PUG_REST}/substance/sid/{sid}/JSON")
+            properties = {}
+
+            if "PC_Substances" in data and len(data["PC_Substances"]) > 0:
+                properties = client._parse_substance_record(sid, data["PC_Substances"][0])
+
+                # 関連CID取得試行
+                try:
+                    cid_data = await self.get_json(f"{client.PUG_REST}/substance/sid/{sid}/cids/JSON")
+                    related_cids = client._parse_related_cids(sid, cid_data)
+                    if related_cids:
+                        properties["Related_CIDs"] = related_cids
+                except Exception:
+                    pass
+
+            client._log_sid_properties(sid, properties)
+            return properties
+
+        except Exception as e:
+            self.logger.warning(f"SID {sid}: プロパティ取得失敗 - {e}")
+            return {}
+
+    async def get_cas_pairs(self, cid: int) -> List[Tuple[str, str]]:
+        """CIDからCAS番号のリストを取得（PubChemClient.get_cas_pairsの非同期版）"""
+        client = self._sync_client
+        pairs = []
+
+        try:
+            rn_data = await self.get_json(f"{client.PUG_REST}/compound/cid/{cid}/xrefs/RN/JSON")
+            pairs.extend(client._parse_preferred_cas(cid, rn_data))
+        except Exception as e:
+            self.logger.debug(f"CID {cid}: preferred CAS取得失敗 - {e}")
+
+        if client._needs_synonyms(pairs):
+            try:
+                syn_data = await self.get_json(f"{client.PUG_REST}/compound/cid/{cid}/synonyms/JSON")
+                pairs.extend(client._parse_synonym_cas(cid, syn_data))
+            except Exception as e:
+                self.logger.debug(f"CID {cid}: synonym CAS取得失敗 - {e}")
+
+        return pairs
+
+    async def get_cids_from_cas_bulk(self, cas_numbers: List[str],
+                                     batch_size: int = CAS_BATCH_SIZE) -> Dict[str, SearchResult]:
+        """複数のCAS番号をまとめてCIDに解決（PubChemClient.get_cids_from_cas_bulkの非同期版、全バッチを並行実行）"""
+        client = self._sync_client
+        targets = await asyncio.to_thread(client._bulk_search_targets, cas_numbers)
+        if not targets:
+            return {}
+
+        cached, pending = await asyncio.to_thread(get_cached_per_id, targets, client.rn_cids_url)
+        results = client._cached_search_results(cached)
+        chunks = [list(chunk) for chunk in batched(pending, batch_size)]
+        self.logger.info(f"CAS一括検索開始: {len(targets)} 件（キャッシュ済み {len(results)} 件）、"
+                         f"{len(pending)} 件を {len(chunks)} バッチで処理（非同期）")
+        for matched in await asyncio.gather(*(
+            self._bulk_search_batch(batch_idx, len(chunks), chunk) for batch_idx, chunk in enumerate(chunks, 1)
+        )):
+            results.update(matched)
+
+        self.logger.info(f"CAS一括検索完了: {len(results)}/{len(targets)} 件解決、残り {len(targets) - len(results)} 件は個別検索")
+        return results
+
+    async def _bulk_search_batch(self, batch_idx: int, total_batches: int, chunk: List[str]) -> Dict[str, SearchResult]:
+        client = self._sync_client
+        try:
+            data = await self.post_json(client.CAS_BULK_URL, {"RN": ",".join(chunk)}, cache=False)
+            cids = client._parse_identifier_list(data, "CID")
+        except Exception as e:
+            self.logger.debug(f"CAS一括検索 バッチ {batch_idx}/{total_batches}: 失敗 - {e}")
+            return {}
+        if not cids:
+            return {}
+        matched = client._match_bulk_cids(chunk, await self.fetch_rn_xrefs_bulk(cids))
+        await asyncio.to_thread(client._cache_search_results, matched)
+        self.logger.info(f"CAS一括検索 バッチ {batch_idx}/{total_batches}: {len(matched)}/{len(chunk)} 件解決")
+        return matched
+
+    async def fetch_rn_xrefs_bulk(self, cids: List[int], batch_size: int = CAS_BATCH_SIZE) -> Dict[int, List[str]]:
+        """複数CIDのRN xrefをPOSTで一括取得（PubChemClient.fetch_rn_xrefs_bulkの非同期版）"""
+        out: Dict[int, List[str]] = {}
+        chunks = [list(chunk) for chunk in batched(list(dict.fromkeys(cids)), batch_size)]
+        results = await asyncio.gather(*(self._post_cid_information("xrefs/RN", chunk) for chunk in chunks),
+                                       return_exceptions=True)
+        for chunk, info in zip(chunks, results):
+            if isinstance(info, Exception):
+                self.logger.debug(f"RN xref一括取得失敗 ({len(chunk)} CID): {info}")
+                continue
+            for cid in chunk:
+                if cid in info:
+                    out.setdefault(cid, []).extend(info[cid].get("RN", []))
+        return out
+
+    async def _post_cid_information(self, operation: str, cids: List[int]) -> Dict[int, Dict]:
+        """PubChemClient._post_cid_informationの非同期版（CIDごとにキャッシュ、404は空の辞書）"""
+        client = self._sync_client
+        id_url = client.cid_information_url(operation)
+        cached, pending = await asyncio.to_thread(get_cached_per_id, cids, id_url)
+        out = client._cached_information(cached)
+        if not pending:
+            return out
+        try:
+            data = await self.post_json(f"{client.PUG_REST}/compound/cid/{operation}/JSON",
+                                        {"cid": ",".join(map(str, pending))}, cache=False)
+            fetched = client._information_by_cid(data)
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            fetched = {}
+        await asyncio.to_thread(client._cache_information, fetched, pending, id_url)
+        out.update(fetched)
+        return out
+
+    async def fetch_properties_batched(self, cids: List[int], properties: Optional[List[str]] = None,
+                                       sizer: Optional[AdaptiveChunkSizer] = None,
+                                       on_batch: Optional[Callable[[Dict[int, dict]], None]] = None) -> Dict[int, dict]:
+        """
+        バッチでCIDのプロパティを取得（PubChemClient.fetch_properties_batchedの非同期版）
+
+        同期版と同じくCIDリストをPOSTボディで送り、バッチサイズはAdaptiveChunkSizerで調整する。
+        現在のバッチサイズでconcurrency個のバッチを並行取得し、その応答時間を反映してから次の組を作る。
+        """
+        res = {}
+        if not cids:
+            return res
+
+        client = self._sync_client
+        sizer = sizer or AdaptiveChunkSizer()
+        fields = client.normalize_properties(properties) if properties else client.properties
+        url = client.property_url(properties=fields)
+        id_url = client.property_id_url(fields)
+
+        cached, pending = await asyncio.to_thread(get_cached_per_id, cids, id_url)
+        res.update(client._cached_properties(cached))
+        if res and on_batch is not None:
+            await asyncio.to_thread(on_batch, dict(res))
+        self.logger.info(f"プロパティ取得開始: {len(pending)} CID（キャッシュ済み {len(res)} 件、"
+                         f"初期バッチサイズ {sizer.size}、非同期）")
+
+        pos, chunk_idx = 0, 0
+        while pos < len(pending):
+            chunks = []
+            while pos < len(pending) and len(chunks) < self.concurrency:
+                chunks.append(pending[pos:pos + sizer.size])
+                pos += len(chunks[-1])
+            batches = await asyncio.gather(*(self._fetch_property_batch(url, chunk, sizer, id_url) for chunk in chunks))
+            for batch, fetched in batches:
+                chunk_idx += 1
+                res.update(batch)
+                if on_batch is not None and batch:
+                    await asyncio.to_thread(on_batch, batch)
+                self.logger.info(f"バッチ {chunk_idx}: {fetched} 件のプロパティ取得成功")
+
+        self.logger.info(f"プロパティ取得完了: {len(res)} 件成功")
+        return res
+
+    async def _fetch_property_batch(self, url: str, chunk: List[int], sizer: AdaptiveChunkSizer,
+                                    id_url: Callable[[int], str]) -> Tuple[Dict[int, dict], int]:
+        batch: Dict[int, dict] = {}
+        fetched = await self._fetch_property_chunk(url, chunk, sizer, batch, id_url)
+        return batch, fetched
+
+    async def _fetch_property_chunk(self, url: str, chunk: List[int], sizer: AdaptiveChunkSizer,
+                                    res: Dict[int, dict], id_url: Callable[[int], str]) -> int:
+        """
+        1バッチ分のプロパティを取得してresに格納（PubChemClient._fetch_property_chunkの非同期版）
+
+        失敗したバッチは同期版と同じく二分割して再帰するため、不正なCIDが1件あっても追加リクエストはO(log n)
+        """
+        client = self._sync_client
+        started = time.monotonic()
+        try:
+            props = client._parse_property_table(
+                await self.post_json(url, {"cid": ",".join(map(str, chunk))}, cache=False, retry_timeouts=False))
+        except Exception as e:
+            if client._is_overload_error(e):
+                sizer.record_timeout()
+            halves = client._split_failed_chunk(chunk, e)
+            if halves is None:
+                return 0
+            return sum([await self._fetch_property_chunk(url, half, sizer, res, id_url) for half in halves])
+
+        sizer.record_success(len(chunk), time.monotonic() - started)
+        await asyncio.to_thread(client._cache_properties, props, id_url)
+        for p in props:
+            res[p["CID"]] = p
+        return len(props)
+
+    async def fetch_sid_properties_batched(self, sids: List[int],
+                                           batch_size: int = CAS_BATCH_SIZE) -> Dict[int, Dict[str, Any]]:
+        """複数SIDのプロパティをまとめて取得（PubChemClient.fetch_sid_properties_batchedの非同期版、全バッチを並行実行）"""
+        res: Dict[int, Dict[str, Any]] = {}
+        chunks = [list(chunk) for chunk in batched(list(dict.fromkeys(sids)), batch_size)]
+        if not chunks:
+            return res
+
+        self.logger.info(f"SIDプロパティ一括取得開始: {len(dict.fromkeys(sids))} SID を {len(chunks)} バッチで処理（非同期）")
+        for batch in await asyncio.gather(*(
+            self._fetch_sid_batch(batch_idx, len(chunks), chunk) for batch_idx, chunk in enumerate(chunks, 1)
+        )):
+            res.update(batch)
+        return res
+
+    async def _fetch_sid_batch(self, batch_idx: int, total_batches: int, chunk: List[int]) -> Dict[int, Dict[str, Any]]:
+        client = self._sync_client
+        body = {"sid": ",".join(map(str, chunk))}
+        try:
+            res = client._parse_substance_batch(await self.post_json(f"{client.PUG_REST}/substance/sid/JSON", body))
+        except Exception as e:
+            self.logger.warning(f"SIDバッチ {batch_idx}/{total_batches}: 一括取得失敗、個別取得にフォールバック - {e}")
+            return await self.get_sid_properties_many(chunk)
+
+        # 関連CID取得試行
+        try:
+            client._apply_related_cids(res, await self.post_json(
+                f"{client.PUG_REST}/substance/sid/cids/JSON?list_return=grouped", body
+            ))
+        except Exception as e:
+            self.logger.debug(f"SIDバッチ {batch_idx}/{total_batches}: 関連CID取得失敗 - {e}")
+
+        client._finish_sid_batch(batch_idx, total_batches, chunk, res)
+        return res
+
+    async def fetch_cas_batched(self, cids: List[int], batch_size: int = CAS_BATCH_SIZE,
+                                on_batch: Optional[Callable[[Dict[int, List[Tuple[str, str]]]], None]] = None
+                                ) -> Dict[int, List[Tuple[str, str]]]:
+        """CIDからCAS情報をバッチで取得（PubChemClient.fetch_cas_batchedの非同期版、全バッチを並行実行）"""
+        out: Dict[int, List[Tuple[str, str]]] = {}
+        chunks = [list(chunk) for chunk in batched(list(dict.fromkeys(cids)), batch_size)]
+        if not chunks:
+            return out
+
+        self.logger.info(f"CAS取得開始: {len(dict.fromkeys(cids))} CID を {len(chunks)} バッチで一括処理（非同期）")
+        for pairs_map in await asyncio.gather(*(
+            self._fetch_cas_batch(batch_idx, len(chunks), chunk, on_batch) for batch_idx, chunk in enumerate(chunks, 1)
+        )):
+            out.update(pairs_map)
+
+        self.logger.info(f"CAS取得完了: {len(out)} 件成功")
+        return out
+
+    async def _fetch_cas_batch(self, batch_idx: int, total_batches: int, chunk: List[int],
+                               on_batch: Optional[Callable[[Dict[int, List[Tuple[str, str]]]], None]]
+                               ) -> Dict[int, List[Tuple[str, str]]]:
+        client = self._sync_client
+        try:
+            pairs_map = client._preferred_pairs_map(chunk, await self._post_cid_information("xrefs/RN", chunk))
+            need_synonyms = [cid for cid in chunk if client._needs_synonyms(pairs_map[cid])]
+            if need_synonyms:
+                client._add_synonym_pairs(pairs_map, await self._post_cid_information("synonyms", need_synonyms))
+            self.logger.info(f"CASバッチ {batch_idx}/{total_batches}: {len(chunk)} CID 処理")
+        except Exception as e:
+            self.logger.warning(f"CASバッチ {batch_idx}/{total_batches}: 一括取得失敗、個別取得にフォールバック - {e}")
+            pairs_map = await self.get_cas_pairs_many(chunk)
+        if on_batch is not None:
+            await asyncio.to_thread(on_batch, pairs_map)
+        return pairs_map
+
+    async def get_full_compound_data(self, cid: int) -> Optional[Dict]:
+        """CIDから化合物の完全なJSONデータを取得（PubChemFullDataClient.get_full_compound_dataの非同期版）"""
+        try:
+            url = self._full_data_client.COMPOUND_URL_TEMPLATE.format(cid=cid)
+            self.logger.debug(f"CID {cid}: 全データ取得開始 (PubChem View API)")
+            return self._full_data_client._validate_compound_record(cid, await self.get_json(url))
+        except Exception as e:
+            self.logger.error(f"CID {cid}: 全データ取得失敗 - {e}")
+            return None
+
+    async def get_cids_from_cas_many(self, cas_numbers: Iterable[str]) -> Dict[str, SearchResult]:
+        """複数のCAS番号を並行して検索"""
+        unique = list(dict.fromkeys(cas_numbers))
+        results = await asyncio.gather(*(self.get_cid_from_cas(cas) for cas in unique))
+        return dict(zip(unique, results))
+
+    async def get_sid_properties_many(self, sids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """複数のSIDのプロパティを並行して取得"""
+        unique = list(dict.fromkeys(sids))
+        results = await asyncio.gather(*(self.get_sid_properties(sid) for sid in unique))
+        return dict(zip(unique, results))
+
+    async def get_cas_pairs_many(self, cids: Iterable[int]) -> Dict[int, List[Tuple[str, str]]]:
+        """複数のCIDのCAS情報を並行して取得"""
+        unique = list(dict.fromkeys(cids))
+        results = await asyncio.gather(*(self.get_cas_pairs(cid) for cid in unique))
+        return dict(zip(unique, results))
+
+    async def get_full_compound_data_many(self, cids: Iterable[int]) -> Dict[int, Optional[Dict]]:
+        """複数のCIDの完全データを並行して取得"""
+        unique = list(dict.fromkeys(cids))
+        results = await asyncio.gather(*(self.get_full_compound_data(cid) for cid in unique))
+        return dict(zip(unique, results))
+
+
+def run_async(method: str, *args, concurrency: int = ASYNC_CONCURRENCY, **kwargs):
+    """
+    同期コードからAsyncPubChemClientのメソッドを実行する薄いラッパー
+
+    例:
+        results = run_async("get_cids_from_cas_many", ["50-00-0", "64-17-5"])
+    """
+    async def _main():
+        async with AsyncPubChemClient(concurrency=concurrency) as client:
+            return await getattr(client, method)(*args, **kwargs)
+
+    return asyncio.run(_main())
+
+
+
+class ConcurrentPubChemClient(PubChemClient):
+    """
+    PubChemClientと同じ同期インターフェースで、PubChemへの問い合わせをAsyncPubChemClientで並行実行する（--async）
+
+    CompoundDataProcessor / FullDataProcessor の pubchem_client として使い、処理ステップはそのまま:
+    - get_cids_from_cas_bulk: POST一括検索の全バッチを並行実行し、一括検索で解決できなかったCASの
+      個別検索もまとめて並行実行する（該当なしの結果は保持し、続くget_cid_from_casで返す）
+    - fetch_properties_batched / fetch_sid_properties_batched / fetch_cas_batched: 各バッチを並行実行
+    イベントループは専用スレッドで1つだけ動かし、全呼び出しでClientSession（接続プール）を共有するため、
+    パイプラインモードの各ステージのスレッドからも同時に呼び出せる。使用後はclose()で停止する。
+    """
+
+    def __init__(self, speculative: bool = SPECULATIVE_CAS_SEARCH, properties: Optional[List[str]] = None,
+                 concurrency: int = ASYNC_CONCURRENCY):
+        super().__init__(speculative=speculative, properties=properties)
+        self.concurrency = concurrency
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._async_client: Optional[AsyncPubChemClient] = None
+        self._prefetched: Dict[str, SearchResult] = {}
+
+    def get_cids_from_cas_bulk(self, cas_numbers: List[str], batch_size: int = CAS_BATCH_SIZE) -> Dict[str, SearchResult]:
+        """
+        一括検索と、一括検索で解決できなかったCASの個別検索を並行実行
+
+        Returns:
+            CIDまたはSIDが見つかったCAS番号（strip済み）をキーとするSearchResultの辞書
+        """
+        return self._run(self._search_many, cas_numbers, batch_size)
+
+    async def _search_many(self, client: AsyncPubChemClient, cas_numbers: List[str],
+                           batch_size: int) -> Dict[str, SearchResult]:
+        results = await client.get_cids_from_cas_bulk(cas_numbers, batch_size)
+        remaining = [cas for cas in dict.fromkeys(c.strip() for c in cas_numbers if validate_cas(c))
+                     if cas not in results]
+        if remaining:
+            self.logger.info(f"個別検索を並行実行: {len(remaining)} 件（同時実行数 {client.concurrency}）")
+        for cas, result in (await client.get_cids_from_cas_many(remaining)).items():
+            if result.cids or result.sids:
+                results[cas] = result
+            else:
+                with self._lock:
+                    self._prefetched[cas] = result
+        return results
+
+    def get_cid_from_cas(self, cas_number: str, speculative: Optional[bool] = None) -> SearchResult:
+        """CAS番号からCID候補を取得（get_cids_from_cas_bulkで検索済みの該当なしはその結果を返す）"""
+        with self._lock:
+            prefetched = self._prefetched.pop(cas_number.strip(), None)
+        if prefetched is not None:
+            return prefetched
+        return self._run(lambda client: client.get_cid_from_cas(cas_number, speculative))
+
+    def fetch_properties_batched(self, cids: List[int], properties: Optional[List[str]] = None,
+                                 sizer: Optional[AdaptiveChunkSizer] = None,
+                                 on_batch: Optional[Callable[[Dict[int, dict]], None]] = None) -> Dict[int, dict]:
+        return self._run(lambda client: client.fetch_properties_batched(cids, properties, sizer, on_batch))
+
+    def fetch_sid_properties_batched(self, sids: List[int], batch_size: int = CAS_BATCH_SIZE) -> Dict[int, Dict[str, Any]]:
+        return self._run(lambda client: client.fetch_sid_properties_batched(sids, batch_size))
+
+    def fetch_cas_batched(self, cids: List[int], batch_size: int = CAS_BATCH_SIZE,
+                          on_batch: Optional[Callable[[Dict[int, List[Tuple[str, str]]]], None]] = None
+                          ) -> Dict[int, List[Tuple[str, str]]]:
+        return self._run(lambda client: client.fetch_cas_batched(cids, batch_size, on_batch))
+
+    def close(self) -> None:
+        """ClientSessionを閉じてイベントループのスレッドを停止"""
+        super().close()
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._async_client
+            self._loop, self._thread, self._async_client = None, None, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _run(self, coroutine_function: Callable, *args):
+        """AsyncPubChemClientを受け取るコルーチン関数を専用のイベントループで実行し、結果を待つ"""
+        loop, client = self._start()
+        client.speculative = self.speculative
+        return asyncio.run_coroutine_threadsafe(coroutine_function(client, *args), loop).result()
+
+    def _start(self) -> Tuple[asyncio.AbstractEventLoop, AsyncPubChemClient]:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="pubchem-async", daemon=True)
+                thread.start()
+                client = AsyncPubChemClient(self.concurrency, self.speculative, self.properties)
+                asyncio.run_coroutine_threadsafe(client.open(), loop).result()
+                self._loop, self._thread, self._async_client = loop, thread, client
+            return self._loop, self._async_client
@@ -0,0 +1,54 @@
+"""
+Adaptive batch sizing for PubChem list requests
+"""
+import logging
+import threading
+
+from config.settings import (
+    CHUNK_SIZE, MAX_CHUNK_SIZE, ADAPTIVE_FAST_SECONDS, ADAPTIVE_SLOW_SECONDS
+)
+
+
+class AdaptiveChunkSizer:
+    """
+    応答時間に応じてバッチサイズを調整する
+
+    - 応答がfast秒未満なら1.5倍に拡大（最大maximum）
+    - 応答がslow秒を超える、またはタイムアウトした場合は半分に縮小（最小minimum）
+    - その他の失敗（不正なCIDを含む等）はサイズを変えない（バッチの二分割で対処）
+    """
+
+    def __init__(self, initial: int = CHUNK_SIZE, minimum: int = 1, maximum: int = MAX_CHUNK_SIZE,
+                 fast_seconds: float = ADAPTIVE_FAST_SECONDS, slow_seconds: float = ADAPTIVE_SLOW_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.fast_seconds = fast_seconds
+        self.slow_seconds = slow_seconds
+        self._size = min(self.maximum, max(self.minimum, initial))
+
+    @property
+    def size(self) -> int:
+        """次のバッチのサイズ"""
+        return self._size
+
+    def record_success(self, chunk_size: int, elapsed: float) -> None:
+        """成功したバッチの応答時間を記録"""
+        with self._lock:
+            if elapsed > self.slow_seconds:
+                self._resize(self._size // 2, f"応答 {elapsed:.1f}秒")
+            elif elapsed < self.fast_seconds and chunk_size >= self._size:
+                # 現在のサイズで速かった場合のみ拡大（分割後の小バッチの結果では拡大しない）
+                self._resize(int(self._size * 1.5) + 1, f"応答 {elapsed:.1f}秒")
+
+    def record_timeout(self) -> None:
+        """タイムアウトしたバッチを記録"""
+        with self._lock:
+            self._resize(self._size // 2, "タイムアウト")
+
+    def _resize(self, new_size: int, reason: str) -> None:
+        new_size = min(self.maximum, max(self.minimum, new_size))
+        if new_size != self._size:
+            self.logger.debug(f"バッチサイズ変更 ({reason}): {self._size} → {new_size}")
+            self._size = new_size
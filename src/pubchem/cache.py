@@ -0,0 +1,502 @@
+"""
+Persistent on-disk response cache and negative (404) cache for PubChem REST calls
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import requests
+
+try:
+    from itertools import batched
+except ImportError:
+    from more_itertools import batched
+
+from .record_store import open_record
+from .json_codec import get_json_codec
+from config.settings import (
+    CACHE_ENABLED, CACHE_DIR, CACHE_MAX_BYTES, CACHE_TTL, CACHE_COMPRESS_LEVEL,
+    NEGATIVE_CACHE_PATH, NEGATIVE_CACHE_TTL, STREAM_COPY_BYTES
+)
+
+# URLからキャッシュTTL区分を判定するパターン（上から順に評価）
+_ENDPOINT_PATTERNS = [
+    ("pug_view", re.compile(r"/rest/pug_view/")),
+    ("xrefs", re.compile(r"/xrefs/")),
+    ("synonyms", re.compile(r"/synonyms/")),
+    ("property", re.compile(r"/property/")),
+    ("cids", re.compile(r"/cids/")),
+    ("sids", re.compile(r"/sids/")),
+    ("substance", re.compile(r"/substance/sid/")),
+]
+
+
+def normalize_url(url: str, body: Optional[str] = None) -> str:
+    """
+    キャッシュキー用にURLを正規化
+    - スキーム・ホストを小文字化
+    - クエリパラメータをソート
+    - POSTボディがある場合はキーに含める
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+    if body:
+        normalized += "\n" + body
+    return normalized
+
+
+def classify_endpoint(url: str) -> str:
+    """URLからTTL区分（xrefs, synonyms, property, pug_view等）を判定"""
+    for name, pattern in _ENDPOINT_PATTERNS:
+        if pattern.search(url):
+            return name
+    return "default"
+
+
+class ResponseCache:
+    """
+    URLをキーとするコンテンツアドレス型のレスポンスキャッシュ
+
+    - キー: 正規化URLのSHA-256、本体はgzip圧縮して {key[:2]}/{key}.gz に保存
+    - インデックス（サイズ・作成時刻・最終アクセス時刻）はSQLiteで管理
+    - エンドポイント種別ごとのTTL（CACHE_TTL）で期限切れを判定
+    - 合計サイズがmax_bytesを超えたら最終アクセスの古い順に削除（LRU）
+    - スレッドセーフ
+    """
+
+    LOOKUP_BATCH_SIZE = 500  # get_manyで1クエリに含めるキー数（SQLiteのパラメータ数上限未満）
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl = dict(CACHE_TTL if ttl is None else ttl)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def get(self, url: str, body: Optional[str] = None) -> Optional[bytes]:
+        """
+        キャッシュ済みのレスポンス本体を取得（未登録・期限切れはNone）
+
+        ロックはインデックスの参照・最終アクセス時刻の更新のみに使い、
+        本体ファイルの読み込み・展開はロックの外で行う（スレッド間でディスクI/Oを直列化しない）。
+        """
+        return self.get_many([url], body).get(url)
+
+    def get_many(self, urls: List[str], body: Optional[str] = None) -> Dict[str, bytes]:
+        """
+        複数URLのキャッシュ済みのレスポンス本体を取得（未登録・期限切れのURLは含まない）
+
+        インデックスの参照・更新は1回のトランザクションで行う（一括取得の結果をIDごとに参照する用途）。
+        """
+        keys = {self._key(url, body): url for url in urls}
+        with self._lock:
+            conn = self._connect()
+            rows = []
+            for chunk in batched(list(keys), self.LOOKUP_BATCH_SIZE):
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT key, endpoint, size, created FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+
+            now = time.time()
+            valid = []
+            for key, endpoint, size, created in rows:
+                if now - created > self.ttl.get(endpoint, self.ttl.get("default", 0)):
+                    self._delete(conn, key, size)
+                else:
+                    valid.append((key, created))
+            conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?", [(now, key) for key, _ in valid])
+            conn.commit()
+
+        found = {}
+        for key, created in valid:
+            content = self._read_body(key, keys[key], created)
+            if content is not None:
+                found[keys[key]] = content
+
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def _read_body(self, key: str, url: str, created: float) -> Optional[bytes]:
+        """本体ファイルを読み込み（ロックの外で呼ぶ）、壊れている場合はエントリを削除してNone"""
+        try:
+            with gzip.open(self._path(key), "rb") as f:
+                return f.read()
+        except (OSError, EOFError) as e:
+            self.logger.debug(f"キャッシュ読み込み失敗 ({url}): {e}")
+            with self._lock:
+                # 読み込み中に同じキーが再登録された場合はそのエントリを残す
+                conn = self._connect()
+                current = conn.execute("SELECT size, created FROM entries WHERE key = ?", (key,)).fetchone()
+                if current is not None and current[1] == created:
+                    self._delete(conn, key, current[0])
+                    conn.commit()
+            return None
+
+    def put(self, url: str, content: bytes, body: Optional[str] = None) -> None:
+        """レスポンス本体を圧縮して保存（圧縮・一時ファイルへの書き込みはロックの外で行う）"""
+        self.put_many([(url, content)], body)
+
+    def put_many(self, items: List[Tuple[str, bytes]], body: Optional[str] = None) -> None:
+        """複数のレスポンス本体を圧縮して保存（インデックスの更新は1回のトランザクション）"""
+        written = []
+        for url, content in dict(items).items():
+            key = self._key(url, body)
+            path = self._path(key)
+            compressed = gzip.compress(content, compresslevel=CACHE_COMPRESS_LEVEL)
+            tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(compressed)
+            except OSError as e:
+                self.logger.debug(f"キャッシュ書き込み失敗 ({url}): {e}")
+                tmp_path.unlink(missing_ok=True)
+                continue
+            written.append((key, url, tmp_path, len(compressed)))
+        self._commit_files(written)
+
+    def put_file(self, url: str, source: Path, body: Optional[str] = None) -> None:
+        """
+        ディスク上のレスポンス本体（ストリーミング保存したファイル）を圧縮して保存
+
+        本体全体をメモリに載せずにチャンク単位で圧縮する（圧縮保存したレコードファイルは展開して格納）。
+        """
+        key = self._key(url, body)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open_record(source) as src, gzip.open(tmp_path, "wb", compresslevel=CACHE_COMPRESS_LEVEL) as dst:
+                shutil.copyfileobj(src, dst, STREAM_COPY_BYTES)
+            size = tmp_path.stat().st_size
+        except OSError as e:
+            self.logger.debug(f"キャッシュ書き込み失敗 ({url}): {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self._commit_files([(key, url, tmp_path, size)])
+
+    def _commit_files(self, written: List[Tuple[str, str, Path, int]]) -> None:
+        """書き込み済みの一時ファイル (key, url, 一時ファイル, サイズ) を配置してインデックスを更新"""
+        if not written:
+            return
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            for key, url, tmp_path, size in written:
+                try:
+                    os.replace(tmp_path, self._path(key))
+                except OSError as e:
+                    self.logger.debug(f"キャッシュ書き込み失敗 ({url}): {e}")
+                    continue
+                old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                if old is not None:
+                    self._total_bytes -= old[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, url, endpoint, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, url, classify_endpoint(url), size, now, now),
+                )
+                self._total_bytes += size
+                self._stores += 1
+
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """ヒット率・サイズ等の統計を取得"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "total_bytes": self._total_bytes,
+            }
+
+    def close(self) -> None:
+        """インデックスDBをクローズ"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, url TEXT, endpoint TEXT, size INTEGER, created REAL, accessed REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # 上限の90%まで古い順に削除し、上限付近での頻繁な削除を避ける
+        target = self.max_bytes * 0.9
+        rows = conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._delete(conn, key, size)
+            self._evictions += 1
+        self.logger.debug(f"キャッシュ削除(LRU): 現在 {self._total_bytes:,} bytes")
+
+    def _delete(self, conn: sqlite3.Connection, key: str, size: int) -> None:
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._total_bytes -= size
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _key(self, url: str, body: Optional[str]) -> str:
+        return hashlib.sha256(normalize_url(url, body).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.gz"
+
+
+def build_cached_response(url: str, content: bytes) -> requests.Response:
+    """キャッシュ済みの本体からrequests.Response互換のオブジェクトを作成"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    response._content = content
+    response._content_consumed = True  # iter_content()がキャッシュ済み本体から読み出すようにする
+    response.from_cache = True
+    return response
+
+
+class NegativeCache:
+    """
+    確定的な404（該当データなし）を記録する永続ネガティブキャッシュ
+
+    - "url" 種別: 404を返したエンドポイントURL（正規化済み）
+    - "cas" 種別: 全エンドポイントで404となったCAS番号
+    - エントリごとに有効期限（NEGATIVE_CACHE_TTL秒）を持ち、期限切れは再検索対象になる
+    - SQLiteに保存し、スレッドセーフ
+    """
+
+    def __init__(self, db_path: Path = NEGATIVE_CACHE_PATH, ttl: float = NEGATIVE_CACHE_TTL):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._hits = 0
+        self._added = 0
+
+    def is_known_miss(self, kind: str, key: str) -> bool:
+        """有効期限内のネガティブエントリがあるか"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT expires FROM misses WHERE kind = ? AND key = ?", (kind, self._normalize(kind, key))
+            ).fetchone()
+            if row is None:
+                return False
+            if row[0] < time.time():
+                conn.execute("DELETE FROM misses WHERE kind = ? AND key = ?", (kind, self._normalize(kind, key)))
+                conn.commit()
+                return False
+            self._hits += 1
+            return True
+
+    def add_miss(self, kind: str, key: str) -> None:
+        """ネガティブエントリを登録（既存エントリは期限を更新）"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO misses (kind, key, created, expires) VALUES (?, ?, ?, ?)",
+                (kind, self._normalize(kind, key), now, now + self.ttl),
+            )
+            conn.commit()
+            self._added += 1
+
+    def url_missed(self, url: str, body: Optional[str] = None) -> bool:
+        return self.is_known_miss("url", normalize_url(url, body))
+
+    def record_url_miss(self, url: str, body: Optional[str] = None) -> None:
+        self.add_miss("url", normalize_url(url, body))
+
+    def cas_missed(self, cas_number: str) -> bool:
+        return self.is_known_miss("cas", cas_number)
+
+    def record_cas_miss(self, cas_number: str) -> None:
+        self.add_miss("cas", cas_number)
+
+    def check_miss_file(self, miss_file: Path) -> Dict[str, list]:
+        """
+        save_resultsが出力した失敗記録（*_miss_*.json / ストリーミングモードの *_miss_*.jsonl）を
+        ネガティブキャッシュと照合
+
+        Returns:
+            {"cached": 有効期限内で次回スキップされるCAS, "uncached": 次回再検索されるCAS}
+        """
+        with open(miss_file, "r", encoding="utf-8") as f:
+            if Path(miss_file).suffix.lower() == ".jsonl":
+                misses = [json.loads(line) for line in f if line.strip()]
+            else:
+                misses = json.load(f)
+        result = {"cached": [], "uncached": []}
+        for entry in misses:
+            cas_number = entry.get("cas", "")
+            result["cached" if self.cas_missed(cas_number) else "uncached"].append(cas_number)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM misses WHERE expires >= ?", (time.time(),)).fetchone()[0]
+            return {"hits": self._hits, "added": self._added, "entries": count}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS misses ("
+                "kind TEXT, key TEXT, created REAL, expires REAL, PRIMARY KEY (kind, key))"
+            )
+        return self._conn
+
+    @staticmethod
+    def _normalize(kind: str, key: str) -> str:
+        return key.strip() if kind == "cas" else key
+
+
+def build_not_found_error(url: str) -> requests.HTTPError:
+    """ネガティブキャッシュ命中時に送出する404相当のHTTPErrorを作成"""
+    response = requests.Response()
+    response.status_code = 404
+    response.url = url
+    response.from_cache = True
+    return requests.HTTPError(f"404 Client Error: Not Found (negative cache) for url: {url}", response=response)
+
+
+_response_cache: Optional[ResponseCache] = ResponseCache() if CACHE_ENABLED else None
+_negative_cache: Optional[NegativeCache] = NegativeCache() if CACHE_ENABLED else None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """プロセス共有のレスポンスキャッシュを取得（無効時はNone）"""
+    return _response_cache
+
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    """プロセス共有のネガティブキャッシュを取得（無効時はNone）"""
+    return _negative_cache
+
+
+IdT = TypeVar("IdT")
+
+
+def get_cached_per_id(ids: Iterable[IdT], id_url: Callable[[IdT], str]) -> Tuple[Dict[IdT, Any], List[IdT]]:
+    """
+    一括取得（POST）の前に、IDごとのキャッシュを参照
+
+    一括取得の結果はIDごとに単一IDのGET URL（id_url）をキーとして保存するため（cache_per_id）、
+    入力リストが一部だけ異なる再実行でも、取得済みのIDはPOSTボディに含めずに済む。
+
+    Returns:
+        (キャッシュ済みのID → レスポンスJSON, POSTで取得するID)。
+        ネガティブキャッシュ（404）登録済みのIDはデータなしとしてどちらにも含めない
+    """
+    ids = list(dict.fromkeys(ids))
+    cache = get_response_cache()
+    if cache is None or not ids:
+        return {}, ids
+    urls = {id_: id_url(id_) for id_ in ids}
+    contents = cache.get_many(list(urls.values()))
+    codec = get_json_codec()
+    cached = {id_: codec.loads(contents[url]) for id_, url in urls.items() if url in contents}
+    negative = get_negative_cache()
+    missing = [id_ for id_ in ids
+               if id_ not in cached and (negative is None or not negative.url_missed(urls[id_]))]
+    return cached, missing
+
+
+def cache_per_id(responses: Dict[IdT, Any], id_url: Callable[[IdT], str], not_found: Iterable[IdT] = ()) -> None:
+    """
+    一括取得の結果をIDごとのエントリとして保存（get_cached_per_idで参照）
+
+    Args:
+        responses: ID → 単一IDのGETと同じ形式のレスポンスJSON
+        id_url: ID → 単一IDのGET URL
+        not_found: 一括取得のレスポンスに含まれなかった（単一IDのGETなら404になる）ID。ネガティブキャッシュに登録
+    """
+    cache = get_response_cache()
+    if cache is not None and responses:
+        codec = get_json_codec()
+        cache.put_many([(id_url(id_), codec.dumps(data, compact=True)) for id_, data in responses.items()])
+    negative = get_negative_cache()
+    if negative is not None:
+        for id_ in not_found:
+            negative.record_url_miss(id_url(id_))
+
+
+def disable_response_cache() -> None:
+    """レスポンスキャッシュとネガティブキャッシュを無効化（--no-cache用）"""
+    global _response_cache, _negative_cache
+    if _response_cache is not None:
+        _response_cache.close()
+    if _negative_cache is not None:
+        _negative_cache.close()
+    _response_cache = None
+    _negative_cache = None
+
+
+def log_cache_stats(logger: Optional[logging.Logger] = None) -> None:
+    """レスポンスキャッシュの統計をログ出力"""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    logger = logger or logging.getLogger(__name__)
+    stats = cache.stats()
+    logger.info(
+        f"レスポンスキャッシュ: ヒット {stats['hits']} 件, ミス {stats['misses']} 件 "
+        f"(ヒット率 {stats['hit_rate']*100:.1f}%), 保存 {stats['stores']} 件, "
+        f"LRU削除 {stats['evictions']} 件, 使用量 {stats['total_bytes']:,} bytes"
+    )
+    negative = get_negative_cache()
+    if negative is not None:
+        neg_stats = negative.stats()
+        logger.info(
+            f"ネガティブキャッシュ: 即時スキップ {neg_stats['hits']} 件, 新規登録 {neg_stats['added']} 件, "
+            f"有効エントリ {neg_stats['entries']} 件"
+        )
@@ -1,115 +1,398 @@
 """
 PubChem API client for fetching chemical compound information
 """
+import asyncio
 import time
 import urllib.parse
 import logging
-from typing import List, Dict, Set, Tuple, Optional
-import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Set, Tuple, Optional
+
+import requests
 
 try:
     from itertools import batched
 except ImportError:
     from more_itertools import batched
 
-from .utils import safe_get, validate_cas, CAS_RE
+from .utils import safe_get, safe_post, validate_cas, is_not_found_error, CAS_RE
+from .session import get_session
+from .json_codec import response_json
+from .cache import get_negative_cache, get_cached_per_id, cache_per_id
+from .batching import AdaptiveChunkSizer
 from .models import CompoundInfo, CASInfo, SearchResult
 from config.settings import (
-    CID_LIMIT, CHUNK_SIZE, SLEEP_PROP, SLEEP_CAS, SLEEP_CID, MAX_SYNONYM
+    CID_LIMIT, MAX_SYNONYM, CAS_BATCH_SIZE, SPECULATIVE_CAS_SEARCH,
+    BASE_PROPERTY_FIELDS, PROPERTY_FIELDS
 )
 
 
 class PubChemClient:
     """PubChem API client for chemical compound data retrieval"""
     
-    def __init__(self):
+    def __init__(self, speculative: bool = SPECULATIVE_CAS_SEARCH, properties: Optional[List[str]] = None):
         self.logger = logging.getLogger(__name__)
+        self.speculative = speculative
+        self.properties = self.normalize_properties(properties)
+        self._race_executor: Optional[ThreadPoolExecutor] = None
+    
+    PUG_REST = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+    PROPERTY_URL_TEMPLATE = PUG_REST + "/compound/cid/{cids}/property/{properties}/JSON"
+    PROPERTY_POST_TEMPLATE = PUG_REST + "/compound/cid/property/{properties}/JSON"
+    CAS_BULK_URL = PUG_REST + "/compound/xref/RN/cids/JSON"
+    
+    @staticmethod
+    def normalize_properties(properties: Optional[List[str]] = None) -> List[str]:
+        """
+        取得プロパティ一覧を正規化（BASE_PROPERTY_FIELDSを先頭に必ず含め、重複を除去）
+        
+        Args:
+            properties: PUG-RESTのプロパティ名リスト（NoneはPROPERTY_FIELDS）
+        """
+        names = [p.strip() for p in (PROPERTY_FIELDS if properties is None else properties) if p and p.strip()]
+        return list(dict.fromkeys(BASE_PROPERTY_FIELDS + names))
+    
+    def property_url(self, cids: Optional[List[int]] = None, properties: Optional[List[str]] = None) -> str:
+        """
+        プロパティテーブルのURLを生成
+        
+        Args:
+            cids: URLパスに含めるCID（NoneはPOSTボディで送る形式のURL）
+            properties: プロパティ名リスト（Noneはインスタンス設定）
+        """
+        fields = ",".join(properties or self.properties)
+        if cids is None:
+            return self.PROPERTY_POST_TEMPLATE.format(properties=fields)
+        return self.PROPERTY_URL_TEMPLATE.format(cids=",".join(map(str, cids)), properties=fields)
     
-    def get_cid_from_cas(self, cas_number: str) -> SearchResult:
+    def get_cid_from_cas(self, cas_number: str, speculative: Optional[bool] = None) -> SearchResult:
         """
         CAS番号からCID候補を取得（Compound + Substance検索・効率化版）
+        
+        Args:
+            cas_number: CAS番号
+            speculative: Trueの場合、CIDを返すエンドポイント（Compound / Substance→CID）を
+                         並行発行して最初に確定した結果を採用（Noneはインスタンス設定に従う）
         """
         if not validate_cas(cas_number):
             self.logger.warning(f"無効なCAS番号: {cas_number}")
             return SearchResult([], [], False, "invalid")
         
         cas_cleaned = cas_number.strip()
-        cas_quoted = urllib.parse.quote(cas_cleaned)
+        if self._is_known_cas_miss(cas_cleaned):
+            return SearchResult([], [], False, "not_found")
         
-        # Compound検索エンドポイント（優先）
-        compound_endpoints = [
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/xref/RN/{cas_cleaned}/cids/JSON",
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{cas_quoted}/cids/JSON"
-        ]
+        phases = self._cas_search_phases(cas_cleaned)
+        definitive = True  # 全エンドポイントが404（確定的な該当なし）だったか
         
-        # Substance検索エンドポイント（フォールバック）
-        substance_cid_endpoints = [
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/name/{cas_quoted}/cids/JSON",
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/xref/RN/{cas_cleaned}/cids/JSON"
-        ]
+        if self.speculative if speculative is None else speculative:
+            result, definitive = self._race_cid_endpoints(cas_cleaned, phases)
+            if result is not None:
+                return result
+            phases = [phase for phase in phases if phase[2] != "CID"]
+        
+        for search_type, label, id_key, urls in phases:
+            for endpoint_idx, url in enumerate(urls):
+                try:
+                    response = safe_get(url)
+                    ids = self._parse_identifier_list(response_json(response), id_key)
+                    if ids:
+                        return self._make_search_result(cas_cleaned, search_type, label, id_key, endpoint_idx, ids)
+                except Exception as e:
+                    definitive = definitive and is_not_found_error(e)
+                    self._log_endpoint_failure(cas_cleaned, label, endpoint_idx, e)
+                    continue
+        
+        return self._not_found_result(cas_cleaned, definitive)
+    
+    def _race_cid_endpoints(self, cas_cleaned: str,
+                            phases: List[Tuple[str, str, str, List[str]]]) -> Tuple[Optional[SearchResult], bool]:
+        """
+        CIDを返す全エンドポイントを並行発行し、優先順位を守って最初の確定結果を採用
         
-        # SID取得エンドポイント
-        substance_sid_endpoints = [
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/name/{cas_quoted}/sids/JSON",
-            f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/xref/RN/{cas_cleaned}/sids/JSON"
+        優先度の高いエンドポイントが未完了の間は、低優先度の成功を確定させない
+        （逐次カスケードと同じ結果を返す）。勝者が決まったら未開始のリクエストはキャンセルする。
+        各リクエストは共有レートリミッターを通るため、レート上限は超えない。
+        
+        Returns:
+            (SearchResult or None, 全エンドポイントが404だったか)
+        """
+        candidates = [
+            (search_type, label, id_key, endpoint_idx, url)
+            for search_type, label, id_key, urls in phases if id_key == "CID"
+            for endpoint_idx, url in enumerate(urls)
         ]
+        executor = self._get_race_executor(len(candidates))
+        futures = {executor.submit(self._query_identifiers, url, id_key): pos
+                   for pos, (_, _, id_key, _, url) in enumerate(candidates)}
+        outcomes: List[Optional[Tuple[bool, object]]] = [None] * len(candidates)
+        definitive = True
         
-        # Phase 1: Compound検索
-        for endpoint_idx, url in enumerate(compound_endpoints):
-            try:
-                response = safe_get(url)
-                data = response.json()
-                
-                if "IdentifierList" in data and "CID" in data["IdentifierList"]:
-                    cids = data["IdentifierList"]["CID"]
-                    self.logger.debug(f"CAS '{cas_cleaned}' Compound検索成功 (endpoint {endpoint_idx+1}): {len(cids)} 件のCID取得")
-                    return SearchResult(cids[:CID_LIMIT], [], True, "compound")
+        try:
+            for future in as_completed(futures):
+                pos = futures[future]
+                search_type, label, id_key, endpoint_idx, _ = candidates[pos]
+                try:
+                    outcomes[pos] = (True, future.result())
+                except Exception as e:
+                    outcomes[pos] = (False, e)
+                    definitive = definitive and is_not_found_error(e)
+                    self._log_endpoint_failure(cas_cleaned, label, endpoint_idx, e)
                 
-            except Exception as e:
-                if hasattr(e, 'response') and e.response is not None and e.response.status_code == 404:
-                    self.logger.debug(f"CAS '{cas_cleaned}' Compound endpoint {endpoint_idx+1}: データなし (404)")
-                else:
-                    self.logger.debug(f"CAS '{cas_cleaned}' Compound endpoint {endpoint_idx+1} 失敗: {e}")
-                continue
+                winner = self._pick_race_winner(outcomes)
+                if winner is not None:
+                    search_type, label, id_key, endpoint_idx, _ = candidates[winner]
+                    return self._make_search_result(cas_cleaned, search_type, label, id_key,
+                                                    endpoint_idx, outcomes[winner][1]), definitive
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        return None, definitive
+    
+    @staticmethod
+    def _pick_race_winner(outcomes: List[Optional[Tuple[bool, object]]]) -> Optional[int]:
+        """優先順に見て、上位が全て失敗・空で確定した最初の成功位置を返す（未確定ならNone）"""
+        for pos, outcome in enumerate(outcomes):
+            if outcome is None:
+                return None
+            ok, ids = outcome
+            if ok and ids:
+                return pos
+        return None
+    
+    def _query_identifiers(self, url: str, id_key: str) -> List[int]:
+        response = safe_get(url)
+        return self._parse_identifier_list(response_json(response), id_key)
+    
+    def close(self) -> None:
+        """並行検索用のスレッドプールを終了"""
+        if self._race_executor is not None:
+            self._race_executor.shutdown(wait=False, cancel_futures=True)
+            self._race_executor = None
+    
+    def _get_race_executor(self, workers: int) -> ThreadPoolExecutor:
+        if self._race_executor is None:
+            get_session(workers=workers)
+            self._race_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cas-race")
+        return self._race_executor
+    
+    def _is_known_cas_miss(self, cas_cleaned: str) -> bool:
+        """ネガティブキャッシュに登録済みのCASか（登録済みなら検索を省略）"""
+        negative = get_negative_cache()
+        if negative is not None and negative.cas_missed(cas_cleaned):
+            self.logger.debug(f"CAS '{cas_cleaned}': ネガティブキャッシュ登録済みのため検索をスキップ")
+            return True
+        return False
+    
+    def _not_found_result(self, cas_cleaned: str, definitive: bool) -> SearchResult:
+        """全検索で該当なしの結果を返し、確定的な場合はネガティブキャッシュに登録"""
+        self.logger.info(f"CAS '{cas_cleaned}': 全検索で該当データなし")
+        negative = get_negative_cache()
+        if definitive and negative is not None:
+            negative.record_cas_miss(cas_cleaned)
+        return SearchResult([], [], False, "not_found")
+    
+    def get_cids_from_cas_bulk(self, cas_numbers: List[str], batch_size: int = CAS_BATCH_SIZE) -> Dict[str, SearchResult]:
+        """
+        複数のCAS番号をまとめてCIDに解決（POSTによる一括xref/RN検索）
         
-        # Phase 2: Substance → CID検索
-        for endpoint_idx, url in enumerate(substance_cid_endpoints):
+        1. POST compound/xref/RN/cids でバッチ内の全CASに対応するCIDを一括取得
+        2. POST compound/cid/xrefs/RN で各CIDのRNを取得し、入力CASへ対応付け
+        
+        Args:
+            cas_numbers: CAS番号のリスト（重複・無効な値は除外）
+            batch_size: 1リクエストあたりのCAS数
+        
+        Returns:
+            一括検索で解決できたCAS番号（strip済み）をキーとするSearchResultの辞書。
+            含まれないCASは get_cid_from_cas による個別検索の対象。
+        """
+        targets = self._bulk_search_targets(cas_numbers)
+        if not targets:
+            return {}
+        
+        # 前回までに解決済みのCASはCASごとのキャッシュから取得し、POSTには含めない
+        cached, pending = get_cached_per_id(targets, self.rn_cids_url)
+        results = self._cached_search_results(cached)
+        total_batches = (len(pending) + batch_size - 1) // batch_size
+        self.logger.info(f"CAS一括検索開始: {len(targets)} 件（キャッシュ済み {len(results)} 件）、"
+                         f"{len(pending)} 件を {total_batches} バッチで処理")
+        
+        for batch_idx, chunk in enumerate(batched(pending, batch_size), 1):
+            chunk_list = list(chunk)
             try:
-                response = safe_get(url)
-                data = response.json()
-                
-                if "IdentifierList" in data and "CID" in data["IdentifierList"]:
-                    cids = data["IdentifierList"]["CID"]
-                    self.logger.debug(f"CAS '{cas_cleaned}' Substance→CID検索成功 (endpoint {endpoint_idx+1}): {len(cids)} 件のCID取得")
-                    return SearchResult(cids[:CID_LIMIT], [], True, "substance_cid")
-                
+                response = safe_post(self.CAS_BULK_URL, {"RN": ",".join(chunk_list)}, cache=False)
+                cids = self._parse_identifier_list(response_json(response), "CID")
             except Exception as e:
-                if hasattr(e, 'response') and e.response is not None and e.response.status_code == 404:
-                    self.logger.debug(f"CAS '{cas_cleaned}' Substance→CID endpoint {endpoint_idx+1}: データなし (404)")
-                else:
-                    self.logger.debug(f"CAS '{cas_cleaned}' Substance→CID endpoint {endpoint_idx+1} 失敗: {e}")
+                self.logger.debug(f"CAS一括検索 バッチ {batch_idx}/{total_batches}: 失敗 - {e}")
+                continue
+            if not cids:
                 continue
+            
+            matched = self._match_bulk_cids(chunk_list, self.fetch_rn_xrefs_bulk(cids))
+            self._cache_search_results(matched)
+            results.update(matched)
+            self.logger.info(f"CAS一括検索 バッチ {batch_idx}/{total_batches}: {len(matched)}/{len(chunk_list)} 件解決")
+        
+        self.logger.info(f"CAS一括検索完了: {len(results)}/{len(targets)} 件解決、残り {len(targets) - len(results)} 件は個別検索")
+        return results
+    
+    def rn_cids_url(self, cas_cleaned: str) -> str:
+        """CAS番号（RN）→CIDの単一検索URL（一括検索の結果もCASごとにこのURLでキャッシュする）"""
+        return f"{self.PUG_REST}/compound/xref/RN/{cas_cleaned}/cids/JSON"
+    
+    def _cached_search_results(self, cached: Dict[str, Dict]) -> Dict[str, SearchResult]:
+        """CASごとのキャッシュ（IdentifierList）から検索結果を作成"""
+        results = {}
+        for cas, data in cached.items():
+            cids = self._parse_identifier_list(data, "CID")
+            if cids:
+                self.logger.debug(f"CAS '{cas}' キャッシュから取得: {len(cids)} 件のCID")
+                results[cas] = SearchResult(cids[:CID_LIMIT], [], True, "compound")
+        return results
+    
+    def _cache_search_results(self, matched: Dict[str, SearchResult]) -> None:
+        """一括検索で解決したCASを、単一検索と同じ形式でCASごとにキャッシュ"""
+        cache_per_id({cas: {"IdentifierList": {"CID": result.cids}} for cas, result in matched.items()},
+                     self.rn_cids_url)
+    
+    def _bulk_search_targets(self, cas_numbers: List[str]) -> List[str]:
+        """一括検索の対象（有効な形式・重複なし・ネガティブキャッシュ未登録のCAS）"""
+        return [cas for cas in dict.fromkeys(c.strip() for c in cas_numbers if validate_cas(c))
+                if not self._is_known_cas_miss(cas)]
+    
+    def _match_bulk_cids(self, chunk_list: List[str], rn_xrefs: Dict[int, List[str]]) -> Dict[str, SearchResult]:
+        """
+        一括検索で得たCIDのRN一覧から、バッチ内の入力CASへの対応を復元
+        
+        CIDの順序は一括検索の返却順を維持し、RNに入力CASを含まないCIDは捨てる。
+        対応するCIDが無いCASは結果に含めない（個別検索の対象）。
+        """
+        wanted = set(chunk_list)
+        matched: Dict[str, List[int]] = {}
+        for cid, rns in rn_xrefs.items():
+            for rn in rns:
+                if rn in wanted and cid not in matched.setdefault(rn, []):
+                    matched[rn].append(cid)
         
-        # Phase 3: SID取得（CIDが見つからない場合）
-        for endpoint_idx, url in enumerate(substance_sid_endpoints):
+        results = {}
+        for cas, cas_cids in matched.items():
+            self.logger.debug(f"CAS '{cas}' 一括検索成功: {len(cas_cids)} 件のCID取得")
+            results[cas] = SearchResult(cas_cids[:CID_LIMIT], [], True, "compound")
+        return results
+    
+    def fetch_rn_xrefs_bulk(self, cids: List[int], batch_size: int = CAS_BATCH_SIZE) -> Dict[int, List[str]]:
+        """複数CIDのRN（CAS登録番号）xrefをPOSTで一括取得（応答の順序に関係なく、cidsの順序で返す）"""
+        out: Dict[int, List[str]] = {}
+        for chunk in batched(list(dict.fromkeys(cids)), batch_size):
+            chunk_list = list(chunk)
             try:
-                response = safe_get(url)
-                data = response.json()
-                
-                if "IdentifierList" in data and "SID" in data["IdentifierList"]:
-                    sids = data["IdentifierList"]["SID"]
-                    self.logger.debug(f"CAS '{cas_cleaned}' SID検索成功 (endpoint {endpoint_idx+1}): {len(sids)} 件のSID取得")
-                    return SearchResult([], sids[:CID_LIMIT], True, "substance_sid")
-                
+                info = self._post_cid_information("xrefs/RN", chunk_list)
             except Exception as e:
-                if hasattr(e, 'response') and e.response is not None and e.response.status_code == 404:
-                    self.logger.debug(f"CAS '{cas_cleaned}' SID endpoint {endpoint_idx+1}: データなし (404)")
-                else:
-                    self.logger.debug(f"CAS '{cas_cleaned}' SID endpoint {endpoint_idx+1} 失敗: {e}")
+                self.logger.debug(f"RN xref一括取得失敗 ({len(chunk_list)} CID): {e}")
                 continue
+            for cid in chunk_list:
+                if cid in info:
+                    out.setdefault(cid, []).extend(info[cid].get("RN", []))
+        return out
+    
+    def _post_cid_information(self, operation: str, cids: List[int]) -> Dict[int, Dict]:
+        """
+        POST compound/cid/{operation}/JSON をCIDリストで発行し、CIDごとのInformationを返す
         
-        self.logger.info(f"CAS '{cas_cleaned}': 全検索で該当データなし")
-        return SearchResult([], [], False, "not_found")
+        結果はCIDごとにキャッシュし（単一CIDのGETと同じURL・形式）、キャッシュ済みのCIDはPOSTに含めない。
+        404（該当データなし）は空の辞書として扱い、それ以外のエラーは送出する
+        """
+        id_url = self.cid_information_url(operation)
+        cached, pending = get_cached_per_id(cids, id_url)
+        out = self._cached_information(cached)
+        if not pending:
+            return out
+        try:
+            response = safe_post(f"{self.PUG_REST}/compound/cid/{operation}/JSON",
+                                 {"cid": ",".join(map(str, pending))}, cache=False)
+            fetched = self._information_by_cid(response_json(response))
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            fetched = {}
+        self._cache_information(fetched, pending, id_url)
+        out.update(fetched)
+        return out
+    
+    def cid_information_url(self, operation: str) -> Callable[[int], str]:
+        """CID → 単一CIDの compound/cid/{cid}/{operation}/JSON のURL"""
+        return lambda cid: f"{self.PUG_REST}/compound/cid/{cid}/{operation}/JSON"
+    
+    def _information_by_cid(self, data: Dict) -> Dict[int, Dict]:
+        """InformationListレスポンスをCID → Informationに変換"""
+        return {info["CID"]: info for info in self._parse_information_list(data) if "CID" in info}
+    
+    def _cached_information(self, cached: Dict[int, Dict]) -> Dict[int, Dict]:
+        """CIDごとのキャッシュ（単一CIDのInformationList）をCID → Informationに変換"""
+        out = {}
+        for data in cached.values():
+            out.update(self._information_by_cid(data))
+        return out
+    
+    @staticmethod
+    def _cache_information(fetched: Dict[int, Dict], requested: List[int], id_url: Callable[[int], str]) -> None:
+        """一括取得したInformationをCIDごとにキャッシュ（レスポンスに無いCIDは404としてネガティブキャッシュに登録）"""
+        cache_per_id({cid: {"InformationList": {"Information": [info]}} for cid, info in fetched.items()},
+                     id_url, not_found=[cid for cid in requested if cid not in fetched])
+    
+    @staticmethod
+    def _parse_information_list(data: Dict) -> List[Dict]:
+        """InformationListレスポンスからInformation一覧を取得"""
+        if "InformationList" in data and "Information" in data["InformationList"]:
+            return data["InformationList"]["Information"]
+        return []
+    
+    def _cas_search_phases(self, cas_cleaned: str) -> List[Tuple[str, str, str, List[str]]]:
+        """
+        CAS検索の各フェーズ (search_type, ログ表示名, 識別子キー, エンドポイント一覧) を優先順に返す
+        """
+        cas_quoted = urllib.parse.quote(cas_cleaned)
+        return [
+            # Phase 1: Compound検索エンドポイント（優先）
+            ("compound", "Compound", "CID", [
+                self.rn_cids_url(cas_cleaned),
+                f"{self.PUG_REST}/compound/name/{cas_quoted}/cids/JSON",
+            ]),
+            # Phase 2: Substance → CID検索（フォールバック）
+            ("substance_cid", "Substance→CID", "CID", [
+                f"{self.PUG_REST}/substance/name/{cas_quoted}/cids/JSON",
+                f"{self.PUG_REST}/substance/xref/RN/{cas_cleaned}/cids/JSON",
+            ]),
+            # Phase 3: SID取得（CIDが見つからない場合）
+            ("substance_sid", "SID", "SID", [
+                f"{self.PUG_REST}/substance/name/{cas_quoted}/sids/JSON",
+                f"{self.PUG_REST}/substance/xref/RN/{cas_cleaned}/sids/JSON",
+            ]),
+        ]
+    
+    @staticmethod
+    def _parse_identifier_list(data: Dict, id_key: str) -> List[int]:
+        """IdentifierListレスポンスから識別子リストを取得"""
+        if "IdentifierList" in data and id_key in data["IdentifierList"]:
+            return data["IdentifierList"][id_key]
+        return []
+    
+    def _make_search_result(self, cas_cleaned: str, search_type: str, label: str, id_key: str,
+                            endpoint_idx: int, ids: List[int]) -> SearchResult:
+        """検索成功時のSearchResultを作成"""
+        self.logger.debug(f"CAS '{cas_cleaned}' {label}検索成功 (endpoint {endpoint_idx+1}): {len(ids)} 件の{id_key}取得")
+        if id_key == "SID":
+            return SearchResult([], ids[:CID_LIMIT], True, search_type)
+        return SearchResult(ids[:CID_LIMIT], [], True, search_type)
+    
+    def _log_endpoint_failure(self, cas_cleaned: str, label: str, endpoint_idx: int, e: Exception) -> None:
+        """エンドポイント失敗時のログ出力（404はデータなし扱い）"""
+        if is_not_found_error(e):
+            self.logger.debug(f"CAS '{cas_cleaned}' {label} endpoint {endpoint_idx+1}: データなし (404)")
+        else:
+            self.logger.debug(f"CAS '{cas_cleaned}' {label} endpoint {endpoint_idx+1} 失敗: {e}")
     
     def get_sid_properties(self, sid: int) -> Dict[str, any]:
         """
@@ -117,106 +400,206 @@ class PubChemClient:
         """
         try:
             # SIDの基本情報取得
-            url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/sid/{sid}/JSON"
+            url = f"{self.PUG_REST}/substance/sid/{sid}/JSON"
             response = safe_get(url)
-            data = response.json()
+            data = response_json(response)
             
             properties = {}
             
             if "PC_Substances" in data and len(data["PC_Substances"]) > 0:
-                substance = data["PC_Substances"][0]
-                
-                # Title取得
-                if "source" in substance and "db" in substance["source"] and "name" in substance["source"]["db"]:
-                    properties["Title"] = substance["source"]["db"]["name"]
-                
-                # Synonyms取得（タイトルとして使用）
-                if "synonyms" in substance and len(substance["synonyms"]) > 0:
-                    if "Title" not in properties:
-                        properties["Title"] = substance["synonyms"][0]
-                
-                # 化学構造情報の取得
-                if "compound" in substance and len(substance["compound"]) > 0:
-                    compound_data = substance["compound"][0]
-                    
-                    # SMILES情報の検索
-                    if "props" in compound_data:
-                        for prop in compound_data["props"]:
-                            if "urn" in prop and "label" in prop["urn"]:
-                                label = prop["urn"]["label"].upper()
-                                
-                                # SMILES関連のプロパティを検索
-                                if "SMILES" in label and "value" in prop and "sval" in prop["value"]:
-                                    smiles = prop["value"]["sval"]
-                                    if "CANONICAL" in label or "ISOMERIC" not in label:
-                                        properties["SMILES"] = smiles
-                                    if "ISOMERIC" in label:
-                                        properties["IsomericSMILES"] = smiles
-                                    self.logger.debug(f"SID {sid}: SMILES取得 - {label}: {smiles}")
-                                
-                                # InChI情報も取得
-                                elif "INCHI" in label and "value" in prop and "sval" in prop["value"]:
-                                    inchi = prop["value"]["sval"]
-                                    properties["InChI"] = inchi
-                                    self.logger.debug(f"SID {sid}: InChI取得: {inchi}")
+                properties = self._parse_substance_record(sid, data["PC_Substances"][0])
                 
                 # 関連CID取得試行
                 try:
-                    cid_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/substance/sid/{sid}/cids/JSON"
+                    cid_url = f"{self.PUG_REST}/substance/sid/{sid}/cids/JSON"
                     cid_response = safe_get(cid_url)
-                    cid_data = cid_response.json()
-                    
-                    if "IdentifierList" in cid_data and "CID" in cid_data["IdentifierList"]:
-                        related_cids = cid_data["IdentifierList"]["CID"]
+                    related_cids = self._parse_related_cids(sid, response_json(cid_response))
+                    if related_cids:
                         properties["Related_CIDs"] = related_cids
-                        self.logger.debug(f"SID {sid}: 関連CID {related_cids}")
                 except:
                     pass
             
-            # SIDからSMILESが取得できた場合はログ出力
-            if "SMILES" in properties or "IsomericSMILES" in properties:
-                self.logger.info(f"SID {sid}: 構造情報取得成功 (SMILES利用可能)")
-            
-            self.logger.debug(f"SID {sid}: プロパティ取得成功")
+            self._log_sid_properties(sid, properties)
             return properties
             
         except Exception as e:
             self.logger.warning(f"SID {sid}: プロパティ取得失敗 - {e}")
             return {}
     
+    def fetch_sid_properties_batched(self, sids: List[int], batch_size: int = CAS_BATCH_SIZE) -> Dict[int, Dict[str, any]]:
+        """
+        複数SIDのプロパティをまとめて取得（get_sid_propertiesの一括版）
+        
+        1バッチあたり2リクエスト:
+        - POST substance/sid/JSON: Substanceレコード（Title/SMILES/InChI）
+        - POST substance/sid/cids/JSON?list_return=grouped: SID→関連CID
+        バッチ取得に失敗した場合はそのバッチのみSIDごとの取得にフォールバック
+        """
+        res: Dict[int, Dict[str, any]] = {}
+        unique_sids = list(dict.fromkeys(sids))
+        if not unique_sids:
+            return res
+        
+        total_batches = (len(unique_sids) + batch_size - 1) // batch_size
+        self.logger.info(f"SIDプロパティ一括取得開始: {len(unique_sids)} SID を {total_batches} バッチで処理")
+        
+        for batch_idx, chunk in enumerate(batched(unique_sids, batch_size), 1):
+            chunk_list = list(chunk)
+            body = {"sid": ",".join(map(str, chunk_list))}
+            try:
+                response = safe_post(f"{self.PUG_REST}/substance/sid/JSON", body)
+                res.update(self._parse_substance_batch(response_json(response)))
+            except Exception as e:
+                self.logger.warning(f"SIDバッチ {batch_idx}/{total_batches}: 一括取得失敗、個別取得にフォールバック - {e}")
+                for sid in chunk_list:
+                    res[sid] = self.get_sid_properties(sid)
+                continue
+            
+            # 関連CID取得試行
+            try:
+                cid_response = safe_post(f"{self.PUG_REST}/substance/sid/cids/JSON?list_return=grouped", body)
+                self._apply_related_cids(res, response_json(cid_response))
+            except Exception as e:
+                self.logger.debug(f"SIDバッチ {batch_idx}/{total_batches}: 関連CID取得失敗 - {e}")
+            
+            self._finish_sid_batch(batch_idx, total_batches, chunk_list, res)
+        
+        return res
+    
+    def _parse_substance_batch(self, data: Dict) -> Dict[int, Dict[str, any]]:
+        """POST substance/sid/JSON のレスポンスからSIDごとのプロパティを抽出"""
+        res = {}
+        for substance in data.get("PC_Substances", []):
+            sid = substance.get("sid", {}).get("id")
+            if sid is not None:
+                res[sid] = self._parse_substance_record(sid, substance)
+        return res
+    
+    def _apply_related_cids(self, res: Dict[int, Dict[str, any]], data: Dict) -> None:
+        """SID→関連CID（list_return=grouped）のレスポンスを取得済みのプロパティに追加"""
+        for info in self._parse_information_list(data):
+            sid = info.get("SID")
+            if sid in res and info.get("CID"):
+                res[sid]["Related_CIDs"] = info["CID"]
+                self.logger.debug(f"SID {sid}: 関連CID {info['CID']}")
+    
+    def _finish_sid_batch(self, batch_idx: int, total_batches: int, chunk_list: List[int],
+                          res: Dict[int, Dict[str, any]]) -> None:
+        """バッチ内の各SIDの取得結果をログ出力し、レコードが無かったSIDは空のプロパティにする"""
+        for sid in chunk_list:
+            if sid in res:
+                self._log_sid_properties(sid, res[sid])
+            else:
+                res[sid] = {}
+                self.logger.warning(f"SID {sid}: プロパティ取得失敗 - レコードなし")
+        self.logger.info(f"SIDバッチ {batch_idx}/{total_batches}: {len(chunk_list)} 件処理")
+    
+    def _parse_substance_record(self, sid: int, substance: Dict) -> Dict[str, any]:
+        """PC_Substancesの1レコードからTitle/SMILES/InChIを抽出"""
+        properties = {}
+        
+        # Title取得
+        if "source" in substance and "db" in substance["source"] and "name" in substance["source"]["db"]:
+            properties["Title"] = substance["source"]["db"]["name"]
+        
+        # Synonyms取得（タイトルとして使用）
+        if "synonyms" in substance and len(substance["synonyms"]) > 0:
+            if "Title" not in properties:
+                properties["Title"] = substance["synonyms"][0]
+        
+        # 化学構造情報の取得
+        if "compound" in substance and len(substance["compound"]) > 0:
+            compound_data = substance["compound"][0]
+            
+            # SMILES情報の検索
+            if "props" in compound_data:
+                for prop in compound_data["props"]:
+                    if "urn" in prop and "label" in prop["urn"]:
+                        label = prop["urn"]["label"].upper()
+                        
+                        # SMILES関連のプロパティを検索
+                        if "SMILES" in label and "value" in prop and "sval" in prop["value"]:
+                            smiles = prop["value"]["sval"]
+                            if "CANONICAL" in label or "ISOMERIC" not in label:
+                                properties["SMILES"] = smiles
+                            if "ISOMERIC" in label:
+                                properties["IsomericSMILES"] = smiles
+                            self.logger.debug(f"SID {sid}: SMILES取得 - {label}: {smiles}")
+                        
+                        # InChI情報も取得
+                        elif "INCHI" in label and "value" in prop and "sval" in prop["value"]:
+                            inchi = prop["value"]["sval"]
+                            properties["InChI"] = inchi
+                            self.logger.debug(f"SID {sid}: InChI取得: {inchi}")
+        
+        return properties
+    
+    def _parse_related_cids(self, sid: int, cid_data: Dict) -> List[int]:
+        """SID→CIDレスポンスから関連CIDを取得"""
+        related_cids = self._parse_identifier_list(cid_data, "CID")
+        if related_cids:
+            self.logger.debug(f"SID {sid}: 関連CID {related_cids}")
+        return related_cids
+    
+    def _log_sid_properties(self, sid: int, properties: Dict) -> None:
+        # SIDからSMILESが取得できた場合はログ出力
+        if "SMILES" in properties or "IsomericSMILES" in properties:
+            self.logger.info(f"SID {sid}: 構造情報取得成功 (SMILES利用可能)")
+        
+        self.logger.debug(f"SID {sid}: プロパティ取得成功")
+    
     def get_cas_pairs(self, cid: int) -> List[Tuple[str, str]]:
         """CIDからCAS番号のリスト（preferred + synonym）を取得"""
         pairs = []
         
         # preferred CAS取得
         try:
-            rn_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/xrefs/RN/JSON"
+            rn_url = f"{self.PUG_REST}/compound/cid/{cid}/xrefs/RN/JSON"
             rn_response = safe_get(rn_url)
-            rn_data = rn_response.json()
-            if "InformationList" in rn_data and "Information" in rn_data["InformationList"]:
-                rn = rn_data["InformationList"]["Information"][0]["RN"]
-                preferred_cas = [c for c in rn if CAS_RE.match(c)]
-                pairs.extend([(c, "preferred") for c in preferred_cas])
-                self.logger.debug(f"CID {cid}: {len(preferred_cas)} 件のpreferred CAS取得")
+            pairs.extend(self._parse_preferred_cas(cid, response_json(rn_response)))
         except Exception as e:
             self.logger.debug(f"CID {cid}: preferred CAS取得失敗 - {e}")
         
         # synonym CAS取得 (最大 MAX_SYNONYM 件)
-        if len(pairs) < 1 + MAX_SYNONYM:
+        if self._needs_synonyms(pairs):
             try:
-                syn_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/synonyms/JSON"
+                syn_url = f"{self.PUG_REST}/compound/cid/{cid}/synonyms/JSON"
                 syn_response = safe_get(syn_url)
-                syn_data = syn_response.json()
-                if "InformationList" in syn_data and "Information" in syn_data["InformationList"]:
-                    syns = syn_data["InformationList"]["Information"][0]["Synonym"]
-                    extras = [s for s in syns if CAS_RE.match(s)][:MAX_SYNONYM]
-                    pairs.extend([(s, "synonym") for s in extras])
-                    self.logger.debug(f"CID {cid}: {len(extras)} 件のsynonym CAS取得")
+                pairs.extend(self._parse_synonym_cas(cid, response_json(syn_response)))
             except Exception as e:
                 self.logger.debug(f"CID {cid}: synonym CAS取得失敗 - {e}")
         
         return pairs
     
+    def _parse_preferred_cas(self, cid: int, rn_data: Dict) -> List[Tuple[str, str]]:
+        """xrefs/RNレスポンスからpreferred CASを抽出"""
+        if "InformationList" in rn_data and "Information" in rn_data["InformationList"]:
+            return self._preferred_pairs(cid, rn_data["InformationList"]["Information"][0]["RN"])
+        return []
+    
+    def _preferred_pairs(self, cid: int, rn: List[str]) -> List[Tuple[str, str]]:
+        """RN一覧からCAS形式のものをpreferredとして抽出"""
+        preferred_cas = [c for c in rn if CAS_RE.match(c)]
+        self.logger.debug(f"CID {cid}: {len(preferred_cas)} 件のpreferred CAS取得")
+        return [(c, "preferred") for c in preferred_cas]
+    
+    @staticmethod
+    def _needs_synonyms(pairs: List[Tuple[str, str]]) -> bool:
+        """synonym CASの追加取得が必要か"""
+        return len(pairs) < 1 + MAX_SYNONYM
+    
+    def _parse_synonym_cas(self, cid: int, syn_data: Dict) -> List[Tuple[str, str]]:
+        """synonymsレスポンスからCAS形式の同義語を抽出（最大 MAX_SYNONYM 件）"""
+        if "InformationList" in syn_data and "Information" in syn_data["InformationList"]:
+            return self._synonym_pairs(cid, syn_data["InformationList"]["Information"][0]["Synonym"])
+        return []
+    
+    def _synonym_pairs(self, cid: int, syns: List[str]) -> List[Tuple[str, str]]:
+        """同義語一覧からCAS形式のものを最大 MAX_SYNONYM 件抽出"""
+        extras = [s for s in syns if CAS_RE.match(s)][:MAX_SYNONYM]
+        self.logger.debug(f"CID {cid}: {len(extras)} 件のsynonym CAS取得")
+        return [(s, "synonym") for s in extras]
+    
     def choose_best_cas(self, cid_dict: Dict[str, List[Tuple[str, str]]], original_cas: str = "") -> Tuple[str, str]:
         """代表CASを選定"""
         # 元のCASが見つかったらそれを優先
@@ -244,77 +627,172 @@ class PubChemClient:
         self.logger.debug(f"CID {cid}: 最短CAS '{cas}' を採用")
         return cid, cas
     
-    def fetch_properties_batched(self, cids: List[int]) -> Dict[int, dict]:
-        """バッチでCIDのプロパティを取得"""
+    def fetch_properties_batched(self, cids: List[int], properties: Optional[List[str]] = None,
+                                 sizer: Optional[AdaptiveChunkSizer] = None,
+                                 on_batch: Optional[Callable[[Dict[int, dict]], None]] = None) -> Dict[int, dict]:
+        """
+        バッチでCIDのプロパティを取得（適応的バッチサイズ）
+        
+        Args:
+            cids: CIDリスト
+            properties: 取得するプロパティ名（Noneはインスタンス設定、BASE_PROPERTY_FIELDSは常に含む）
+            sizer: 呼び出し間でバッチサイズの学習結果を引き継ぐ場合に指定（Noneは新規作成）
+            on_batch: バッチ完了ごとにそのバッチの取得結果で呼ばれるコールバック（チェックポイント記録用）
+        
+        - CIDリストはPOSTボディで送るため、URL長の制限を受けない
+        - 応答が速い間はバッチサイズを拡大し、遅延・タイムアウト時は縮小（AdaptiveChunkSizer）
+        - 失敗したバッチは再帰的に二分割するため、不正なCIDが1件あっても追加リクエストはO(log n)
+        """
         res = {}
         if not cids:
             return res
         
-        prop_url_template = ("https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/"
-                           "{cids}/property/Title,CanonicalSMILES,IsomericSMILES/JSON")
+        sizer = sizer or AdaptiveChunkSizer()
+        fields = self.normalize_properties(properties) if properties else self.properties
+        url = self.property_url(properties=fields)
+        id_url = self.property_id_url(fields)
         
-        total_chunks = len(list(batched(cids, CHUNK_SIZE)))
+        # 取得済みのCIDはCIDごとのキャッシュから取得し、POSTには含めない
+        cached, pending = get_cached_per_id(cids, id_url)
+        res.update(self._cached_properties(cached))
+        if res and on_batch is not None:
+            on_batch(dict(res))
         
-        self.logger.info(f"プロパティ取得開始: {len(cids)} CID を {total_chunks} バッチで処理")
+        self.logger.info(f"プロパティ取得開始: {len(pending)} CID（キャッシュ済み {len(res)} 件、初期バッチサイズ {sizer.size}）")
         
-        for chunk_idx, chunk in enumerate(batched(cids, CHUNK_SIZE), 1):
-            chunk_list = list(chunk)
-            url = prop_url_template.format(cids=",".join(map(str, chunk_list)))
-            
-            try:
-                response = safe_get(url)
-                data = response.json()
-                if "PropertyTable" in data and "Properties" in data["PropertyTable"]:
-                    props = data["PropertyTable"]["Properties"]
-                    for p in props:
-                        res[p["CID"]] = p
-                    self.logger.info(f"バッチ {chunk_idx}/{total_chunks}: {len(props)} 件のプロパティ取得成功")
-            except Exception as e:
-                self.logger.warning(f"バッチ {chunk_idx}/{total_chunks}: バッチ取得失敗、個別取得にフォールバック - {e}")
-                # fallback 個別
-                for cid in chunk_list:
-                    try:
-                        single_response = safe_get(prop_url_template.format(cids=cid))
-                        single_data = single_response.json()
-                        if "PropertyTable" in single_data and "Properties" in single_data["PropertyTable"]:
-                            single = single_data["PropertyTable"]["Properties"][0]
-                            res[cid] = single
-                            self.logger.debug(f"CID {cid}: 個別プロパティ取得成功")
-                    except Exception as single_e:
-                        self.logger.warning(f"CID {cid}: 個別プロパティ取得失敗 - {single_e}")
-            
-            time.sleep(SLEEP_PROP)
+        pos, chunk_idx = 0, 0
+        while pos < len(pending):
+            chunk_list = pending[pos:pos + sizer.size]
+            pos += len(chunk_list)
+            chunk_idx += 1
+            batch: Dict[int, dict] = {}
+            fetched = self._fetch_property_chunk(url, chunk_list, sizer, batch, id_url)
+            res.update(batch)
+            if on_batch is not None and batch:
+                on_batch(batch)
+            self.logger.info(f"バッチ {chunk_idx} ({pos}/{len(pending)} CID): {fetched} 件のプロパティ取得成功")
         
         self.logger.info(f"プロパティ取得完了: {len(res)} 件成功")
         return res
     
-    def fetch_cas_parallel(self, cids: List[int], workers: int = 2) -> Dict[int, List[Tuple[str, str]]]:
-        """並列でCIDからCAS情報を取得"""
-        if not cids:
-            return {}
+    def property_id_url(self, properties: List[str]) -> Callable[[int], str]:
+        """CID → 単一CIDのプロパティテーブルのURL（一括取得の結果もCIDごとにこのURLでキャッシュする）"""
+        return lambda cid: self.property_url([cid], properties)
+    
+    def _cached_properties(self, cached: Dict[int, Dict]) -> Dict[int, dict]:
+        """CIDごとのキャッシュ（単一CIDのPropertyTable）をCID → プロパティに変換"""
+        return {p["CID"]: p for data in cached.values() for p in self._parse_property_table(data)}
+    
+    @staticmethod
+    def _cache_properties(props: List[dict], id_url: Callable[[int], str]) -> None:
+        """一括取得したプロパティを単一CIDのPropertyTableの形式でCIDごとにキャッシュ"""
+        cache_per_id({p["CID"]: {"PropertyTable": {"Properties": [p]}} for p in props}, id_url)
+    
+    def _fetch_property_chunk(self, url: str, chunk: List[int], sizer: AdaptiveChunkSizer,
+                              res: Dict[int, dict], id_url: Callable[[int], str]) -> int:
+        """
+        1バッチ分のプロパティを取得してresに格納（失敗時は二分割して再帰）
         
-        out, lock = {}, threading.Lock()
+        Returns:
+            取得できたプロパティ件数
+        """
+        started = time.monotonic()
+        try:
+            # タイムアウトはリトライせず、すぐにバッチを縮小・分割する
+            response = safe_post(url, {"cid": ",".join(map(str, chunk))}, cache=False, retry_timeouts=False)
+            props = self._parse_property_table(response_json(response))
+        except Exception as e:
+            if self._is_overload_error(e):
+                sizer.record_timeout()
+            halves = self._split_failed_chunk(chunk, e)
+            if halves is None:
+                return 0
+            return sum(self._fetch_property_chunk(url, half, sizer, res, id_url) for half in halves)
         
-        def worker(sub):
-            for cid in sub:
-                try:
-                    pairs = self.get_cas_pairs(cid)
-                    with lock:
-                        out[cid] = pairs
-                    self.logger.debug(f"CID {cid}: {len(pairs)} 件のCAS取得完了")
-                except Exception as e:
-                    self.logger.warning(f"CID {cid}: CAS取得失敗 - {e}")
-                time.sleep(SLEEP_CAS)
+        sizer.record_success(len(chunk), time.monotonic() - started)
+        self._cache_properties(props, id_url)
+        for p in props:
+            res[p["CID"]] = p
+        return len(props)
+    
+    def _split_failed_chunk(self, chunk: List[int], e: Exception) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        取得に失敗したバッチを二分割（同期版・非同期版で共有）
         
-        self.logger.info(f"CAS取得開始: {len(cids)} CID を {workers} スレッドで並列処理")
+        Returns:
+            (前半, 後半)、1件のバッチは失敗を記録してNone
+        """
+        if len(chunk) == 1:
+            self.logger.warning(f"CID {chunk[0]}: 個別プロパティ取得失敗 - {e}")
+            return None
+        mid = len(chunk) // 2
+        self.logger.warning(f"{len(chunk)} CID のバッチ取得失敗、{mid}+{len(chunk) - mid} に分割して再試行 - {e}")
+        return chunk[:mid], chunk[mid:]
+    
+    @staticmethod
+    def _is_overload_error(e: Exception) -> bool:
+        """タイムアウト・サーバー側エラー（バッチが大きすぎる可能性）か（requests / aiohttp両対応）"""
+        if isinstance(e, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+            return True
+        response = getattr(e, 'response', None)
+        if response is not None:
+            return response.status_code >= 500
+        return (getattr(e, 'status', None) or 0) >= 500
+    
+    @staticmethod
+    def _parse_property_table(data: Dict) -> List[dict]:
+        """PropertyTableレスポンスからプロパティ一覧を取得"""
+        if "PropertyTable" in data and "Properties" in data["PropertyTable"]:
+            return data["PropertyTable"]["Properties"]
+        return []
+    
+    def fetch_cas_batched(self, cids: List[int], batch_size: int = CAS_BATCH_SIZE,
+                          on_batch: Optional[Callable[[Dict[int, List[Tuple[str, str]]]], None]] = None
+                          ) -> Dict[int, List[Tuple[str, str]]]:
+        """
+        CIDからCAS情報をバッチで取得（get_cas_pairsの一括版）
         
-        chunks = list(batched(cids, max(1, len(cids)//workers)))
-        threads = [threading.Thread(target=worker, args=(ch,)) for ch in chunks]
+        1バッチあたり最大2リクエスト:
+        - POST compound/cid/xrefs/RN: preferred CAS
+        - POST compound/cid/synonyms: preferredが少ないCIDのみsynonym CAS
+        preferred/synonymの判定とMAX_SYNONYMの上限はget_cas_pairsと同じ。
+        バッチ取得がエラーになった場合はそのバッチのみCIDごとの取得にフォールバック
+        on_batch を指定すると、バッチ完了ごとにそのバッチの取得結果で呼ばれる（チェックポイント記録用）
+        """
+        out: Dict[int, List[Tuple[str, str]]] = {}
+        unique_cids = list(dict.fromkeys(cids))
+        if not unique_cids:
+            return out
         
-        for t in threads: 
-            t.start()
-        for t in threads: 
-            t.join()
+        total_batches = (len(unique_cids) + batch_size - 1) // batch_size
+        self.logger.info(f"CAS取得開始: {len(unique_cids)} CID を {total_batches} バッチで一括処理")
+        
+        for batch_idx, chunk in enumerate(batched(unique_cids, batch_size), 1):
+            chunk_list = list(chunk)
+            try:
+                pairs_map = self._preferred_pairs_map(chunk_list, self._post_cid_information("xrefs/RN", chunk_list))
+                need_synonyms = [cid for cid in chunk_list if self._needs_synonyms(pairs_map[cid])]
+                if need_synonyms:
+                    self._add_synonym_pairs(pairs_map, self._post_cid_information("synonyms", need_synonyms))
+                
+                self.logger.info(f"CASバッチ {batch_idx}/{total_batches}: {len(chunk_list)} CID 処理")
+            except Exception as e:
+                self.logger.warning(f"CASバッチ {batch_idx}/{total_batches}: 一括取得失敗、個別取得にフォールバック - {e}")
+                pairs_map = {cid: self.get_cas_pairs(cid) for cid in chunk_list}
+            out.update(pairs_map)
+            if on_batch is not None:
+                on_batch(pairs_map)
         
         self.logger.info(f"CAS取得完了: {len(out)} 件成功")
-        return out
\ No newline at end of file
+        return out
+    
+    def _preferred_pairs_map(self, chunk_list: List[int], rn_info: Dict[int, Dict]) -> Dict[int, List[Tuple[str, str]]]:
+        """CIDごとのRN xrefからpreferred CASを抽出（RNが無いCIDは空リスト）"""
+        return {cid: self._preferred_pairs(cid, rn_info[cid].get("RN", [])) if cid in rn_info else []
+                for cid in chunk_list}
+    
+    def _add_synonym_pairs(self, pairs_map: Dict[int, List[Tuple[str, str]]], syn_info: Dict[int, Dict]) -> None:
+        """CIDごとの同義語からsynonym CASを追加"""
+        for cid, info in syn_info.items():
+            if cid in pairs_map:
+                pairs_map[cid].extend(self._synonym_pairs(cid, info.get("Synonym", [])))
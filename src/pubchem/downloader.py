@@ -0,0 +1,127 @@
+"""
+Concurrent downloader for PubChem full (pug_view) records
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from .full_data_client import PubChemFullDataClient
+from .models import RecordFile
+from .session import get_session
+from .throttling import get_throttle_controller
+from config.settings import FULL_DATA_WORKERS
+
+# (record_key, "CID" / "SID", ID)
+RecordTask = Tuple[str, str, int]
+
+
+class FullRecordDownloader:
+    """
+    pug_viewの完全レコードを上限付きワーカーで並行取得する
+
+    - 全リクエストは共有レートリミッター（safe_get）を通るため、全体のリクエスト数はPubChemの許容範囲に収まる
+    - 投入順はCID昇順、SIDは最後（_submission_order）。レコードサイズは取得前には分からないため、
+      CIDが小さい化合物ほど古くからの汎用化学物質で記録量が多い傾向があるという経験則による並びで、
+      実際のサイズ順ではない。長いダウンロードが終盤に残りにくくすることが目的
+    - 同時実行数はPubChemの負荷状態（X-Throttling-Control）に追従: Yellowで半分、Red/Blackで1本に制限し、
+      リクエスト時間の枠（Request Time）を使い切らないようにする
+    - レコードはパースせずに保存先ファイルへストリーミング保存し、到着順にon_recordへ渡す
+      （呼び出し元スレッドで実行されるため、重複行へのコピー等は逐次）
+    """
+
+    def __init__(self, client: Optional[PubChemFullDataClient] = None, workers: int = FULL_DATA_WORKERS):
+        self.logger = logging.getLogger(__name__)
+        self.client = client or PubChemFullDataClient()
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._elapsed = 0.0
+
+    def download(self, tasks: List[RecordTask], dest: Callable[[str], Path],
+                 on_record: Callable[[str, Optional[RecordFile]], None]) -> Dict[str, Optional[RecordFile]]:
+        """
+        レコードを並行取得してファイルに保存
+
+        Args:
+            tasks: (record_key, "CID"/"SID", ID) のリスト（重複キーは1回だけ取得）
+            dest: record_key → 保存先ファイルパス
+            on_record: レコード到着ごとに (record_key, 保存したRecordFileまたはNone) で呼ばれるコールバック
+
+        Returns:
+            record_key → RecordFile（失敗時はNone）
+        """
+        results: Dict[str, Optional[RecordFile]] = {}
+        ordered = sorted(dict((task[0], task) for task in tasks).values(), key=self._submission_order)
+        if not ordered:
+            return results
+
+        self.logger.info(f"完全データ並行取得開始: {len(ordered)} 件（最大 {self.workers} 並列）")
+        get_session(workers=self.workers)
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="full-record") as executor:
+            # ThreadPoolExecutorは投入順に開始するため、_submission_orderの順に取得が始まる
+            futures = {executor.submit(self._fetch, task, dest(task[0])): task[0] for task in ordered}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="完全データ取得"):
+                record_key = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    self.logger.error(f"{record_key}: 完全データ取得失敗 - {e}")
+                    data = None
+                results[record_key] = data
+                on_record(record_key, data)
+
+        wall = time.monotonic() - started
+        saved = [record for record in results.values() if record is not None]
+        total_bytes = sum(record.size_bytes for record in saved)
+        self.logger.info(
+            f"完全データ並行取得完了: {len(saved)}/{len(results)} 件成功, {total_bytes:,} バイト, {wall:.1f}秒 "
+            f"({len(results) / wall if wall else 0:.2f} 件/秒, 逐次換算 {self._elapsed:.1f}秒)"
+        )
+        return results
+
+    @staticmethod
+    def _submission_order(task: RecordTask) -> Tuple[int, int]:
+        """投入順のキー: CID昇順、SIDはCIDの後（サイズの推定に基づく順序であり、実測値ではない）"""
+        _, data_type, record_id = task
+        return (0 if data_type == "CID" else 1, record_id)
+
+    def _fetch(self, task: RecordTask, file_path: Path) -> Optional[RecordFile]:
+        _, data_type, record_id = task
+        if data_type not in ("CID", "SID"):
+            return None
+        self._acquire_slot()
+        started = time.monotonic()
+        try:
+            return self.client.download_record_to_file(data_type, record_id, file_path)
+        finally:
+            elapsed = time.monotonic() - started
+            self._release_slot(elapsed)
+
+    def _allowed_workers(self) -> int:
+        """PubChemの負荷状態に応じた同時実行数"""
+        state = get_throttle_controller().snapshot()["state"]
+        if state == "Green":
+            return self.workers
+        if state == "Yellow":
+            return max(1, self.workers // 2)
+        return 1
+
+    def _acquire_slot(self) -> None:
+        with self._cond:
+            while self._active >= self._allowed_workers():
+                # 負荷状態の変化を拾うため定期的に再評価
+                self._cond.wait(timeout=1.0)
+            self._active += 1
+
+    def _release_slot(self, elapsed: float) -> None:
+        with self._cond:
+            self._active -= 1
+            self._elapsed += elapsed
+            self._cond.notify_all()
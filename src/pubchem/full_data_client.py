@@ -1,23 +1,69 @@
 """
 PubChem full data client for comprehensive chemical compound information retrieval
 """
-import json
-import time
 import logging
+import os
+import re
+import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from tqdm import tqdm
 
 from .utils import safe_get
-from config.settings import SLEEP_CID, OUTPUT_TIMESTAMP_FORMAT
+from .cache import get_response_cache
+from .models import RecordFile
+from .record_store import RecordStore, record_compression
+from .partial_reader import load_record_sections
+from .record_index import RecordIndex
+from .json_codec import get_json_codec, response_json
+from config.settings import (
+    OUTPUT_TIMESTAMP_FORMAT, STREAM_COPY_BYTES, RECORD_HEADER_SCAN_BYTES, RECORD_DICTIONARY_NAME
+)
 import datetime
 
+# 数値の後の区切り文字まで一致させる（チャンク境界で数値が途中で切れている場合は次のチャンクを待つ）
+_RECORD_NUMBER_RE = re.compile(rb'^\s*\{\s*"Record"\s*:\s*\{.*?"RecordNumber"\s*:\s*(\d+)\s*[,}]', re.DOTALL)
+
+
+class RecordHeaderScanner:
+    """
+    ストリーミング受信中のpug_view JSONから、先頭部分だけでRecordNumberを取得する
+
+    pug_viewのレスポンスは {"Record": {"RecordType": ..., "RecordNumber": ..., ...}} の順で始まるため、
+    先頭のチャンクをRECORD_HEADER_SCAN_BYTESまで蓄積して確認し、見つかった時点で以降の蓄積をやめる。
+    """
+
+    def __init__(self, limit: int = RECORD_HEADER_SCAN_BYTES):
+        self.limit = limit
+        self.record_number: Optional[int] = None
+        self._buffer = b""
+        self._done = False
+
+    def feed(self, chunk: bytes) -> None:
+        if self._done:
+            return
+        self._buffer += chunk
+        match = _RECORD_NUMBER_RE.match(self._buffer)
+        if match:
+            self.record_number = int(match.group(1))
+            self._done = True
+        elif len(self._buffer) >= self.limit:
+            self._done = True
+        if self._done:
+            self._buffer = b""
+
 
 class PubChemFullDataClient:
     """PubChemから化合物の完全なデータを取得するクライアント"""
     
-    def __init__(self):
+    COMPOUND_URL_TEMPLATE = "https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/compound/{cid}/JSON"
+    SUBSTANCE_URL_TEMPLATE = "https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/substance/{sid}/JSON"
+    # 基本情報（分子式・SMILES・IUPAC名）が含まれる最上位セクション
+    BASIC_INFO_SECTIONS = ("Names and Identifiers",)
+    
+    def __init__(self, store: Optional[RecordStore] = None):
         self.logger = logging.getLogger(__name__)
+        self.store = store or RecordStore()
     
     def get_full_compound_data(self, cid: int) -> Optional[Dict]:
         """
@@ -32,30 +78,36 @@ class PubChemFullDataClient:
         """
         try:
             # 正しいPubChem View APIエンドポイント
-            url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/compound/{cid}/JSON"
+            url = self.COMPOUND_URL_TEMPLATE.format(cid=cid)
             self.logger.debug(f"CID {cid}: 全データ取得開始 (PubChem View API)")
             
             response = safe_get(url)
-            data = response.json()
-            
-            # Record/Section形式の検証
-            if "Record" in data and "RecordNumber" in data["Record"]:
-                record_number = data["Record"]["RecordNumber"]
-                if record_number == cid:
-                    data_size = len(json.dumps(data))
-                    self.logger.debug(f"CID {cid}: 全データ取得成功 ({data_size:,} 文字, Record形式)")
-                    return data
-                else:
-                    self.logger.warning(f"CID {cid}: RecordNumber不一致 (期待: {cid}, 実際: {record_number})")
-                    return None
-            else:
-                self.logger.warning(f"CID {cid}: データ形式が不正 (Record形式ではない)")
-                return None
+            return self._validate_compound_record(cid, response_json(response), len(response.content))
                 
         except Exception as e:
             self.logger.error(f"CID {cid}: 全データ取得失敗 - {e}")
             return None
     
+    def _validate_compound_record(self, cid: int, data: Dict, size_bytes: Optional[int] = None) -> Optional[Dict]:
+        """
+        Record/Section形式とRecordNumberの一致を検証
+        
+        Returns:
+            検証に通ったデータ、不正な場合はNone
+        """
+        if "Record" in data and "RecordNumber" in data["Record"]:
+            record_number = data["Record"]["RecordNumber"]
+            if record_number == cid:
+                size_text = f"{size_bytes:,} バイト, " if size_bytes is not None else ""
+                self.logger.debug(f"CID {cid}: 全データ取得成功 ({size_text}Record形式)")
+                return data
+            else:
+                self.logger.warning(f"CID {cid}: RecordNumber不一致 (期待: {cid}, 実際: {record_number})")
+                return None
+        else:
+            self.logger.warning(f"CID {cid}: データ形式が不正 (Record形式ではない)")
+            return None
+    
     def get_full_substance_data(self, sid: int) -> Optional[Dict]:
         """
         SIDから物質の完全なJSONデータを取得（PubChem View API使用）
@@ -68,17 +120,15 @@ class PubChemFullDataClient:
         """
         try:
             # SID用のPubChem View APIエンドポイント
-            url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/substance/{sid}/JSON"
+            url = self.SUBSTANCE_URL_TEMPLATE.format(sid=sid)
             self.logger.debug(f"SID {sid}: 全データ取得開始 (PubChem View API)")
             
             response = safe_get(url)
-            data = response.json()
+            data = response_json(response)
             
             # Record形式の検証（SIDの場合も同じ構造）
             if "Record" in data and "RecordNumber" in data["Record"]:
-                record_number = data["Record"]["RecordNumber"]
-                data_size = len(json.dumps(data))
-                self.logger.debug(f"SID {sid}: 全データ取得成功 ({data_size:,} 文字, Record形式)")
+                self.logger.debug(f"SID {sid}: 全データ取得成功 ({len(response.content):,} バイト, Record形式)")
                 return data
             else:
                 self.logger.warning(f"SID {sid}: データ形式が不正 (Record形式ではない)")
@@ -88,6 +138,91 @@ class PubChemFullDataClient:
             self.logger.error(f"SID {sid}: 全データ取得失敗 - {e}")
             return None
     
+    def download_record_to_file(self, data_type: str, record_id: int, file_path: Path) -> Optional[RecordFile]:
+        """
+        完全データをパースせずにディスクへストリーミング保存
+        
+        - レスポンス本体をチャンク単位でそのまま書き出し、サイズはバイト数で計測
+        - RecordNumberは先頭部分の逐次走査で検証（CIDは一致、SIDは存在のみ確認）
+        - 概要用の基本情報は保存後のファイルから"Names and Identifiers"セクションのみを部分的に読み込んで抽出し、
+          レコード全体は解析しない
+        
+        Args:
+            data_type: "CID" または "SID"
+            record_id: CIDまたはSID
+            file_path: 保存先ファイルパス
+            
+        Returns:
+            保存したレコードの情報、失敗時はNone
+        """
+        label = f"{data_type} {record_id}"
+        if data_type == "CID":
+            url = self.COMPOUND_URL_TEMPLATE.format(cid=record_id)
+        else:
+            url = self.SUBSTANCE_URL_TEMPLATE.format(sid=record_id)
+        tmp_path = file_path.with_name(file_path.name + ".part")
+        try:
+            self.logger.debug(f"{label}: 全データ取得開始 (PubChem View API, ストリーミング保存)")
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            scanner = RecordHeaderScanner()
+            size_bytes = 0
+            response = safe_get(url, stream=True)
+            with response, self.store.open_write(tmp_path) as f:
+                for chunk in response.iter_content(chunk_size=STREAM_COPY_BYTES):
+                    f.write(chunk)
+                    size_bytes += len(chunk)
+                    scanner.feed(chunk)
+            from_cache = getattr(response, "from_cache", False)
+            
+            if scanner.record_number is None:
+                self.logger.warning(f"{label}: データ形式が不正 (Record形式ではない)")
+                tmp_path.unlink(missing_ok=True)
+                return None
+            if data_type == "CID" and scanner.record_number != record_id:
+                self.logger.warning(f"{label}: RecordNumber不一致 (期待: {record_id}, 実際: {scanner.record_number})")
+                tmp_path.unlink(missing_ok=True)
+                return None
+            
+            os.replace(tmp_path, file_path)
+            cache = get_response_cache()
+            if cache is not None and not from_cache:
+                cache.put_file(url, file_path)
+            
+            basic_info = self._extract_basic_info(load_record_sections(file_path, self.BASIC_INFO_SECTIONS) or {})
+            self.logger.debug(f"{label}: 全データ保存成功 ({size_bytes:,} バイト) → {file_path.name}")
+            return RecordFile(file_path, size_bytes, scanner.record_number, basic_info)
+            
+        except Exception as e:
+            self.logger.error(f"{label}: 全データ取得失敗 - {e}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+    
+    def copy_record_file(self, record: RecordFile, file_path: Path) -> Optional[RecordFile]:
+        """保存済みレコードを別の行のファイル名でコピー（同じCID/SIDが複数行にある場合）"""
+        if record.path == file_path:
+            return record
+        if record_compression(record.path) != self.store.compression:
+            self.logger.debug(f"保存形式が異なるため再利用しない: {record.path.name}")
+            return None
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(record.path, file_path)
+            # 辞書付きzstdで保存されたファイルは辞書も一緒にコピー
+            source_dictionary = record.path.parent / RECORD_DICTIONARY_NAME
+            target_dictionary = file_path.parent / RECORD_DICTIONARY_NAME
+            if source_dictionary.exists() and not target_dictionary.exists():
+                shutil.copyfile(source_dictionary, target_dictionary)
+            return RecordFile(file_path, record.size_bytes, record.record_number, record.basic_info)
+        except OSError as e:
+            self.logger.error(f"ファイル保存失敗 {file_path.name}: {e}")
+            return None
+    
+    def compound_file_path(self, compound_id: int, inci_name: str, cas_number: str, output_dir: Path) -> Path:
+        """個別ファイルのパス（{ID}_{CAS}_{INCI名}.json、圧縮保存時は .json.gz / .json.zst）"""
+        safe_inci_name = self._sanitize_filename(inci_name)
+        safe_cas = self._sanitize_filename(cas_number)
+        return output_dir / f"{compound_id}_{safe_cas}_{safe_inci_name}{self.store.suffix}"
+    
     def save_individual_compound_files(self, compounds_data: List[Tuple[int, str, str, Dict]], 
                                      output_dir: Path) -> None:
         """
@@ -100,32 +235,42 @@ class PubChemFullDataClient:
         output_dir.mkdir(parents=True, exist_ok=True)
         
         for compound_id, inci_name, cas_number, full_data in compounds_data:
-            if full_data is None:
-                continue
-                
-            # ファイル名を安全な形式に変換
-            safe_inci_name = self._sanitize_filename(inci_name)
-            safe_cas = self._sanitize_filename(cas_number)
+            self.save_compound_file(compound_id, inci_name, cas_number, full_data, output_dir)
+    
+    def save_compound_file(self, compound_id: int, inci_name: str, cas_number: str,
+                           full_data: Optional[Dict], output_dir: Path) -> Optional[Path]:
+        """
+        1化合物の全データを個別JSONファイルに保存（ダウンロード完了時に逐次呼び出し可能）
+        
+        Returns:
+            保存したファイルのパス、データなし・保存失敗時はNone
+        """
+        if full_data is None:
+            return None
+        
+        # ファイル名を安全な形式に変換
+        file_path = self.compound_file_path(compound_id, inci_name, cas_number, output_dir)
+        filename = file_path.name
+        
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            with self.store.open_write(file_path) as f:
+                f.write(get_json_codec().dumps(full_data))
             
-            filename = f"{compound_id}_{safe_cas}_{safe_inci_name}.json"
-            file_path = output_dir / filename
+            self.logger.info(f"保存完了: {filename} ({file_path.stat().st_size:,} バイト)")
+            return file_path
             
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(full_data, f, ensure_ascii=False, indent=2)
-                
-                self.logger.info(f"保存完了: {filename} ({len(json.dumps(full_data)):,} 文字)")
-                
-            except Exception as e:
-                self.logger.error(f"ファイル保存失敗 {filename}: {e}")
+        except Exception as e:
+            self.logger.error(f"ファイル保存失敗 {filename}: {e}")
+            return None
     
-    def create_compound_summary(self, compounds_data: List[Tuple[int, str, str, Dict]], 
+    def create_compound_summary(self, compounds_data: List[Tuple[int, str, str, Union[Dict, RecordFile, None]]],
                               output_path: Path) -> None:
         """
         化合物データの概要を作成
         
         Args:
-            compounds_data: (CID/SID, INCI名, CAS番号, 全データ) のリスト  
+            compounds_data: (CID/SID, INCI名, CAS番号, 全データまたは保存済みRecordFile) のリスト
             output_path: 概要ファイルのパス
         """
         summary = {
@@ -143,24 +288,34 @@ class PubChemFullDataClient:
                 "inci_name": inci_name,
                 "cas_number": cas_number,
                 "data_available": full_data is not None,
-                "data_size_chars": len(json.dumps(full_data)) if full_data else 0
+                "data_size_bytes": self._record_size(full_data)
             }
             
-            # データが存在する場合、基本情報を抽出
-            if full_data:
+            # データが存在する場合、基本情報を抽出（保存済みレコードは保存時に抽出済み）
+            if isinstance(full_data, RecordFile):
+                compound_summary.update(full_data.basic_info)
+            elif full_data:
                 compound_summary.update(self._extract_basic_info(full_data))
             
             summary["compounds"].append(compound_summary)
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, ensure_ascii=False, indent=2)
+            get_json_codec().dump(summary, output_path)
             
             self.logger.info(f"概要ファイル作成完了: {output_path}")
             
         except Exception as e:
             self.logger.error(f"概要ファイル作成失敗: {e}")
     
+    @staticmethod
+    def _record_size(full_data: Union[Dict, RecordFile, None]) -> int:
+        """レコードのサイズ（バイト）"""
+        if full_data is None:
+            return 0
+        if isinstance(full_data, RecordFile):
+            return full_data.size_bytes
+        return len(get_json_codec().dumps(full_data, compact=True))
+    
     def _sanitize_filename(self, filename: str) -> str:
         """
         ファイル名として安全な文字列に変換
@@ -179,30 +334,31 @@ class PubChemFullDataClient:
     
     def _extract_basic_info(self, full_data: Dict) -> Dict:
         """
-        全データから基本情報を抽出（Record/Section形式用）
+        全データから基本情報を抽出（Record/Section形式用、Section階層の走査は1回のみ）
         """
         basic_info = {}
         
         try:
-            if "Record" not in full_data:
+            index = RecordIndex.from_data(full_data)
+            if index is None:
                 return basic_info
                 
-            record = full_data["Record"]
+            record = index.record
             basic_info["record_type"] = record.get("RecordType", "Unknown")
             basic_info["record_title"] = record.get("RecordTitle", "No Title")
             
             # Molecular Formulaを検索
-            molecular_formula = self._find_section_value(record, "Molecular Formula")
+            molecular_formula = self._find_section_value(index, "Molecular Formula")
             if molecular_formula:
                 basic_info["molecular_formula"] = molecular_formula
             
             # SMILES情報を検索 
-            smiles = self._find_section_value(record, "SMILES")
+            smiles = self._find_section_value(index, "SMILES")
             if smiles:
                 basic_info["smiles"] = smiles
                 
             # IUPAC Nameを検索
-            iupac_name = self._find_section_value(record, "IUPAC Name")
+            iupac_name = self._find_section_value(index, "IUPAC Name")
             if iupac_name:
                 basic_info["iupac_name"] = iupac_name
                 
@@ -211,38 +367,12 @@ class PubChemFullDataClient:
         
         return basic_info
     
-    def _find_section_value(self, record: Dict, target_heading: str) -> Optional[str]:
+    def _find_section_value(self, index: RecordIndex, target_heading: str) -> Optional[str]:
         """
-        Record/Section階層から指定されたTOCHeadingの値を検索
+        TOCHeadingにtarget_headingを含むセクションの値を取得（階層の深さ優先順で最初の値）
         """
         try:
-            sections = record.get("Section", [])
-            return self._search_sections_recursive(sections, target_heading)
+            return index.first_value(target_heading)
         except Exception as e:
             self.logger.debug(f"セクション検索エラー ({target_heading}): {e}")
             return None
-    
-    def _search_sections_recursive(self, sections: List[Dict], target_heading: str) -> Optional[str]:
-        """
-        Section階層を再帰的に検索してTOCHeadingに一致する値を取得
-        """
-        for section in sections:
-            toc_heading = section.get("TOCHeading", "")
-            
-            # 目的のセクションが見つかった場合
-            if target_heading in toc_heading:
-                # Information配列から値を抽出
-                for info in section.get("Information", []):
-                    value = info.get("Value", {})
-                    if "StringWithMarkup" in value and value["StringWithMarkup"]:
-                        return value["StringWithMarkup"][0].get("String", "")
-                    elif "Number" in value and value["Number"]:
-                        return str(value["Number"][0])
-            
-            # 子セクションがある場合は再帰検索
-            if "Section" in section:
-                result = self._search_sections_recursive(section["Section"], target_heading)
-                if result:
-                    return result
-        
-        return None
\ No newline at end of file
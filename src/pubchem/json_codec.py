@@ -0,0 +1,158 @@
+"""
+Pluggable JSON codec (orjson / simdjson with stdlib fallback)
+"""
+import json
+import logging
+import math
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+from config.settings import JSON_BACKEND, JSON_COMPACT
+
+JSON_BACKENDS = ("auto", "orjson", "simdjson", "json")
+
+
+class JsonCodec:
+    """
+    JSONの解析・出力を利用可能な最速のバックエンドで行う
+
+    - 解析: orjson → simdjson → json（標準ライブラリ）の順で、インストールされているものを使用
+    - 出力: orjson → json（simdjsonは解析専用）
+    - 出力は常にUTF-8のバイト列（ensure_ascii=False相当）、インデントは2（compact=Trueで改行・空白なし）
+    - NaN・Infinity はどのバックエンドでも null として出力（JSONの仕様に無い値のため。orjsonの動作に合わせる）
+    - orjsonで出力できない値（64bitを超える整数等）を含む場合は、その呼び出しのみ標準ライブラリで出力
+    """
+
+    def __init__(self, backend: str = JSON_BACKEND, compact: bool = JSON_COMPACT):
+        self.logger = logging.getLogger(__name__)
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"未対応のJSONバックエンド: {backend}（{', '.join(JSON_BACKENDS)}）")
+        if backend == "orjson" and orjson is None:
+            raise ImportError("orjsonバックエンドには orjson パッケージが必要です (pip install orjson)")
+        if backend == "simdjson" and simdjson is None:
+            raise ImportError("simdjsonバックエンドには pysimdjson パッケージが必要です (pip install pysimdjson)")
+        self.compact = compact
+
+        if backend in ("auto", "orjson") and orjson is not None:
+            self.load_backend = "orjson"
+        elif backend in ("auto", "simdjson") and simdjson is not None:
+            self.load_backend = "simdjson"
+        else:
+            self.load_backend = "json"
+        self.dump_backend = "orjson" if backend in ("auto", "orjson") and orjson is not None else "json"
+
+    @property
+    def name(self) -> str:
+        """使用中のバックエンド（解析/出力）"""
+        return f"{self.load_backend}/{self.dump_backend}"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """JSONを解析"""
+        if self.load_backend == "orjson":
+            return orjson.loads(data)
+        if self.load_backend == "simdjson":
+            return simdjson.loads(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any, compact: Optional[bool] = None, default: Optional[Callable] = None) -> bytes:
+        """
+        JSONをUTF-8のバイト列として出力
+
+        Args:
+            obj: 出力する値
+            compact: Trueで改行・空白なし（Noneはコーデックの設定に従う）
+            default: JSONで表現できない値の変換関数（json.dumpsのdefaultと同じ）
+        """
+        compact = self.compact if compact is None else compact
+        if self.dump_backend == "orjson":
+            option = orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2)
+            try:
+                return orjson.dumps(obj, default=_float_default(default), option=option)
+            except orjson.JSONEncodeError as e:
+                self.logger.debug(f"orjsonで出力できないため標準ライブラリで出力: {e}")
+        options = {"separators": (",", ":")} if compact else {"indent": 2}
+        try:
+            text = json.dumps(obj, ensure_ascii=False, allow_nan=False, default=default, **options)
+        except ValueError:
+            # NaN・Infinity を含む場合のみ、null に置き換えてから出力し直す
+            text = json.dumps(_replace_non_finite(obj, default), ensure_ascii=False, default=default, **options)
+        return text.encode("utf-8")
+
+    def load(self, path: Path) -> Any:
+        """JSONファイルを読み込み"""
+        with open(path, "rb") as f:
+            return self.loads(f.read())
+
+    def dump(self, obj: Any, path: Path, compact: Optional[bool] = None) -> None:
+        """JSONファイルに保存"""
+        with open(path, "wb") as f:
+            f.write(self.dumps(obj, compact=compact))
+
+
+def _float_default(default: Optional[Callable]) -> Optional[Callable]:
+    """
+    orjson用のdefault: floatのサブクラス（numpy.float64等）は標準ライブラリと同じく数値として出力
+
+    orjsonはfloatのサブクラスをdefaultに渡すため、そのままでは文字列化され標準ライブラリの出力と異なる。
+    """
+    if default is None:
+        return None
+
+    def convert(obj: Any) -> Any:
+        if isinstance(obj, float):
+            return float(obj) if math.isfinite(obj) else None
+        return default(obj)
+    return convert
+
+
+def _replace_non_finite(obj: Any, default: Optional[Callable] = None) -> Any:
+    """NaN・Infinity を None に置き換えたコピー（defaultで変換される値も変換後に置き換え）"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value, default) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value, default) for value in obj]
+    if default is not None and not isinstance(obj, (str, int, bool, type(None))):
+        return _replace_non_finite(default(obj), default)
+    return obj
+
+
+_codec: Optional[JsonCodec] = None
+_codec_lock = threading.Lock()
+
+
+def get_json_codec() -> JsonCodec:
+    """プロセス共有のJSONコーデックを取得"""
+    global _codec
+    with _codec_lock:
+        if _codec is None:
+            _codec = JsonCodec()
+            logging.getLogger(__name__).debug(f"JSONバックエンド: {_codec.name}")
+        return _codec
+
+
+def configure_json_codec(backend: str = JSON_BACKEND, compact: bool = JSON_COMPACT) -> JsonCodec:
+    """プロセス共有のJSONコーデックを設定し直す（スクリプトの --json-backend / --compact-json 用）"""
+    global _codec
+    codec = JsonCodec(backend, compact)
+    with _codec_lock:
+        _codec = codec
+    logging.getLogger(__name__).info(f"JSONバックエンド: {codec.name}{'（コンパクト出力）' if compact else ''}")
+    return codec
+
+
+def response_json(response) -> Any:
+    """requests.Response（キャッシュ済みレスポンスを含む）の本体をJSONとして解析"""
+    return get_json_codec().loads(response.content)
@@ -1,8 +1,9 @@
 """
 Data models for PubChem API responses
 """
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -37,4 +38,13 @@ class SearchResult:
     cids: List[int]
     sids: List[int]
     success: bool
-    search_type: str  # "compound", "substance_cid", "substance_sid"
\ No newline at end of file
+    search_type: str  # "compound", "substance_cid", "substance_sid"
+
+
+@dataclass
+class RecordFile:
+    """ディスクに保存した完全データ（pug_view）レコード"""
+    path: Path
+    size_bytes: int
+    record_number: int
+    basic_info: Dict = field(default_factory=dict)  # create_compound_summary用の基本情報
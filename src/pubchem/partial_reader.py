@@ -0,0 +1,284 @@
+"""
+Partial (streaming) reader for pug_view record files
+"""
+import json
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+from .json_codec import get_json_codec
+from .record_store import open_record
+from config.settings import STREAM_COPY_BYTES
+
+_NON_WHITESPACE = re.compile(rb"[^ \t\r\n]")
+_SCALAR = re.compile(rb"[^ \t\r\n,\]}]*")
+_ESCAPE = re.compile(rb"\\.", re.DOTALL)
+_TOC_HEADING = re.compile(rb'\{[ \t\r\n]*"TOCHeading"[ \t\r\n]*:[ \t\r\n]*("(?:[^"\\]|\\.)*")', re.DOTALL)
+# 括弧を "{" / "}" にそろえ、それ以外のバイトを削除するための変換
+_BRACKETS = bytes.maketrans(b"[]", b"{}")
+_NON_BRACKETS = bytes(c for c in range(256) if c not in b"[]{}")
+# 文字列内の括弧を走査対象から外すための変換（長さは変えない）
+_MASK_BRACKETS = bytes.maketrans(b"[]{}", b"____")
+# 値の終わりを探す最初の走査範囲（以降は倍増）
+_SCAN_WINDOW_BYTES = 1024
+# この長さ以下の範囲は1バイトずつ走査する
+_LINEAR_SCAN_BYTES = 64
+# TOCHeadingがセクションの先頭キーかを判定するために先読みする最大バイト数
+_HEADING_LOOKAHEAD = 4096
+
+
+def _bracket_balance(text: bytes) -> Tuple[int, int]:
+    """
+    範囲内の括弧の対応を取り除き、(対応の取れない閉じ括弧の数, 対応の取れない開き括弧の数) を返す
+
+    対応する "{}" を内側から繰り返し削除すると "}}}...{{{" の形が残る。
+    削除の繰り返し回数は範囲内の入れ子の深さで、各回の処理はCレベルのbytes操作のみ。
+    """
+    brackets = text.translate(_BRACKETS, _NON_BRACKETS)
+    while b"{}" in brackets:
+        brackets = brackets.replace(b"{}", b"")
+    opens = len(brackets.lstrip(b"}"))
+    return len(brackets) - opens, opens
+
+
+def _find_close(text: bytes, depth: int) -> Tuple[Optional[int], int]:
+    """
+    文字列を取り除いた範囲から、入れ子の深さdepthの位置で始まる値の終わり（深さが0になる閉じ括弧の直後）を探す
+
+    範囲を二分しながら括弧の対応を数えるため、Pythonのループは範囲の長さの対数回で済む。
+
+    Returns:
+        (値の終わりの位置, 範囲の終わりでの深さ)、範囲内で終わらない場合は位置がNone
+    """
+    closes, opens = _bracket_balance(text)
+    if closes < depth:
+        return None, depth - closes + opens
+    lo, hi = 0, len(text)
+    while hi - lo > _LINEAR_SCAN_BYTES:
+        mid = (lo + hi) // 2
+        closes, opens = _bracket_balance(text[lo:mid])
+        if closes >= depth:
+            hi = mid
+        else:
+            depth += opens - closes
+            lo = mid
+    for i in range(lo, hi):
+        char = text[i]
+        if char in b"{[":
+            depth += 1
+        elif char in b"}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1, 0
+    raise AssertionError("閉じ括弧が見つかりません")  # _bracket_balance で範囲内にあることを確認済み
+
+
+class _JsonStream:
+    """
+    ファイルを少しずつ読み込みながら、JSONの値を1つずつ解析または読み飛ばす
+
+    値の範囲は括弧と文字列の区切りだけを数えて特定し（オブジェクトは作らない）、
+    必要な値のみその範囲をJSONコーデックで解析する。読み飛ばす値は走査済みの部分から順に捨てるため、
+    巨大なセクションを読み飛ばしてもメモリ上にはチャンク1つ分しか残らない。
+    """
+
+    def __init__(self, f: BinaryIO, chunk_size: int = STREAM_COPY_BYTES):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = b""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self) -> None:
+        """追加で読み込み（解析済みの部分は捨てる）、保持中の値が大きいほど読み込み量を増やす"""
+        if self._eof:
+            raise json.JSONDecodeError("予期しないファイル終端", self._buffer.decode("utf-8", "replace"), len(self._buffer))
+        pending = len(self._buffer) - self._pos
+        data = self._file.read(max(self._chunk_size, pending))
+        self._eof = not data
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer.decode("utf-8", "replace"), self._pos)
+
+    def peek(self) -> bytes:
+        """空白を読み飛ばし、次の文字を返す（消費しない）"""
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._pos)
+            if match:
+                self._pos = match.start()
+                return self._buffer[self._pos:self._pos + 1]
+            self._pos = len(self._buffer)
+            self._read()
+
+    def expect(self, char: bytes) -> None:
+        """次の文字がcharであることを確認して消費"""
+        if self.peek() != char:
+            raise self._error(f"'{char.decode()}' が必要です")
+        self._pos += 1
+
+    def skip(self, char: bytes) -> bool:
+        """次の文字がcharなら消費してTrue"""
+        if self.peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def value(self):
+        """次のJSON値を1つ解析"""
+        end = self._value_end(keep=True)  # 読み込みでバッファがずれるため、値の先頭は走査後の現在位置
+        start, self._pos = self._pos, end
+        return get_json_codec().loads(self._buffer[start:end])
+
+    def skip_value(self) -> None:
+        """次のJSON値を解析せずに読み飛ばす"""
+        self._pos = self._value_end(keep=False)
+
+    def section_heading(self) -> Tuple[bool, Optional[str]]:
+        """
+        次の値がTOCHeadingを先頭キーに持つオブジェクトなら、そのTOCHeadingを値を解析せずに取得
+
+        Returns:
+            (TOCHeadingを取得できたか, TOCHeading)
+        """
+        if self.peek() != b"{":
+            return False, None
+        while True:
+            match = _TOC_HEADING.match(self._buffer, self._pos)
+            if match:
+                return True, json.loads(match.group(1))
+            if self._eof or len(self._buffer) - self._pos >= _HEADING_LOOKAHEAD:
+                return False, None
+            self._read()
+
+    def _value_end(self, keep: bool) -> int:
+        """
+        現在位置から始まる値の終わりの位置を返す
+
+        Args:
+            keep: Trueなら値の先頭からバッファに保持する（解析用）。Falseなら走査済みの部分を捨てる
+        """
+        char = self.peek()
+        if char in (b"{", b"["):
+            return self._container_end(keep)
+        if char == b'"':
+            return self._string_end()
+        while True:
+            end = _SCALAR.match(self._buffer, self._pos).end()
+            if end < len(self._buffer) or self._eof:
+                if end == self._pos:
+                    raise self._error("値が必要です")
+                return end
+            self._read()
+
+    def _string_end(self) -> int:
+        """文字列の終わり（閉じ引用符の直後）の位置"""
+        scanned = self._pos + 1
+        while True:
+            quote = self._buffer.find(b'"', scanned)
+            if quote < 0:
+                offset = len(self._buffer) - self._pos
+                self._read()
+                scanned = self._pos + offset
+                continue
+            # 直前のバックスラッシュが奇数個ならエスケープされた引用符（開き引用符より前には遡らない）
+            backslashes = 0
+            while self._buffer[quote - 1 - backslashes] == 0x5C:
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return quote + 1
+            scanned = quote + 1
+
+    def _container_end(self, keep: bool) -> int:
+        """
+        オブジェクト・配列の終わりの位置
+
+        読み込み済みの範囲ごとに、エスケープと文字列内の括弧を同じ長さの文字で置き換えてから
+        括弧の対応を数える。文字列の途中で範囲が切れた場合は、引用符の数の偶奇で次の範囲へ状態を引き継ぐ。
+        """
+        depth = 1
+        in_string = False
+        scanned = self._pos + 1
+        window = _SCAN_WINDOW_BYTES
+        while True:
+            limit = min(len(self._buffer), scanned + window)
+            text = self._buffer[scanned:limit]
+            if limit < len(self._buffer) or not self._eof:
+                text = text.rstrip(b"\\")  # エスケープ（バックスラッシュの連続）の途中で範囲を切らない
+            if text:
+                length = len(text)
+                if b"\\" in text:
+                    text = _ESCAPE.sub(b"__", text)
+                parts = text.split(b'"')
+                inside = slice(0 if in_string else 1, None, 2)
+                if parts[inside]:
+                    parts[inside] = b"\0".join(parts[inside]).translate(_MASK_BRACKETS).split(b"\0")
+                in_string ^= len(parts) % 2 == 0
+                end, depth = _find_close(b'"'.join(parts), depth)
+                if end is not None:
+                    return scanned + end
+                scanned += length
+            # 小さな値で読み込み済みの範囲全体を走査しないよう、走査範囲は小さく始めて倍増させる
+            window *= 2
+            if limit < len(self._buffer):
+                continue
+            if not keep:
+                self._pos = scanned
+            offset = scanned - self._pos
+            self._read()
+            scanned = self._pos + offset
+
+
+def load_record_sections(path: Path, headings: Iterable[str], chunk_size: int = STREAM_COPY_BYTES) -> Optional[Dict]:
+    """
+    pug_viewレコードファイルから、指定したTOCHeadingの最上位セクションのみを読み込む
+
+    Record直下のSection配列を先頭から1セクションずつ走査し、対象のセクションのみを解析する。
+    対象外のセクションは括弧と文字列の区切りを数えて読み飛ばし、オブジェクトは作らない。
+    対象のセクションが全て見つかった時点、またはSection配列が終わった時点で読み込みを終了するため、
+    Section配列より後の値（Reference等）は読み込まれない。ファイル全体がJSONとして正しいかは検証しない。
+
+    Args:
+        path: レコードファイル（.json / .json.gz / .json.zst）
+        headings: 読み込む最上位セクションのTOCHeading
+        chunk_size: 1回に読み込むバイト数
+
+    Returns:
+        {"Record": {Section配列より前にあるRecord直下の値, "Section": [対象のセクション]}}、
+        Record形式でない場合はNone
+    """
+    remaining = set(headings)
+    with open_record(path) as f:
+        stream = _JsonStream(f, chunk_size)
+        if not stream.skip(b"{") or stream.peek() == b"}" or stream.value() != "Record":
+            return None
+        stream.expect(b":")
+        if stream.peek() != b"{":
+            return None
+        stream.expect(b"{")
+
+        record: Dict = {}
+        while not stream.skip(b"}"):
+            key = stream.value()
+            stream.expect(b":")
+            if key != "Section":
+                record[key] = stream.value()
+                stream.skip(b",")
+                continue
+            sections = record.setdefault("Section", [])
+            stream.expect(b"[")
+            while remaining and not stream.skip(b"]"):
+                found, heading = stream.section_heading()
+                if found and heading not in remaining:
+                    stream.skip_value()
+                else:
+                    # TOCHeadingが先頭キーでないセクションは解析して確認する
+                    section = stream.value()
+                    heading = section.get("TOCHeading") if isinstance(section, dict) else None
+                    if heading in remaining:
+                        sections.append(section)
+                        remaining.discard(heading)
+                stream.skip(b",")
+            break
+    return {"Record": record}
@@ -0,0 +1,137 @@
+"""
+Process-wide token-bucket rate limiter for PubChem API requests
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import REQUESTS_PER_SECOND, RATE_BURST
+
+
+class TokenBucketRateLimiter:
+    """
+    トークンバケット方式のレートリミッター
+
+    - rate（リクエスト/秒）でトークンを補充し、最大burst個まで蓄積
+    - スレッド（acquire）とasyncioタスク（acquire_async）の両方から共有可能
+    - 待ち時間は予約方式で決定するため、同時に呼び出されても順番にrate間隔で払い出される
+    - pause()でサーバー側の制限（429, Retry-After等）に合わせて全体を一時停止
+    """
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, burst: int = RATE_BURST):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._rate = float(rate)
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._total_acquired = 0
+        self._total_wait = 0.0
+
+    @property
+    def rate(self) -> float:
+        """現在の補充レート（リクエスト/秒）"""
+        return self._rate
+
+    def set_rate(self, rate: float) -> None:
+        """補充レートを変更（変更前に蓄積したトークンは維持）"""
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = float(rate)
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（必要ならスレッドをブロック）
+
+        Returns:
+            実際に待機した秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        トークンを1つ取得（asyncio版、イベントループはブロックしない）
+
+        Returns:
+            実際に待機した秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float, reason: str = "") -> None:
+        """
+        指定秒数、全リクエストの払い出しを停止
+
+        既存の停止期間より長い場合のみ延長する。
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            until = now + seconds
+            if until > self._updated:
+                self._updated = until
+                self._tokens = min(self._tokens, 0.0)
+                self.logger.warning(f"レート制限: {seconds:.1f}秒間リクエストを停止 {reason}".rstrip())
+
+    def stats(self) -> Dict[str, float]:
+        """リミッターの状態を取得"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate": self._rate,
+                "burst": self._capacity,
+                "tokens": self._tokens,
+                "paused_for": max(0.0, self._updated - now),
+                "acquired": self._total_acquired,
+                "total_wait": self._total_wait,
+            }
+
+    def _refill(self, now: float) -> None:
+        # 停止期間中（_updatedが未来）は補充しない
+        if now > self._updated:
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = max(0.0, self._updated - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self._rate
+            self._total_acquired += 1
+            self._total_wait += wait
+            return wait
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数形式）を解析"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value.strip()))
+    except ValueError:
+        return None
+
+
+_rate_limiter = TokenBucketRateLimiter()
+
+
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """プロセス共有のレートリミッターを取得"""
+    return _rate_limiter
@@ -0,0 +1,98 @@
+"""
+Single-pass TOCHeading index for PubChem pug_view records
+"""
+from typing import Dict, List, Optional, Tuple
+
+HeadingPath = Tuple[str, ...]
+
+
+class RecordIndex:
+    """
+    pug_viewのRecord/Section階層を1回だけ走査して作成する索引
+
+    - TOCHeadingのパス（例: ("Chemical and Physical Properties", "Computed Properties")）→ セクション
+    - TOCHeading → そのTOCHeadingを持つ全セクション（階層の深さ優先順）
+    同じパスのセクションが複数ある場合は最初のものを使う（従来の先頭一致の探索と同じ）。
+    抽出処理はプロパティごとに階層を再帰探索する代わりに、この索引を辞書引きする。
+    """
+
+    def __init__(self, record: Dict):
+        self.record = record
+        self._by_path: Dict[HeadingPath, Dict] = {}
+        self._by_heading: Dict[str, List[Tuple[int, Dict]]] = {}
+        self._containing: Dict[str, List[Dict]] = {}
+        self._build(record.get("Section", []))
+
+    @classmethod
+    def from_data(cls, full_data: Dict) -> Optional["RecordIndex"]:
+        """pug_viewのレスポンス全体から作成（Record形式でなければNone）"""
+        record = full_data.get("Record")
+        return cls(record) if isinstance(record, dict) else None
+
+    def _build(self, sections: List[Dict]) -> None:
+        """深さ優先（親→子の順）で全セクションを登録"""
+        position = 0
+        stack = [((), section) for section in reversed(sections)]
+        while stack:
+            parent_path, section = stack.pop()
+            heading = section.get("TOCHeading", "")
+            path = parent_path + (heading,)
+            self._by_path.setdefault(path, section)
+            self._by_heading.setdefault(heading, []).append((position, section))
+            position += 1
+            stack.extend((path, child) for child in reversed(section.get("Section", [])))
+
+    def __len__(self) -> int:
+        return sum(len(sections) for sections in self._by_heading.values())
+
+    def __contains__(self, path: HeadingPath) -> bool:
+        return tuple(path) in self._by_path
+
+    def section(self, *path: str) -> Optional[Dict]:
+        """TOCHeadingのパスでセクションを取得"""
+        return self._by_path.get(path)
+
+    def information(self, *path: str) -> List[Dict]:
+        """TOCHeadingのパスのセクションのInformation配列"""
+        section = self._by_path.get(path)
+        return section.get("Information", []) if section else []
+
+    def subsections(self, *path: str) -> List[Dict]:
+        """TOCHeadingのパスのセクションの子セクション"""
+        section = self._by_path.get(path)
+        return section.get("Section", []) if section else []
+
+    def find(self, heading: str) -> List[Dict]:
+        """階層の位置に関係なく、TOCHeadingが一致する全セクション"""
+        return [section for _, section in self._by_heading.get(heading, [])]
+
+    def find_containing(self, fragment: str) -> List[Dict]:
+        """TOCHeadingにfragmentを含む全セクション（深さ優先順、結果はキャッシュ）"""
+        if fragment not in self._containing:
+            matches = [
+                entry
+                for heading, entries in self._by_heading.items() if fragment in heading
+                for entry in entries
+            ]
+            matches.sort(key=lambda entry: entry[0])
+            self._containing[fragment] = [section for _, section in matches]
+        return self._containing[fragment]
+
+    def first_value(self, fragment: str) -> Optional[str]:
+        """TOCHeadingにfragmentを含むセクションのうち、深さ優先順で最初に見つかった値"""
+        for section in self.find_containing(fragment):
+            value = self.section_value(section)
+            if value:
+                return value
+        return None
+
+    @staticmethod
+    def section_value(section: Dict) -> Optional[str]:
+        """セクションのInformation配列から最初の値（StringWithMarkupの文字列またはNumber）を取得"""
+        for info in section.get("Information", []):
+            value = info.get("Value", {})
+            if "StringWithMarkup" in value and value["StringWithMarkup"]:
+                return value["StringWithMarkup"][0].get("String", "")
+            if "Number" in value and value["Number"]:
+                return str(value["Number"][0])
+        return None
@@ -0,0 +1,185 @@
+"""
+Compressed storage for individual pug_view record files
+"""
+import gzip
+import logging
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+from .json_codec import get_json_codec
+from config.settings import (
+    RECORD_COMPRESSION, RECORD_GZIP_LEVEL, RECORD_ZSTD_LEVEL,
+    RECORD_DICTIONARY_NAME, RECORD_DICTIONARY_SIZE,
+)
+
+# 圧縮形式ごとの拡張子（None は非圧縮のJSON）
+RECORD_SUFFIXES = {None: ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+
+_dictionary_cache: Dict[Path, Optional["zstd.ZstdCompressionDict"]] = {}
+_dictionary_lock = threading.Lock()
+
+
+def _require_zstd() -> None:
+    if zstd is None:
+        raise ImportError("zstd圧縮には zstandard パッケージが必要です (pip install zstandard)")
+
+
+def record_compression(path: Path) -> Optional[str]:
+    """ファイル名から圧縮形式を判定"""
+    name = path.name
+    for compression, suffix in RECORD_SUFFIXES.items():
+        if compression is not None and name.endswith(suffix):
+            return compression
+    return None
+
+
+def record_stem(path: Path) -> str:
+    """拡張子（.json / .json.gz / .json.zst）を除いたファイル名"""
+    suffix = RECORD_SUFFIXES[record_compression(path)]
+    name = path.name
+    return name[:-len(suffix)] if name.endswith(suffix) else path.stem
+
+
+def iter_record_files(directory: Path) -> Iterator[Path]:
+    """ディレクトリ内のレコードファイル（圧縮・非圧縮）をファイル名順に列挙"""
+    files = set()
+    for suffix in RECORD_SUFFIXES.values():
+        files.update(directory.glob(f"*{suffix}"))
+    return iter(sorted(files))
+
+
+def load_dictionary(directory: Path) -> Optional["zstd.ZstdCompressionDict"]:
+    """ディレクトリに保存された共有zstd辞書を読み込む（無ければNone、ディレクトリ単位でキャッシュ）"""
+    directory = Path(directory)
+    with _dictionary_lock:
+        if directory not in _dictionary_cache:
+            dict_path = directory / RECORD_DICTIONARY_NAME
+            dictionary = None
+            if dict_path.exists():
+                _require_zstd()
+                dictionary = zstd.ZstdCompressionDict(dict_path.read_bytes())
+            _dictionary_cache[directory] = dictionary
+        return _dictionary_cache[directory]
+
+
+def open_record(path: Path) -> BinaryIO:
+    """
+    レコードファイルを読み込み用に開く（圧縮形式は拡張子から判定し透過的に展開）
+
+    zstd形式で辞書を使って圧縮されている場合は、同じディレクトリの共有辞書を使用する。
+    """
+    path = Path(path)
+    compression = record_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        _require_zstd()
+        dictionary = load_dictionary(path.parent)
+        decompressor = zstd.ZstdDecompressor(dict_data=dictionary) if dictionary else zstd.ZstdDecompressor()
+        return decompressor.stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def load_record(path: Path) -> Dict:
+    """レコードファイルを読み込んでJSONとして解析"""
+    with open_record(path) as f:
+        return get_json_codec().loads(f.read())
+
+
+class RecordStore:
+    """
+    個別化合物ファイルの保存形式（非圧縮 / gzip / zstd）
+
+    - pug_viewのレコードはインデント付きJSONで冗長なため、圧縮すると数分の一のサイズになる
+    - zstdは共有辞書（train_dictionary で学習）を指定すると小さいレコードでも高い圧縮率が得られる
+      辞書は出力ディレクトリにRECORD_DICTIONARY_NAMEとしてコピーされ、読み込み側は自動的に使用する
+    - 読み込みは open_record / load_record が拡張子から形式を判定するため、形式が混在していても扱える
+    """
+
+    def __init__(self, compression: Optional[str] = RECORD_COMPRESSION, level: Optional[int] = None,
+                 dictionary_path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        if compression not in RECORD_SUFFIXES:
+            raise ValueError(f"未対応の圧縮形式: {compression}（{', '.join(c for c in RECORD_SUFFIXES if c)}）")
+        if dictionary_path is not None and compression != "zstd":
+            raise ValueError("辞書はzstd圧縮でのみ使用できます")
+        if compression == "zstd":
+            _require_zstd()
+        self.compression = compression
+        self.level = level if level is not None else (
+            RECORD_ZSTD_LEVEL if compression == "zstd" else RECORD_GZIP_LEVEL
+        )
+        self.dictionary_path = Path(dictionary_path) if dictionary_path else None
+        self._dictionary = (
+            zstd.ZstdCompressionDict(self.dictionary_path.read_bytes()) if self.dictionary_path else None
+        )
+
+    @property
+    def suffix(self) -> str:
+        """保存するファイルの拡張子"""
+        return RECORD_SUFFIXES[self.compression]
+
+    def open_write(self, path: Path) -> BinaryIO:
+        """
+        書き込み用に開く（書き込んだバイト列はそのまま圧縮される）
+
+        辞書を使う場合は、保存先ディレクトリに辞書をコピーしてから書き込む。
+        """
+        path = Path(path)
+        if self.compression == "gzip":
+            return gzip.open(path, "wb", compresslevel=self.level)
+        if self.compression == "zstd":
+            self._install_dictionary(path.parent)
+            compressor = zstd.ZstdCompressor(level=self.level, dict_data=self._dictionary)
+            return compressor.stream_writer(open(path, "wb"), closefd=True)
+        return open(path, "wb")
+
+    def _install_dictionary(self, directory: Path) -> None:
+        if self.dictionary_path is None:
+            return
+        target = directory / RECORD_DICTIONARY_NAME
+        if target.exists() and target.resolve() == self.dictionary_path.resolve():
+            return
+        with _dictionary_lock:
+            if target.exists() and target.read_bytes() == self._dictionary.as_bytes():
+                return
+            directory.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(self._dictionary.as_bytes())
+            _dictionary_cache.pop(directory, None)
+            self.logger.info(f"zstd辞書を保存: {target}")
+
+
+def train_dictionary(files: List[Path], output_path: Path, size: int = RECORD_DICTIONARY_SIZE) -> Path:
+    """
+    既存のレコードファイルからzstdの共有辞書を学習して保存
+
+    Args:
+        files: 学習に使うレコードファイル（圧縮形式は問わない）
+        output_path: 辞書の保存先
+        size: 辞書サイズ（バイト）
+    """
+    _require_zstd()
+    samples = []
+    for path in files:
+        with open_record(path) as f:
+            samples.append(f.read())
+    try:
+        dictionary = zstd.train_dictionary(size, samples)
+    except zstd.ZstdError as e:
+        # サンプルが少なすぎる・小さすぎる場合
+        raise ValueError(f"辞書の学習に失敗しました（{len(samples)} ファイル）: {e}") from e
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(dictionary.as_bytes())
+    with _dictionary_lock:
+        _dictionary_cache.pop(output_path.parent, None)
+    logging.getLogger(__name__).info(
+        f"zstd辞書を学習: {len(samples)} ファイル → {output_path} ({len(dictionary.as_bytes()):,} バイト)"
+    )
+    return output_path
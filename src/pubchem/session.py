@@ -0,0 +1,161 @@
+"""
+Shared HTTP session management for PubChem API access
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import USER_AGENT, POOL_CONNECTIONS, POOL_MAXSIZE
+
+
+class SessionManager:
+    """
+    プロセス全体で共有するrequests.Sessionの管理クラス
+
+    - Keep-Alive接続をプールして再利用し、TCP/TLSハンドシェイクを削減
+    - 並列ワーカー数に合わせてHTTPAdapterのプールサイズを拡張
+    - close()で明示的に接続を解放（以降のget()で再作成）
+    """
+
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._request_count = 0
+        self._closed_connections = 0
+
+    def get(self, workers: Optional[int] = None) -> requests.Session:
+        """
+        共有Sessionを取得（未作成なら作成）
+
+        Args:
+            workers: 同時に使用するワーカー数。現在のプールより大きい場合はアダプタを拡張
+        """
+        with self._lock:
+            if workers is not None and workers > self._pool_maxsize:
+                self._pool_maxsize = workers
+                if self._session is not None:
+                    self.logger.debug(f"接続プール拡張: maxsize={workers}")
+                    self._mount_adapter(self._session)
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def record_request(self) -> None:
+        """リクエスト発行数を記録（接続再利用率の算出用）"""
+        with self._lock:
+            self._request_count += 1
+
+    def close(self) -> None:
+        """共有Sessionを閉じてプール内の接続を解放"""
+        with self._lock:
+            if self._session is None:
+                return
+            self._closed_connections += self._count_connections(self._session)
+            self._session.close()
+            self._session = None
+            self.logger.debug("共有HTTPセッションをクローズ")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        接続プールの再利用統計を取得
+
+        Returns:
+            requests: 発行リクエスト数
+            connections: 新規に確立した接続数
+            reused: 既存接続を再利用したリクエスト数
+            reuse_rate: 再利用率 (0.0-1.0)
+        """
+        with self._lock:
+            connections = self._closed_connections
+            if self._session is not None:
+                connections += self._count_connections(self._session)
+            requests_made = self._request_count
+        reused = max(0, requests_made - connections)
+        return {
+            "requests": requests_made,
+            "connections": connections,
+            "reused": reused,
+            "reuse_rate": reused / requests_made if requests_made else 0.0,
+            "pool_maxsize": self._pool_maxsize,
+        }
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(USER_AGENT)
+        self._mount_adapter(session)
+        self.logger.debug(
+            f"共有HTTPセッション作成: pool_connections={self._pool_connections}, "
+            f"pool_maxsize={self._pool_maxsize}"
+        )
+        return session
+
+    def _mount_adapter(self, session: requests.Session) -> None:
+        # リトライはsafe_get側で制御するため、アダプタのリトライは無効
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            max_retries=0,
+            pool_block=False,
+        )
+        old_adapter = session.adapters.get("https://")
+        if old_adapter is not None:
+            self._closed_connections += self._count_adapter_connections(old_adapter)
+            old_adapter.close()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def _count_connections(self, session: requests.Session) -> int:
+        adapter = session.adapters.get("https://")
+        return self._count_adapter_connections(adapter) if adapter is not None else 0
+
+    @staticmethod
+    def _count_adapter_connections(adapter: HTTPAdapter) -> int:
+        # urllib3の各ConnectionPoolが保持する新規接続数の累計
+        total = 0
+        try:
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is not None:
+                    total += getattr(pool, "num_connections", 0)
+        except Exception:
+            pass
+        return total
+
+
+_session_manager = SessionManager()
+
+
+def get_session(workers: Optional[int] = None) -> requests.Session:
+    """プロセス共有のHTTPセッションを取得"""
+    return _session_manager.get(workers)
+
+
+def record_request() -> None:
+    """共有セッション経由のリクエスト発行を記録"""
+    _session_manager.record_request()
+
+
+def close_session() -> None:
+    """プロセス共有のHTTPセッションをクローズ"""
+    _session_manager.close()
+
+
+def get_pool_stats() -> Dict[str, float]:
+    """接続プールの再利用統計を取得"""
+    return _session_manager.stats()
+
+
+def log_pool_stats(logger: Optional[logging.Logger] = None) -> None:
+    """接続プールの再利用統計をログ出力"""
+    logger = logger or logging.getLogger(__name__)
+    stats = get_pool_stats()
+    logger.info(
+        f"HTTP接続統計: リクエスト {stats['requests']} 件, 新規接続 {stats['connections']} 件, "
+        f"再利用 {stats['reused']} 件 (再利用率 {stats['reuse_rate']*100:.1f}%)"
+    )
@@ -0,0 +1,161 @@
+"""
+Adaptive throttling driven by PubChem X-Throttling-Control headers
+"""
+import logging
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+from .rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+from config.settings import (
+    THROTTLE_MIN_RATE, THROTTLE_MAX_RATE, THROTTLE_INCREASE_STEP,
+    THROTTLE_YELLOW_FACTOR, THROTTLE_RED_FACTOR, THROTTLE_ADJUST_INTERVAL,
+    THROTTLE_RED_PAUSE, THROTTLE_BLACK_PAUSE, THROTTLE_BUSY_PERCENT
+)
+
+THROTTLING_HEADER = "X-Throttling-Control"
+
+# 例: "Request Count status: Green (0%), Request Time status: Green (0%), Service status: Green (20%)"
+_STATUS_RE = re.compile(r"(Request Count|Request Time|Service) status:\s*(\w+)\s*\((\d+)%\)", re.IGNORECASE)
+
+_SEVERITY = {"green": 0, "yellow": 1, "red": 2, "black": 3}
+_STATE_NAMES = {v: k.capitalize() for k, v in _SEVERITY.items()}
+
+
+def parse_throttling_header(value: Optional[str]) -> Dict[str, Dict]:
+    """
+    X-Throttling-Controlヘッダーを解析
+
+    Returns:
+        {"request_count": {"status": "Green", "percent": 0}, "request_time": {...}, "service": {...}}
+        ヘッダーが無い・解析できない場合は空の辞書
+    """
+    result = {}
+    if not value:
+        return result
+    for name, status, percent in _STATUS_RE.findall(value):
+        key = name.lower().replace(" ", "_")
+        result[key] = {"status": status.capitalize(), "percent": int(percent)}
+    return result
+
+
+class ThrottlingController:
+    """
+    PubChemの負荷状況に応じて共有レートリミッターの速度を自動調整するフィードバック制御
+
+    - Green（負荷が低い）: レートを加算的に上げる（最大THROTTLE_MAX_RATE）
+    - Yellow: レートを乗算的に下げる
+    - Red: レートを大きく下げ、短時間全体を停止
+    - Black: 最小レートに落とし、長時間全体を停止
+    同じ状態での調整はTHROTTLE_ADJUST_INTERVAL秒に1回までに制限し、同時応答による過剰反応を防ぐ。
+    """
+
+    def __init__(self, limiter: Optional[TokenBucketRateLimiter] = None,
+                 min_rate: float = THROTTLE_MIN_RATE, max_rate: float = THROTTLE_MAX_RATE):
+        self.logger = logging.getLogger(__name__)
+        self._limiter = limiter or get_rate_limiter()
+        self._lock = threading.Lock()
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._state = "Green"
+        self._last_status: Dict[str, Dict] = {}
+        self._last_adjust = 0.0
+        self._observed = 0
+        self._increases = 0
+        self._decreases = 0
+
+    def observe(self, headers: Optional[Mapping[str, str]]) -> None:
+        """レスポンスヘッダーを観測してレートを調整"""
+        if headers is None:
+            return
+        status = parse_throttling_header(headers.get(THROTTLING_HEADER))
+        if not status:
+            return
+
+        severity = max(_SEVERITY.get(s["status"].lower(), 0) for s in status.values())
+        busiest = max(s["percent"] for s in status.values())
+
+        with self._lock:
+            self._observed += 1
+            self._last_status = status
+            previous_state = self._state
+            self._state = _STATE_NAMES[severity]
+            now = time.monotonic()
+
+            # 状態変化は即座に反映、同じ状態が続く間は調整間隔を守る
+            if self._state == previous_state and now - self._last_adjust < THROTTLE_ADJUST_INTERVAL:
+                return
+            self._last_adjust = now
+
+            current = self._limiter.rate
+            pause = 0.0
+            if severity == 0:
+                if busiest >= THROTTLE_BUSY_PERCENT:
+                    new_rate = current
+                else:
+                    new_rate = min(self._max_rate, current + THROTTLE_INCREASE_STEP)
+            elif severity == 1:
+                new_rate = max(self._min_rate, current * THROTTLE_YELLOW_FACTOR)
+            elif severity == 2:
+                new_rate = max(self._min_rate, current * THROTTLE_RED_FACTOR)
+                pause = THROTTLE_RED_PAUSE
+            else:
+                new_rate = self._min_rate
+                pause = THROTTLE_BLACK_PAUSE
+
+            if new_rate != current:
+                self._limiter.set_rate(new_rate)
+                if new_rate > current:
+                    self._increases += 1
+                else:
+                    self._decreases += 1
+
+        if pause:
+            self._limiter.pause(pause, f"(PubChem負荷状態: {self._state})")
+        if self._state != previous_state:
+            log = self.logger.info if severity == 0 else self.logger.warning
+            log(f"PubChem負荷状態 {previous_state} → {self._state}: レート {current:.2f} → {new_rate:.2f} req/s")
+        elif new_rate != current:
+            self.logger.debug(f"レート調整 ({self._state}): {current:.2f} → {new_rate:.2f} req/s")
+
+    def on_rate_limited(self) -> None:
+        """429を受け取った場合にレートを最小値まで下げる"""
+        with self._lock:
+            self._state = "Red"
+            self._last_adjust = time.monotonic()
+            if self._limiter.rate > self._min_rate:
+                self._limiter.set_rate(self._min_rate)
+                self._decreases += 1
+
+    def snapshot(self) -> Dict:
+        """監視用に現在のレートと状態を取得"""
+        with self._lock:
+            return {
+                "state": self._state,
+                "rate": self._limiter.rate,
+                "min_rate": self._min_rate,
+                "max_rate": self._max_rate,
+                "last_status": dict(self._last_status),
+                "observed": self._observed,
+                "increases": self._increases,
+                "decreases": self._decreases,
+            }
+
+
+_throttle_controller = ThrottlingController()
+
+
+def get_throttle_controller() -> ThrottlingController:
+    """プロセス共有のスロットリング制御を取得"""
+    return _throttle_controller
+
+
+def log_throttle_stats(logger: Optional[logging.Logger] = None) -> None:
+    """スロットリング制御の状態をログ出力"""
+    logger = logger or logging.getLogger(__name__)
+    snap = get_throttle_controller().snapshot()
+    logger.info(
+        f"スロットリング状態: {snap['state']}, 現在レート {snap['rate']:.2f} req/s "
+        f"(上げ {snap['increases']} 回, 下げ {snap['decreases']} 回, 観測 {snap['observed']} 件)"
+    )
@@ -3,15 +3,36 @@ PubChem API utilities and helper functions
 """
 import re
 import time
+import unicodedata
 import logging
-from typing import List, Optional
+import urllib.parse
+from typing import Dict, List, Optional
 import requests
-from config.settings import USER_AGENT, TIMEOUT, MAX_RETRY
+from config.settings import TIMEOUT, MAX_RETRY, RATE_LIMIT_PAUSE
+from .session import get_session, record_request
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .throttling import get_throttle_controller
+from .cache import get_response_cache, get_negative_cache, build_cached_response, build_not_found_error
 
 # CAS number validation regex
 CAS_RE = re.compile(r"^\d{2,7}-\d{2}-\d$")
 
 
+_DASH_RE = re.compile(r"[\u2010-\u2015\u2212\uff0d]")
+
+
+def normalize_cas(cas_number: str) -> str:
+    """
+    CAS番号を正規化（重複判定・検索キー用）
+    
+    全角数字・各種ハイフン（Excel由来の‐－等）を半角に統一し、空白を除去する。
+    """
+    if not cas_number:
+        return ""
+    normalized = unicodedata.normalize("NFKC", str(cas_number))
+    return re.sub(r"\s+", "", _DASH_RE.sub("-", normalized))
+
+
 def validate_cas(cas_number: str) -> bool:
     """
     CAS番号の形式を検証
@@ -23,16 +44,68 @@ def validate_cas(cas_number: str) -> bool:
     return bool(CAS_RE.match(cas_cleaned))
 
 
+def is_not_found_error(e: Exception) -> bool:
+    """例外がHTTP 404（データなし）によるものか判定（requests / aiohttp両対応）"""
+    response = getattr(e, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) == 404:
+        return True
+    return getattr(e, 'status', None) == 404
+
+
 def safe_get(url: str, stream=False):
+    """GETリクエスト（詳細は_safe_request参照）"""
+    return _safe_request("GET", url, stream=stream)
+
+
+def safe_post(url: str, data: Dict[str, str], cache: bool = True, retry_timeouts: bool = True):
+    """
+    POSTリクエスト（識別子リストをボディで送る一括検索用）
+    キャッシュキーにはURLとボディの両方を使用する
+    cache=Falseの場合はレスポンスキャッシュ・ネガティブキャッシュを使わない
+    （結果をIDごとにキャッシュする一括取得用、cache.get_cached_per_id参照）
+    retry_timeouts=Falseの場合はタイムアウトをリトライせず即座に送出する
+    （バッチを縮小・分割して再試行する呼び出し側用、AdaptiveChunkSizer参照）
+    """
+    return _safe_request("POST", url, body=urllib.parse.urlencode(data), use_cache=cache,
+                         retry_timeouts=retry_timeouts)
+
+
+def _safe_request(method: str, url: str, body: Optional[str] = None, stream=False, use_cache: bool = True,
+                  retry_timeouts: bool = True):
     """
     効率的なHTTPリクエスト：
     - 404等の確定的エラーは即座に諦める
     - 一時的エラー（500系、タイムアウト等）のみリトライ
+    - 共有セッションの接続プールを利用（Keep-Alive）
+    - 全リクエストをプロセス共有のレートリミッター経由で発行
+    - X-Throttling-Controlヘッダーを毎回観測し、共有レートを自動調整
+    - ディスクキャッシュに有効なレスポンスがあればネットワークを使わずに返す
+    - ネガティブキャッシュに登録済みの404 URLは即座に404として扱う
     """
+    cache = get_response_cache() if use_cache else None
+    if cache is not None:
+        content = cache.get(url, body)
+        if content is not None:
+            return build_cached_response(url, content)
+    negative = get_negative_cache() if use_cache else None
+    if negative is not None and negative.url_missed(url, body):
+        raise build_not_found_error(url)
+    
+    limiter = get_rate_limiter()
+    throttle = get_throttle_controller()
     for i in range(MAX_RETRY):
         try:
-            r = requests.get(url, headers=USER_AGENT, timeout=TIMEOUT, stream=stream)
+            limiter.acquire()
+            record_request()
+            if method == "POST":
+                r = get_session().post(url, data=body, timeout=TIMEOUT, stream=stream,
+                                       headers={"Content-Type": "application/x-www-form-urlencoded"})
+            else:
+                r = get_session().get(url, timeout=TIMEOUT, stream=stream)
+            throttle.observe(r.headers)
             r.raise_for_status()
+            if cache is not None and not stream:
+                cache.put(url, r.content, body)
             return r
         except requests.exceptions.RequestException as e:
             # HTTPエラーレスポンスがある場合のエラーコード判定
@@ -42,14 +115,18 @@ def safe_get(url: str, stream=False):
                 # 確定的エラー：即座に諦める
                 if status_code in [400, 401, 403, 404, 405, 410]:
                     logging.debug(f"確定的エラー {status_code}: 即座に次のエンドポイントへ")
+                    if status_code == 404 and negative is not None:
+                        negative.record_url_miss(url, body)
                     raise
                 
-                # 429 Rate Limit：少し待ってリトライ
+                # 429 Rate Limit：リミッター全体を停止してリトライ（他スレッドも待機）
                 elif status_code == 429:
                     if i < MAX_RETRY - 1:
-                        wait_time = 30 + (2 ** i)  # 30, 32, 36, 44秒
+                        retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                        wait_time = retry_after if retry_after is not None else RATE_LIMIT_PAUSE + (2 ** i)
                         logging.warning(f"レート制限 (試行{i+1}/{MAX_RETRY}): {wait_time}秒待機")
-                        time.sleep(wait_time)
+                        throttle.on_rate_limited()
+                        limiter.pause(wait_time, "(HTTP 429)")
                         continue
                     else:
                         raise
@@ -76,6 +153,8 @@ def safe_get(url: str, stream=False):
             
             # ネットワークエラー（タイムアウト、接続エラー等）：リトライ
             else:
+                if not retry_timeouts and isinstance(e, requests.exceptions.Timeout):
+                    raise
                 if i < MAX_RETRY - 1:
                     wait_time = 2 ** (i + 1)
                     logging.warning(f"ネットワークエラー (試行{i+1}/{MAX_RETRY}): {e} - {wait_time}秒後リトライ")
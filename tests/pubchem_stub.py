@@ -0,0 +1,118 @@
+"""
+テスト用のPubChemスタブ（共有セッションを差し替え、ネットワークを使わずに応答を返す）
+"""
+import json
+import re
+import threading
+import urllib.parse
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+from unittest import mock
+
+import requests
+
+# (メソッド, URL, フォーム) → (ステータス, JSON) または送出する例外
+Handler = Callable[[str, str, Dict[str, str]], Union[Tuple[int, Dict], Exception]]
+
+PUG_REST = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+
+
+class StubSession:
+    """requests.Sessionの代わりにhandlerで応答を作り、発行されたリクエストを記録する"""
+
+    def __init__(self, handler: Handler):
+        self.handler = handler
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, timeout=None, stream=False) -> requests.Response:
+        return self._respond("GET", url, {})
+
+    def post(self, url: str, data: str = "", timeout=None, stream=False, headers=None) -> requests.Response:
+        return self._respond("POST", url, dict(urllib.parse.parse_qsl(data)))
+
+    def posted(self, path: str) -> List[Dict[str, str]]:
+        """PUG_REST以下のpathへPOSTしたフォームの一覧"""
+        with self._lock:
+            return [form for method, url, form in self.requests if method == "POST" and url == PUG_REST + path]
+
+    def _respond(self, method: str, url: str, form: Dict[str, str]) -> requests.Response:
+        with self._lock:
+            self.requests.append((method, url, form))
+        result = self.handler(method, url, form)
+        if isinstance(result, Exception):
+            raise result
+        status, payload = result
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response._content = json.dumps(payload).encode("utf-8")
+        return response
+
+
+def stub_pubchem(test, handler: Handler) -> StubSession:
+    """testの間、PubChemへのリクエストをhandlerで処理する（キャッシュ・レートリミッターは無効）"""
+    session = StubSession(handler)
+    patches = [
+        mock.patch("src.pubchem.utils.get_session", return_value=session),
+        mock.patch("src.pubchem.utils.get_rate_limiter", return_value=mock.Mock()),
+        mock.patch("src.pubchem.cache._response_cache", None),
+        mock.patch("src.pubchem.cache._negative_cache", None),
+    ]
+    for patch in patches:
+        patch.start()
+        test.addCleanup(patch.stop)
+    return session
+
+
+def cid_list(form: Dict[str, str]) -> List[int]:
+    """POSTフォームのcid=1,2,3をCIDリストに変換"""
+    return [int(cid) for cid in form["cid"].split(",")]
+
+
+class FakePubChem:
+    """
+    CAS → CID の対応だけを持つ最小限のPubChem（StubSessionのhandler用）
+
+    - CAS一括検索（POST）・CAS個別検索（GET）・RN xref・synonyms・プロパティテーブルに応答
+    - プロパティは「プロパティ名 + CID」の文字列、bad_cidsを含むプロパティ要求は400
+    - それ以外（Substance検索等）は404
+    """
+
+    _PROPERTY_RE = re.compile(r"/compound/cid/property/([^/]+)/JSON")
+    _RN_CIDS_RE = re.compile(r"/compound/xref/RN/([^/]+)/cids/JSON")
+
+    def __init__(self, compounds: Dict[str, int], bad_cids: Iterable[int] = ()):
+        self.compounds = dict(compounds)
+        self.bad_cids = set(bad_cids)
+        self._rns = {cid: cas for cas, cid in self.compounds.items()}
+
+    def handle(self, method: str, url: str, form: Dict[str, str]) -> Tuple[int, Dict]:
+        path = url[len(PUG_REST):]
+        if path == "/compound/xref/RN/cids/JSON":
+            return self._identifiers([self.compounds[cas] for cas in form["RN"].split(",") if cas in self.compounds])
+        match = self._RN_CIDS_RE.fullmatch(path)
+        if match:
+            cas = urllib.parse.unquote(match.group(1))
+            return self._identifiers([self.compounds[cas]] if cas in self.compounds else [])
+        if path == "/compound/cid/xrefs/RN/JSON":
+            return self._information([{"CID": cid, "RN": [self._rns[cid]]} for cid in cid_list(form) if cid in self._rns])
+        if path == "/compound/cid/synonyms/JSON":
+            return self._information([{"CID": cid, "Synonym": [f"name{cid}"]} for cid in cid_list(form)])
+        match = self._PROPERTY_RE.fullmatch(path)
+        if match:
+            cids = cid_list(form)
+            if self.bad_cids.intersection(cids):
+                return 400, {"Fault": {"Code": "PUGREST.BadRequest"}}
+            fields = match.group(1).split(",")
+            return 200, {"PropertyTable": {"Properties": [
+                dict({"CID": cid}, **{field: f"{field}{cid}" for field in fields}) for cid in cids
+            ]}}
+        return 404, {"Fault": {"Code": "PUGREST.NotFound"}}
+
+    @staticmethod
+    def _identifiers(cids: List[int]) -> Tuple[int, Dict]:
+        return (200, {"IdentifierList": {"CID": cids}}) if cids else (404, {"Fault": {"Code": "PUGREST.NotFound"}})
+
+    @staticmethod
+    def _information(info: List[Dict]) -> Tuple[int, Dict]:
+        return (200, {"InformationList": {"Information": info}}) if info else (404, {"Fault": {"Code": "PUGREST.NotFound"}})
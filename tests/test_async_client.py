@@ -0,0 +1,65 @@
+"""
+AsyncPubChemClient のテスト
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.pubchem.async_client import AsyncPubChemClient
+from src.pubchem.cache import NegativeCache
+from src.pubchem.utils import is_not_found_error
+
+PUG_REST = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+
+
+class NegativeCacheHitTest(unittest.IsolatedAsyncioTestCase):
+    """ネガティブキャッシュ登録済みのURLは、ネットワークを使わずに404として扱う"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.negative = NegativeCache(Path(self._tmp.name) / "negative.sqlite")
+        patches = [
+            mock.patch("src.pubchem.async_client.get_response_cache", return_value=None),
+            mock.patch("src.pubchem.async_client.get_negative_cache", return_value=self.negative),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.negative.close()
+        self._tmp.cleanup()
+
+    async def asyncSetUp(self):
+        self.client = AsyncPubChemClient()
+        # 実際のリクエストが発行されたらテストを失敗させる
+        self.client.open = mock.AsyncMock(side_effect=AssertionError("ネットワークにアクセスしました"))
+
+    def _miss(self, url: str) -> str:
+        self.negative.record_url_miss(url)
+        return url
+
+    async def test_get_json_raises_printable_404(self):
+        url = self._miss(f"{PUG_REST}/compound/cid/1/xrefs/RN/JSON")
+        with self.assertRaises(Exception) as context:
+            await self.client.get_json(url)
+        self.assertTrue(is_not_found_error(context.exception))
+        self.assertIn(url, str(context.exception))
+
+    async def test_sid_properties_skips_missing_sid(self):
+        self._miss(f"{PUG_REST}/substance/sid/123/JSON")
+        self.assertEqual(await self.client.get_sid_properties(123), {})
+
+    async def test_cas_pairs_skips_missing_cid(self):
+        self._miss(f"{PUG_REST}/compound/cid/5/xrefs/RN/JSON")
+        self._miss(f"{PUG_REST}/compound/cid/5/synonyms/JSON")
+        self.assertEqual(await self.client.get_cas_pairs(5), [])
+
+    async def test_full_compound_data_skips_missing_cid(self):
+        self._miss(self.client._full_data_client.COMPOUND_URL_TEMPLATE.format(cid=7))
+        self.assertIsNone(await self.client.get_full_compound_data(7))
+
+
+if __name__ == "__main__":
+    unittest.main()
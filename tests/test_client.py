@@ -0,0 +1,118 @@
+"""
+PubChemClient のテスト（PubChemへのリクエストはスタブで処理）
+"""
+import unittest
+
+import requests
+
+from src.pubchem.batching import AdaptiveChunkSizer
+from src.pubchem.client import PubChemClient
+from tests.pubchem_stub import PUG_REST, cid_list, stub_pubchem
+
+# CID → RN xref（PubChemの登録内容の代わり）
+RN_XREFS = {
+    712: ["50-00-0"],
+    713: ["50-00-0", "30525-89-4"],   # 同じCASを持つ別のCID
+    962: ["7732-18-5"],
+    555: ["111-11-1"],               # 一括検索で返るが、入力CASとは無関係なCID
+}
+
+
+class BulkCasSearchTest(unittest.TestCase):
+    """POSTの一括検索で得たCIDを、RN xrefで入力CASに対応付ける"""
+
+    def setUp(self):
+        self.session = stub_pubchem(self, self._handle)
+        self.client = PubChemClient()
+
+    def _handle(self, method, url, form):
+        if url == PUG_REST + "/compound/xref/RN/cids/JSON":
+            # CIDは入力CASの順序とは無関係に返る
+            return 200, {"IdentifierList": {"CID": [962, 713, 702, 555, 712]}}
+        if url == PUG_REST + "/compound/cid/xrefs/RN/JSON":
+            # Informationは逆順で返り、CID 702 の記録は含まれない
+            info = [{"CID": cid, "RN": RN_XREFS[cid]} for cid in reversed(cid_list(form)) if cid in RN_XREFS]
+            return 200, {"InformationList": {"Information": info}}
+        return 404, {}
+
+    def test_maps_cids_back_to_input_cas(self):
+        results = self.client.get_cids_from_cas_bulk(["64-17-5", "50-00-0", "1234-56-7", "7732-18-5"])
+
+        self.assertEqual(set(results), {"50-00-0", "7732-18-5"})
+        self.assertEqual(results["7732-18-5"].cids, [962])
+        # 複数のCIDは一括検索の返却順（xrefの応答順ではない）
+        self.assertEqual(results["50-00-0"].cids, [713, 712])
+        self.assertTrue(results["50-00-0"].success)
+
+    def test_unmatched_cas_left_for_individual_search(self):
+        """xrefの応答に無いCID（702）・一括検索で見つからないCASは結果に含めない"""
+        results = self.client.get_cids_from_cas_bulk(["64-17-5", "1234-56-7"])
+        self.assertEqual(results, {})
+
+    def test_skips_invalid_and_duplicate_cas(self):
+        self.client.get_cids_from_cas_bulk(["50-00-0", " 50-00-0 ", "not-a-cas", "7732-18-5"])
+        self.assertEqual(self.session.posted("/compound/xref/RN/cids/JSON"), [{"RN": "50-00-0,7732-18-5"}])
+
+    def test_batches_by_batch_size(self):
+        results = self.client.get_cids_from_cas_bulk(["50-00-0", "7732-18-5", "64-17-5"], batch_size=2)
+        self.assertEqual(
+            self.session.posted("/compound/xref/RN/cids/JSON"), [{"RN": "50-00-0,7732-18-5"}, {"RN": "64-17-5"}]
+        )
+        self.assertEqual(set(results), {"50-00-0", "7732-18-5"})
+
+
+class PropertyBisectionTest(unittest.TestCase):
+    """失敗したプロパティのバッチを二分割し、不正なCIDだけを除いて取得する"""
+
+    BAD_CID = 999
+
+    def setUp(self):
+        self.timeout_above = None   # このCID数を超えるバッチはタイムアウトさせる
+        self.session = stub_pubchem(self, self._handle)
+        self.client = PubChemClient()
+        self.property_path = self.client.property_url()[len(PUG_REST):]
+
+    def _handle(self, method, url, form):
+        cids = cid_list(form)
+        if self.timeout_above is not None and len(cids) > self.timeout_above:
+            return requests.exceptions.Timeout("read timed out")
+        if self.BAD_CID in cids:
+            return 400, {"Fault": {"Code": "PUGREST.BadRequest"}}
+        return 200, {"PropertyTable": {"Properties": [{"CID": cid, "Title": f"T{cid}"} for cid in cids]}}
+
+    def _batches(self):
+        return [cid_list(form) for form in self.session.posted(self.property_path)]
+
+    def test_bisects_down_to_single_bad_cid(self):
+        cids = list(range(1, 16)) + [self.BAD_CID]
+        res = self.client.fetch_properties_batched(cids, sizer=AdaptiveChunkSizer(16, 1, 16))
+
+        self.assertEqual(sorted(res), list(range(1, 16)))
+        self.assertEqual(res[3]["Title"], "T3")
+        batches = self._batches()
+        self.assertIn([self.BAD_CID], batches)
+        # 16件中1件が不正：1 + 2 * log2(16) 回
+        self.assertEqual(len(batches), 9)
+        self.assertEqual(sum(len(batch) for batch in batches if self.BAD_CID not in batch), 15)
+
+    def test_on_batch_receives_each_successful_batch(self):
+        received = []
+        self.client.fetch_properties_batched([1, self.BAD_CID, 3, 4], sizer=AdaptiveChunkSizer(2, 1, 2),
+                                             on_batch=lambda batch: received.append(sorted(batch)))
+        self.assertEqual(received, [[1], [3, 4]])
+
+    def test_timeout_shrinks_batch_without_retrying(self):
+        """タイムアウトしたバッチはリトライせずに分割し、以降のバッチサイズも縮小する"""
+        self.timeout_above = 2
+        sizer = AdaptiveChunkSizer(8, 1, 8)
+        res = self.client.fetch_properties_batched(list(range(1, 9)), sizer=sizer)
+
+        self.assertEqual(sorted(res), list(range(1, 9)))
+        batches = self._batches()
+        self.assertEqual(batches[0], list(range(1, 9)))
+        self.assertEqual(batches.count(list(range(1, 9))), 1)
+        self.assertLessEqual(sizer.size, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+RecordHeaderScanner のテスト
+"""
+import json
+import unittest
+
+from src.pubchem.full_data_client import RecordHeaderScanner
+
+
+def _record_bytes(record_number: int) -> bytes:
+    record = {"Record": {"RecordType": "CID", "RecordNumber": record_number, "RecordTitle": "Test",
+                         "Section": [{"TOCHeading": "Names and Identifiers"}]}}
+    return json.dumps(record, indent=2).encode("utf-8")
+
+
+def _scan(payload: bytes, chunk_size: int) -> RecordHeaderScanner:
+    scanner = RecordHeaderScanner()
+    for start in range(0, len(payload), chunk_size):
+        scanner.feed(payload[start:start + chunk_size])
+    return scanner
+
+
+class RecordHeaderScannerTest(unittest.TestCase):
+
+    def test_whole_payload(self):
+        self.assertEqual(_scan(_record_bytes(962), 1 << 20).record_number, 962)
+
+    def test_number_split_across_chunks(self):
+        """数値の途中でチャンクが切れても、続きを受信してから確定する"""
+        scanner = RecordHeaderScanner()
+        scanner.feed(b'{"Record": {"RecordType": "CID", "RecordNumber": 96')
+        self.assertIsNone(scanner.record_number)
+        scanner.feed(b'2, "RecordTitle": "Test"}}')
+        self.assertEqual(scanner.record_number, 962)
+
+    def test_number_at_end_of_chunk(self):
+        """数値の直後でチャンクが切れた場合も、区切り文字を受信するまで確定しない"""
+        scanner = RecordHeaderScanner()
+        scanner.feed(b'{"Record": {"RecordNumber": 962')
+        self.assertIsNone(scanner.record_number)
+        scanner.feed(b'}}')
+        self.assertEqual(scanner.record_number, 962)
+
+    def test_every_chunk_size(self):
+        payload = _record_bytes(123456789)
+        for chunk_size in range(1, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_scan(payload, chunk_size).record_number, 123456789)
+
+    def test_not_a_record(self):
+        self.assertIsNone(_scan(b'{"Fault": {"Code": "PUGREST.NotFound"}}', 7).record_number)
+
+    def test_scan_limit(self):
+        scanner = RecordHeaderScanner(limit=16)
+        scanner.feed(b'{"Record": {"RecordType": "CID", ')
+        scanner.feed(b'"RecordNumber": 962}}')
+        self.assertIsNone(scanner.record_number)
+
+
+if __name__ == "__main__":
+    unittest.main()
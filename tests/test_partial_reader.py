@@ -0,0 +1,115 @@
+"""
+load_record_sections のテスト
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.pubchem.partial_reader import load_record_sections
+
+WANTED = ("Names and Identifiers", "Chemical and Physical Properties")
+
+
+def _information(text) -> list:
+    return [{"Value": {"StringWithMarkup": [{"String": text}]}}]
+
+
+def _record(sections: list, **extra) -> dict:
+    record = {"RecordType": "CID", "RecordNumber": 962, "RecordTitle": "Water", "Section": sections}
+    record.update(extra)
+    return {"Record": record}
+
+
+NAMES = {"TOCHeading": "Names and Identifiers", "Section": [
+    {"TOCHeading": "Molecular Formula", "Information": _information("H2O")}]}
+PROPERTIES = {"TOCHeading": "Chemical and Physical Properties", "Section": [
+    {"TOCHeading": "Computed Properties", "Section": [
+        {"TOCHeading": "XLogP3", "Information": [{"Value": {"Number": [-0.5, 1e300]}}]}]}]}
+# 文字列内の括弧・エスケープされた引用符とバックスラッシュ・非ASCII文字を含む、読み飛ばされるセクション
+TRICKY = {"TOCHeading": "Structures", "Information": _information('a "]}[{" \\\\" \\\\ 日本語 \\u005d' * 20),
+          "Section": [{"TOCHeading": "Nested", "Information": _information("}" * 50)}] * 5}
+LITERATURE = {"TOCHeading": "Literature", "Section": [
+    {"TOCHeading": "Reference", "Information": _information("lorem ipsum " * 10)}] * 200}
+
+
+class LoadRecordSectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, content, name="record.json") -> Path:
+        path = self.dir / name
+        if isinstance(content, str):
+            path.write_text(content, encoding="utf-8")
+        else:
+            path.write_text(json.dumps(content, ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+    def _expected(self, data: dict) -> dict:
+        record = {}
+        for key, value in data["Record"].items():
+            if key == "Section":
+                record["Section"] = [s for s in value if s.get("TOCHeading") in WANTED]
+                break
+            record[key] = value
+        return {"Record": record}
+
+    def assertReads(self, data: dict, chunk_sizes=(1, 2, 3, 7, 16, 61, 64 * 1024)):
+        for compact in (False, True):
+            text = json.dumps(data, ensure_ascii=False, indent=None if compact else 2)
+            path = self._write(text)
+            for chunk_size in chunk_sizes:
+                with self.subTest(compact=compact, chunk_size=chunk_size):
+                    self.assertEqual(load_record_sections(path, WANTED, chunk_size=chunk_size), self._expected(data))
+
+    def test_values_split_across_reads(self):
+        """小さなチャンクで、値・文字列・エスケープ・UTF-8の途中で読み込みが切れる場合"""
+        self.assertReads(_record([TRICKY, NAMES, LITERATURE, PROPERTIES]))
+
+    def test_wanted_section_larger_than_chunk(self):
+        """読み込み量を倍増させながら、チャンクより大きな対象セクションを保持する場合"""
+        names = {"TOCHeading": "Names and Identifiers", "Section": [NAMES["Section"][0]] * 500}
+        self.assertReads(_record([LITERATURE, names, PROPERTIES]), chunk_sizes=(5, 1024))
+
+    def test_missing_heading(self):
+        """対象のセクションが無い場合は、Section配列の終わりで読み込みを終了する"""
+        data = _record([TRICKY, LITERATURE], Reference=[{"ReferenceNumber": 1}])
+        self.assertReads(data)
+        self.assertNotIn("Reference", load_record_sections(self._write(data), WANTED)["Record"])
+
+    def test_stops_after_section_array(self):
+        """Section配列より後ろは読まない（壊れていても影響しない）"""
+        text = json.dumps(_record([TRICKY, NAMES]))[:-2] + ', "Reference": [ broken'
+        result = load_record_sections(self._write(text), WANTED, chunk_size=7)
+        self.assertEqual(result["Record"]["Section"], [NAMES])
+
+    def test_stops_when_all_headings_found(self):
+        text = json.dumps(_record([NAMES, PROPERTIES, LITERATURE]))
+        truncated = text[:text.index('"Literature"') + 20]
+        result = load_record_sections(self._write(truncated), WANTED, chunk_size=7)
+        self.assertEqual(result["Record"]["Section"], [NAMES, PROPERTIES])
+
+    def test_heading_not_first_key(self):
+        """TOCHeadingが先頭キーでないセクションも判定できる"""
+        names = {"Description": "x", "TOCHeading": "Names and Identifiers"}
+        other = {"Description": "y", "TOCHeading": "Structures"}
+        self.assertReads(_record([other, names]))
+
+    def test_not_a_record(self):
+        for content in ('{"Fault": {"Code": "PUGREST.NotFound"}}', "[1, 2]", "{}", '{"Record": []}'):
+            with self.subTest(content=content):
+                self.assertIsNone(load_record_sections(self._write(content), WANTED, chunk_size=3))
+
+    def test_truncated_file(self):
+        text = json.dumps(_record([TRICKY, LITERATURE]))
+        with self.assertRaises(ValueError):
+            load_record_sections(self._write(text[:len(text) // 2]), WANTED, chunk_size=16)
+
+
+if __name__ == "__main__":
+    unittest.main()
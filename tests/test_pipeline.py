@@ -0,0 +1,67 @@
+"""
+CompoundPipeline のテスト（PubChemへのリクエストはスタブで処理）
+"""
+import unittest
+
+import pandas as pd
+
+from src.data.pipeline import CompoundPipeline
+from src.data.processor import CompoundDataProcessor
+from tests.pubchem_stub import PUG_REST, FakePubChem, cid_list, stub_pubchem
+
+COMPOUNDS = {"50-00-0": 712, "64-17-5": 702, "7732-18-5": 962, "67-56-1": 887}
+
+ROWS = [
+    {"inci": "FORMALDEHYDE", "cas": "50-00-0", "function": "a"},
+    {"inci": "ALCOHOL", "cas": "64-17-5", "function": "b"},
+    {"inci": "UNKNOWN", "cas": "1234-56-7", "function": "c"},
+    {"inci": "FORMALIN", "cas": "50-00-0", "function": "d"},
+    {"inci": "WATER", "cas": "7732-18-5", "function": "e"},
+    {"inci": "METHANOL", "cas": "67-56-1", "function": "f"},
+]
+
+
+class CompoundPipelineTest(unittest.TestCase):
+    """パイプラインモードは逐次実行（STEP1〜3）と同じ結果になる"""
+
+    def setUp(self):
+        self.session = stub_pubchem(self, FakePubChem(COMPOUNDS, bad_cids={962}).handle)
+
+    def _sequential(self):
+        processor = CompoundDataProcessor()
+        df = processor.create_dataframe(processor.validate_and_filter_data(ROWS))
+        df, notfound = processor.search_compounds(df)
+        df = processor.fetch_properties(df)
+        df, all_ids = processor.fetch_cas_information(df)
+        return df, all_ids, notfound
+
+    def _pipeline(self, **kwargs):
+        processor = CompoundDataProcessor()
+        df = processor.create_dataframe(processor.validate_and_filter_data(ROWS))
+        return CompoundPipeline(processor, **kwargs).run(df)
+
+    def test_matches_sequential_steps(self):
+        expected_df, expected_ids, expected_notfound = self._sequential()
+        # キュー上限1・短いフラッシュ間隔で、ステージ間の待ち合わせを発生させる
+        df, all_ids, notfound = self._pipeline(queue_size=1, flush_seconds=0.01)
+
+        pd.testing.assert_frame_equal(df, expected_df)
+        self.assertEqual(all_ids, expected_ids)
+        self.assertEqual(notfound, expected_notfound)
+        self.assertEqual(df.loc[3, "CID"], 712)
+        self.assertEqual(all_ids["4"]["CAS"]["preferred"], ["7732-18-5"])
+        self.assertTrue(pd.isna(df.loc[4, "Title"]))   # プロパティ取得に失敗したCID
+        self.assertEqual([row[2] for row in notfound], ["1234-56-7"])
+
+    def test_fetches_each_cid_once_downstream(self):
+        """重複行のCIDは下流のステージへ1回だけ送られる"""
+        property_path = CompoundDataProcessor().pubchem_client.property_url()[len(PUG_REST):]
+        self._pipeline(queue_size=1, flush_seconds=0.01)
+
+        batches = [cid_list(form) for form in self.session.posted(property_path)]
+        fetched = [cid for batch in batches if 962 not in batch for cid in batch]
+        self.assertCountEqual(fetched, [712, 702, 887])
+
+
+if __name__ == "__main__":
+    unittest.main()
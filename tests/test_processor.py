@@ -0,0 +1,119 @@
+"""
+CompoundDataProcessor のテスト（PubChemへのリクエストはスタブで処理）
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.data.checkpoint import CheckpointJournal
+from src.data.processor import CompoundDataProcessor
+from src.pubchem.batching import AdaptiveChunkSizer
+from tests.pubchem_stub import PUG_REST, FakePubChem, cid_list, stub_pubchem
+
+COMPOUNDS = {"50-00-0": 712, "64-17-5": 702, "7732-18-5": 962, "67-56-1": 887}
+
+
+def _rows(*cas_numbers: str):
+    return [{"inci": f"INCI {i}", "cas": cas, "function": "f"} for i, cas in enumerate(cas_numbers)]
+
+
+class _ProcessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pubchem = FakePubChem(COMPOUNDS)
+        self.session = stub_pubchem(self, self._handle)
+        self.property_path = CompoundDataProcessor().pubchem_client.property_url()[len(PUG_REST):]
+
+    def _handle(self, method, url, form):
+        return self.pubchem.handle(method, url, form)
+
+    def _run(self, rows, checkpoint=None):
+        processor = CompoundDataProcessor(checkpoint=checkpoint)
+        df = processor.create_dataframe(processor.validate_and_filter_data(rows))
+        df, notfound = processor.search_compounds(df)
+        df = processor.fetch_properties(df)
+        df, all_ids = processor.fetch_cas_information(df)
+        return df, all_ids
+
+    def _posted_cids(self, path):
+        return [cid for form in self.session.posted(path) for cid in cid_list(form)]
+
+
+class CheckpointResumeTest(_ProcessorTestCase):
+    """--resume ではチェックポイント記録済みの検索・プロパティ・CAS情報を再取得しない"""
+
+    def setUp(self):
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.journal_path = Path(self._tmp.name) / "journal.sqlite"
+
+    def _journal(self, resume: bool) -> CheckpointJournal:
+        journal = CheckpointJournal(self.journal_path, resume=resume)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_resume_fetches_only_new_entries(self):
+        first_df, first_ids = self._run(_rows("50-00-0", "64-17-5"), self._journal(resume=False))
+        self.session.requests.clear()
+
+        df, all_ids = self._run(_rows("50-00-0", "64-17-5", "67-56-1"), self._journal(resume=True))
+
+        self.assertEqual(self.session.posted("/compound/xref/RN/cids/JSON"), [{"RN": "67-56-1"}])
+        self.assertEqual(self._posted_cids(self.property_path), [887])
+        self.assertEqual(set(self._posted_cids("/compound/cid/xrefs/RN/JSON")), {887})
+        self.assertEqual(df.loc[:1, "Title"].tolist(), first_df["Title"].tolist())
+        self.assertEqual(all_ids["0"], first_ids["0"])
+        self.assertEqual(df.loc[2, "CID"], 887)
+
+    def test_without_resume_journal_is_reset(self):
+        self._run(_rows("50-00-0"), self._journal(resume=False))
+        self.session.requests.clear()
+
+        self._run(_rows("50-00-0"), self._journal(resume=False))
+        self.assertEqual(self._posted_cids(self.property_path), [712])
+
+    def test_batches_completed_before_interruption_are_kept(self):
+        """中断しても、それまでに完了したプロパティのバッチは記録済み"""
+        def interrupt_on_887(method, url, form):
+            if url.endswith(self.property_path) and 887 in cid_list(form):
+                raise KeyboardInterrupt
+            return self.pubchem.handle(method, url, form)
+
+        processor = CompoundDataProcessor(checkpoint=self._journal(resume=False))
+        self.session.handler = interrupt_on_887
+        with self.assertRaises(KeyboardInterrupt):
+            processor.fetch_cid_properties([712, 702, 887], sizer=AdaptiveChunkSizer(1, 1, 1))
+
+        self.session.handler = self._handle
+        self.session.requests.clear()
+        props = CompoundDataProcessor(checkpoint=self._journal(resume=True)).fetch_cid_properties([712, 702, 887])
+        self.assertEqual(self._posted_cids(self.property_path), [887])
+        self.assertEqual(sorted(props), [702, 712, 887])
+
+
+class DuplicateCasTest(_ProcessorTestCase):
+    """表記揺れを含む同じCASは1回だけ検索・取得し、結果を全ての重複行に設定する"""
+
+    def test_results_fanned_out_to_duplicate_rows(self):
+        # 全角数字・全角ハイフン・前後の空白はいずれも 50-00-0 と同じCAS
+        df, all_ids = self._run(_rows("50-00-0", "64-17-5", "５０－００－０", " 50-00-0 ", "50‐00‐0"))
+
+        self.assertEqual(self.session.posted("/compound/xref/RN/cids/JSON"), [{"RN": "50-00-0,64-17-5"}])
+        self.assertEqual(sorted(self._posted_cids(self.property_path)), [702, 712])
+        for idx in (0, 2, 3, 4):
+            self.assertEqual(df.loc[idx, "CID"], 712)
+            self.assertEqual(df.loc[idx, "Title"], "Title712")
+            self.assertEqual(df.loc[idx, "CAS"], "50-00-0")
+            self.assertEqual(all_ids[str(idx)]["CAS"]["preferred"], ["50-00-0"])
+        self.assertEqual(df.loc[1, "CID"], 702)
+
+    def test_duplicate_unresolved_cas_searched_once(self):
+        self._run(_rows("1234-56-7", "1234-56-7"))
+        searched = [url for method, url, _ in self.session.requests
+                    if method == "GET" and url == f"{PUG_REST}/compound/xref/RN/1234-56-7/cids/JSON"]
+        self.assertEqual(len(searched), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()